@@ -12,7 +12,7 @@ class CategoryAdmin(admin.ModelAdmin):
 class ContentItemAdmin(admin.ModelAdmin):
     list_display = ('title', 'user', 'content_type', 'status', 'created_at')
     list_filter = ('content_type', 'status', 'created_at', 'category')
-    search_fields = ('title', 'description', 'url')
+    search_fields = ('title', 'description', 'resource__description', 'url')
     filter_horizontal = ()
     raw_id_fields = ('user',)
     date_hierarchy = 'created_at'
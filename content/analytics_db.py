@@ -0,0 +1,150 @@
+"""
+Снимок базы для аналитики.
+
+Тяжелые аналитические чтения (статистика, графики, AnalyticsView) идут в
+отдельную копию SQLite-базы, сделанную через online backup API. Так долгие
+чтения не держат транзакции на рабочей базе и не задерживают запись.
+
+Снимок обновляет только команда refresh_analytics_db (по расписанию, cron);
+запросы читают имеющийся снимок, даже устаревший, и не копируют базу сами.
+Пока снимка нет, чтения идут в рабочую базу. Копия пишется в уникальный
+временный файл рядом со снимком под межпроцессной блокировкой файла, так
+что параллельные обновления из разных процессов не мешают друг другу.
+"""
+import contextvars
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows - остается блокировка внутри процесса
+    fcntl = None
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.db import DEFAULT_DB_ALIAS, connections # pyright: ignore[reportMissingModuleSource]
+
+ANALYTICS_DB_ALIAS = 'analytics'
+
+_analytics_reads = contextvars.ContextVar('analytics_reads', default=False)
+_refresh_lock = threading.Lock()
+
+
+def is_snapshot_enabled():
+    """Снимок включен, если настроен алиас и обе базы - отдельные файлы SQLite"""
+    databases = settings.DATABASES
+    if ANALYTICS_DB_ALIAS not in databases:
+        return False
+
+    default = databases[DEFAULT_DB_ALIAS]
+    analytics = databases[ANALYTICS_DB_ALIAS]
+    if 'sqlite3' not in default['ENGINE'] or 'sqlite3' not in analytics['ENGINE']:
+        return False
+
+    # В тестах алиас зеркалит default (TEST.MIRROR) - копировать нечего
+    return str(default['NAME']) != str(analytics['NAME'])
+
+
+def snapshot_age():
+    """Возраст снимка в секундах (None - снимка нет)"""
+    path = settings.DATABASES[ANALYTICS_DB_ALIAS]['NAME']
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+@contextmanager
+def _file_lock(path):
+    """Межпроцессная блокировка (flock) файла path на время обновления"""
+    with open(path, 'a') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def refresh_snapshot(pages=1024, max_age=None):
+    """
+    Обновление снимка через sqlite3 backup API.
+
+    Копия пишется во временный файл порциями по `pages` страниц (между
+    порциями рабочая база доступна для записи), затем атомарно подменяет
+    старый снимок. max_age - не обновлять, если снимок моложе (проверяется
+    под блокировкой: параллельный запуск не копирует базу второй раз).
+    Возвращает время копирования в секундах или None, если копировать не
+    понадобилось.
+    """
+    source_path = str(settings.DATABASES[DEFAULT_DB_ALIAS]['NAME'])
+    target_path = str(settings.DATABASES[ANALYTICS_DB_ALIAS]['NAME'])
+
+    with _refresh_lock, _file_lock(target_path + '.lock'):
+        age = snapshot_age()
+        if max_age is not None and age is not None and age <= max_age:
+            return None
+        started = time.perf_counter()
+
+        handle, tmp_path = tempfile.mkstemp(
+            prefix=os.path.basename(target_path) + '.', suffix='.tmp', dir=os.path.dirname(target_path) or '.'
+        )
+        os.close(handle)
+        try:
+            source = sqlite3.connect(source_path)
+            target = sqlite3.connect(tmp_path)
+            try:
+                source.backup(target, pages=pages)
+            finally:
+                target.close()
+                source.close()
+            os.replace(tmp_path, target_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # Соединение этого процесса указывает на старый файл - переоткроется при следующем запросе
+        connections[ANALYTICS_DB_ALIAS].close()
+
+        return time.perf_counter() - started
+
+
+def ensure_fresh_snapshot():
+    """Обновить снимок, если его нет или он старше ANALYTICS_DB_MAX_AGE (для команды)"""
+    if not is_snapshot_enabled():
+        return False
+    return refresh_snapshot(max_age=getattr(settings, 'ANALYTICS_DB_MAX_AGE', 300)) is not None
+
+
+def has_snapshot():
+    """Снимок включен и уже создан (устаревший тоже подходит)"""
+    return is_snapshot_enabled() and snapshot_age() is not None
+
+
+def get_analytics_alias():
+    """Алиас базы для аналитических чтений (рабочая, пока снимок не создан)"""
+    return ANALYTICS_DB_ALIAS if has_snapshot() else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def analytics_reads():
+    """
+    Контекст, в котором ORM-чтения направляются в снимок.
+
+    Используется во вьюхах аналитики и визуализаций; роутер
+    AnalyticsRouter проверяет этот флаг. Снимок здесь не обновляется.
+    """
+    token = _analytics_reads.set(True)
+    try:
+        yield get_analytics_alias()
+    finally:
+        _analytics_reads.reset(token)
+
+
+def in_analytics_reads():
+    return _analytics_reads.get()
@@ -0,0 +1,149 @@
+"""
+Колоночный снимок аналитических данных ContentItem.
+
+Каждая колонка хранится в отдельном .npy файле, чтобы ее можно было
+открыть через memory-map без копирования. Категориальные колонки
+(тип, статус, категория) хранятся как коды + словарь в meta.json.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.db.models import Count # pyright: ignore[reportMissingModuleSource]
+from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+
+from .models import Category, ContentItem
+
+SNAPSHOT_VERSION = 1
+
+# Колонка -> dtype на диске
+SNAPSHOT_COLUMNS = {
+    'id': 'int64',
+    'user': 'int64',
+    'type': 'int8',
+    'status': 'int8',
+    'category': 'int32',          # -1 = без категории
+    'created_at': 'datetime64[s]',
+    'completed_at': 'datetime64[s]',  # NaT = не завершено
+    'tag_count': 'int32',
+}
+
+
+def get_snapshot_dir():
+    """Каталог снимка из настроек"""
+    return Path(getattr(settings, 'ANALYTICS_SNAPSHOT_DIR', settings.BASE_DIR / 'analytics_snapshot'))
+
+
+def _to_datetime64(values):
+    """Преобразование aware-дат из ORM в datetime64[s] (UTC, без таймзоны)"""
+    import pandas as pd # pyright: ignore[reportMissingModuleSource]
+
+    series = pd.to_datetime(pd.Series(values, dtype='object'), utc=True)
+    return series.dt.tz_localize(None).to_numpy(dtype='datetime64[s]')
+
+
+def export_snapshot(queryset=None, path=None, chunk_size=10000):
+    """
+    Выгрузка аналитических колонок в каталог снимка.
+
+    Данные читаются чанками и пишутся во временный каталог, который затем
+    атомарно заменяет предыдущий снимок. Возвращает количество строк.
+    """
+    import numpy as np # pyright: ignore[reportMissingImports]
+
+    path = Path(path or get_snapshot_dir())
+    if queryset is None:
+        queryset = ContentItem.objects.all()
+
+    type_codes = {value: code for code, (value, _) in enumerate(ContentItem.CONTENT_TYPES)}
+    status_codes = {value: code for code, (value, _) in enumerate(ContentItem.STATUS_CHOICES)}
+    categories = list(Category.objects.order_by('id').values_list('id', 'name'))
+    category_codes = {cat_id: code for code, (cat_id, _) in enumerate(categories)}
+
+    rows = queryset.order_by('id').annotate(tag_count=Count('tags')).values_list(
+        'id', 'user_id', 'content_type', 'status', 'category_id',
+        'created_at', 'completed_at', 'tag_count'
+    )
+
+    chunks = {name: [] for name in SNAPSHOT_COLUMNS}
+    buffer = []
+
+    def flush():
+        if not buffer:
+            return
+        ids, users, types, statuses, cats, created, completed, tags = zip(*buffer)
+        chunks['id'].append(np.asarray(ids, dtype='int64'))
+        chunks['user'].append(np.asarray(users, dtype='int64'))
+        chunks['type'].append(np.asarray([type_codes.get(t, -1) for t in types], dtype='int8'))
+        chunks['status'].append(np.asarray([status_codes.get(s, -1) for s in statuses], dtype='int8'))
+        chunks['category'].append(np.asarray([category_codes.get(c, -1) for c in cats], dtype='int32'))
+        chunks['created_at'].append(_to_datetime64(created))
+        chunks['completed_at'].append(_to_datetime64(completed))
+        chunks['tag_count'].append(np.asarray(tags, dtype='int32'))
+        buffer.clear()
+
+    for row in rows.iterator(chunk_size=chunk_size):
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            flush()
+    flush()
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    row_count = user_count = 0
+    for name, dtype in SNAPSHOT_COLUMNS.items():
+        column = np.concatenate(chunks[name]) if chunks[name] else np.empty(0, dtype=dtype)
+        np.save(tmp_path / f'{name}.npy', column.astype(dtype, copy=False))
+        row_count = len(column)
+        if name == 'user':
+            user_count = len(np.unique(column))
+
+    meta = {
+        'version': SNAPSHOT_VERSION,
+        'generated_at': timezone.now().isoformat(),
+        'rows': row_count,
+        'users': user_count,
+        'dictionaries': {
+            'type': [value for value, _ in ContentItem.CONTENT_TYPES],
+            'status': [value for value, _ in ContentItem.STATUS_CHOICES],
+            'category': [name for _, name in categories],
+        },
+    }
+    with open(tmp_path / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    # Атомарная подмена снимка: читатели видят либо старый, либо новый
+    old_path = path.with_name(path.name + '.old')
+    shutil.rmtree(old_path, ignore_errors=True)
+    if path.exists():
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+    return row_count
+
+
+def load_snapshot(path=None):
+    """
+    Открытие снимка через memory-map.
+
+    Возвращает (columns, meta), где columns - словарь numpy-массивов,
+    отображенных на файлы (без чтения в память).
+    """
+    import numpy as np # pyright: ignore[reportMissingImports]
+
+    path = Path(path or get_snapshot_dir())
+    with open(path / 'meta.json', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    columns = {}
+    for name in SNAPSHOT_COLUMNS:
+        # Пустой массив нельзя отобразить в память - читаем его обычным способом
+        mmap_mode = 'r' if meta['rows'] else None
+        columns[name] = np.load(path / f'{name}.npy', mmap_mode=mmap_mode)
+
+    return columns, meta
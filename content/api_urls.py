@@ -2,7 +2,9 @@ from django.urls import path, include # pyright: ignore[reportMissingModuleSourc
 from rest_framework.routers import DefaultRouter # pyright: ignore[reportMissingImports]
 from .api_views import (
     CategoryViewSet, ContentItemViewSet,
-    RecommendationViewSet, UserViewSet, ParseContentView
+    RecommendationViewSet, UserViewSet, ParseContentView, ParseJobView, BatchParseView,
+    ExternalSearchView, AnalyticsView, VisualizationView, UpstreamMetricsView, BookmarkImportView,
+    DeletionJobView, ImportJobView, BatchImportJobView
 )
 
 router = DefaultRouter()
@@ -14,8 +16,15 @@ router.register(r'users', UserViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('parse/', ParseContentView.as_view(), name='api-parse'),
-    path('search/external/', ExternalSearchView.as_view(), name='api-external-search'), # pyright: ignore[reportUndefinedVariable]
-    path('analytics/', AnalyticsView.as_view(), name='api-analytics'), # pyright: ignore[reportUndefinedVariable]
+    path('parse/batch/', BatchParseView.as_view(), name='api-parse-batch'),
+    path('parse/batch/<uuid:job_id>/', BatchImportJobView.as_view(), name='api-parse-batch-job'),
+    path('parse/<uuid:job_id>/', ParseJobView.as_view(), name='api-parse-job'),
+    path('deletions/<uuid:job_id>/', DeletionJobView.as_view(), name='api-deletion-job'),
+    path('import/bookmarks/', BookmarkImportView.as_view(), name='api-import-bookmarks'),
+    path('import/bookmarks/<uuid:job_id>/', ImportJobView.as_view(), name='api-import-job'),
+    path('upstreams/', UpstreamMetricsView.as_view(), name='api-upstreams'),
+    path('search/external/', ExternalSearchView.as_view(), name='api-external-search'),
+    path('analytics/', AnalyticsView.as_view(), name='api-analytics'),
     path('auth/', include('rest_framework.urls', namespace='rest_framework')),
-    path('visualizations/', VisualizationView.as_view(), name='api-visualizations'), # pyright: ignore[reportUndefinedVariable]
+    path('visualizations/', VisualizationView.as_view(), name='api-visualizations'),
 ]
\ No newline at end of file
@@ -4,15 +4,24 @@ from rest_framework.response import Response # pyright: ignore[reportMissingImpo
 from rest_framework.parsers import MultiPartParser, FormParser # pyright: ignore[reportMissingImports]
 from django_filters.rest_framework import DjangoFilterBackend # pyright: ignore[reportMissingModuleSource]
 from rest_framework.filters import SearchFilter, OrderingFilter # pyright: ignore[reportMissingImports]
-from django.db.models import Count, Q # pyright: ignore[reportMissingModuleSource]
-from .models import Category, ContentItem, Recommendation
+from django.db.models import Q # pyright: ignore[reportMissingModuleSource]
+from .models import BatchImportJob, Category, ContentItem, DeletionJob, ImportJob, Recommendation, ParseJob
 from .serializers import (
-    CategorySerializer, ContentItemSerializer,
-    RecommendationSerializer, UserSerializer
+    BatchImportJobSerializer, CategorySerializer, ContentItemSerializer, DeletionJobSerializer, ImportJobSerializer,
+    RecommendationSerializer, UserSerializer, ParseJobSerializer
 )
+from .services import ContentAnalyzer
+from .recommendation_engine import AdvancedRecommendationEngine
+from .analytics_db import analytics_reads
+from . import counters, external_search, keywords, page_text, representation_cache, sketches
+from .parsing import item_data, parse_url, submit_parse_job
+from .prefetch import optimize
+from .resources import saved_item
+from .simhash import find_near_duplicate
+from rest_framework.reverse import reverse # pyright: ignore[reportMissingImports]
+from django.core.exceptions import ValidationError # pyright: ignore[reportMissingModuleSource]
+from django.core.validators import URLValidator # pyright: ignore[reportMissingModuleSource]
 from django.contrib.auth.models import User # pyright: ignore[reportMissingModuleSource]
-import requests # pyright: ignore[reportMissingModuleSource]
-from bs4 import BeautifulSoup # pyright: ignore[reportMissingImports]
 import re
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -22,15 +31,42 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
         return obj.user == request.user
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class PlannedQuerysetMixin:
+    """Связи и аннотации для полей serializer_class при чтении (content.prefetch)"""
+    # Действия, ответ которых собирается из кэша представлений элементов
+    # (content.representation_cache): промахи догружаются по плану отдельно
+    cached_actions = ()
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.cached_actions:
+            return queryset
+        # При записи аннотации устарели бы к моменту ответа
+        if self.request.method in permissions.SAFE_METHODS:
+            queryset = optimize(queryset, self.get_serializer_class())
+        return queryset
+
+def _deletion_response(job, request):
+    """202 со статусом фоновой задачи удаления"""
+    data = DeletionJobSerializer(job).data
+    data['status_url'] = reverse('api-deletion-job', kwargs={'job_id': job.pk}, request=request)
+    return Response(data, status=status.HTTP_202_ACCEPTED)
+
+class CategoryViewSet(PlannedQuerysetMixin, viewsets.ModelViewSet):
     """API для категорий"""
-    queryset = Category.objects.annotate(
-        content_count=Count('contentitem')
-    ).order_by('name')
+    queryset = Category.objects.order_by('name')
     serializer_class = CategorySerializer
+    cached_actions = ('contents',)
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
     
+    def destroy(self, request, *args, **kwargs):
+        # Категория скрывается сразу, элементы отвязываются в фоне (content.deletion)
+        from .deletion import delete_category
+        
+        job = delete_category(self.get_object(), requested_by=request.user)
+        return _deletion_response(job, request)
+    
     @action(detail=True, methods=['get'])
     def contents(self, request, slug=None):
         """Получить весь контент в категории"""
@@ -43,19 +79,58 @@ class CategoryViewSet(viewsets.ModelViewSet):
         serializer = ContentItemSerializer(contents, many=True, context={'request': request})
         return Response(serializer.data)
 
-class ContentItemViewSet(viewsets.ModelViewSet):
+class ContentItemViewSet(PlannedQuerysetMixin, viewsets.ModelViewSet):
     """API для контента"""
-    queryset = ContentItem.objects.select_related('user', 'category').order_by('-created_at')
+    queryset = ContentItem.objects.order_by('-created_at')
     serializer_class = ContentItemSerializer
+    cached_actions = ('list',)
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['content_type', 'status', 'category']
-    search_fields = ['title', 'description', 'tags__name']
     ordering_fields = ['created_at', 'updated_at', 'title']
     
+    @property
+    def search_fields(self):
+        from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+        
+        fields = ['title', 'description', 'resource__description', 'tags__name']
+        if settings.PAGE_TEXT_ENABLED:
+            # Термины текста страницы - отдельная таблица (content.page_text): лишний JOIN и LIKE без индекса
+            fields.append('resource__page_text__terms')
+        return fields
+    
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        # Почти-дубликат среди материалов пользователя (SimHash заголовка и описания).
+        # По умолчанию только помечаем, ?on_duplicate=reject - отказываем
+        duplicate = find_near_duplicate(
+            request.user.id,
+            serializer.validated_data.get('title', ''),
+            serializer.validated_data.get('full_description') or ''
+        )
+        if duplicate is not None and request.query_params.get('on_duplicate') == 'reject':
+            return Response(
+                {'error': 'Похожий материал уже сохранен', 'duplicate_of': duplicate.id},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        # Предложение тегов считаем до сохранения - сам элемент еще не в корпусе
+        suggested_tags = keywords.suggest_tags(
+            serializer.validated_data.get('title', ''),
+            serializer.validated_data.get('full_description') or ''
+        )
+        self.perform_create(serializer)
+        data = serializer.data
+        data['suggested_tags'] = suggested_tags
+        if duplicate is not None:
+            data['duplicate_of'] = duplicate.id
+        return Response(data, status=status.HTTP_201_CREATED, headers=self.get_success_headers(data))
+    
     @action(detail=False, methods=['get'])
     def mine(self, request):
         """Получить только мой контент"""
@@ -67,6 +142,15 @@ class ContentItemViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(contents, many=True)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def text(self, request, pk=None):
+        """Полный текст страницы (распаковывается по запросу)"""
+        content_item = self.get_object()
+        text = page_text.get_text(content_item)
+        if not text:
+            return Response({'error': 'Текст страницы не сохранен'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'id': content_item.id, 'length': len(text), 'text': text})
+    
     @action(detail=True, methods=['get'])
     def similar(self, request, pk=None):
         """Похожий контент по тегам"""
@@ -77,42 +161,130 @@ class ContentItemViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(similar, many=True)
         return Response(serializer.data)
     
+    def _bulk_queryset(self, request):
+        """
+        Элементы пользователя для массовой операции: по списку ids в теле
+        или по фильтрам запроса (status, category, content_type, search).
+        Возвращает (queryset, ошибка).
+        """
+        from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+        
+        owned = ContentItem.objects.filter(user=request.user)
+        ids = request.data.get('ids')
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+                return None, 'ids - список целых чисел'
+            max_ids = getattr(settings, 'BULK_ACTION_MAX_IDS', 5000)
+            if len(ids) > max_ids:
+                return None, f'Не более {max_ids} id за один запрос'
+            return owned.filter(pk__in=ids), None
+        
+        filter_params = {*self.filterset_fields, 'search'}
+        if not filter_params & set(request.query_params):
+            return None, 'Укажите ids или фильтр (status, category, content_type, search)'
+        # Поиск по тегам дает distinct - UPDATE/DELETE идут по подзапросу id
+        matched = self.filter_queryset(owned).order_by().values('pk')
+        return owned.filter(pk__in=matched), None
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update(self, request):
+        """Массовая смена статуса, категории и тегов (один UPDATE)"""
+        from .bulk_actions import UNCHANGED, update_items
+        
+        queryset, error = self._bulk_queryset(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        
+        new_status = request.data.get('status')
+        if new_status is not None and new_status not in dict(ContentItem.STATUS_CHOICES):
+            return Response({'error': f'Неизвестный статус: {new_status}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        category_id = request.data.get('category_id', UNCHANGED)
+        if category_id is not UNCHANGED and category_id is not None:
+            if not isinstance(category_id, int) or not Category.objects.filter(pk=category_id).exists():
+                return Response({'error': 'Категория не найдена'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        tag_changes = {}
+        for key in ('add_tags', 'remove_tags'):
+            value = request.data.get(key) or []
+            if not isinstance(value, list) or not all(isinstance(tag, str) for tag in value):
+                return Response({'error': f'{key} - список строк'}, status=status.HTTP_400_BAD_REQUEST)
+            tag_changes[key] = value
+        
+        if new_status is None and category_id is UNCHANGED and not any(tag_changes.values()):
+            return Response(
+                {'error': 'Нечего менять: status, category_id, add_tags или remove_tags'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(update_items(queryset, status=new_status, category_id=category_id, **tag_changes))
+    
+    @action(detail=False, methods=['post'])
+    def bulk_delete(self, request):
+        """Массовое удаление по списку id или фильтру"""
+        from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+        from .bulk_actions import delete_items
+        from .deletion import delete_content
+        
+        queryset, error = self._bulk_queryset(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Большой набор скрывается сразу и удаляется в фоне порциями
+        if queryset.count() > getattr(settings, 'DELETION_SYNC_LIMIT', 500):
+            job = delete_content(request.user, queryset)
+            if job is not None:
+                return _deletion_response(job, request)
+        return Response({'deleted': delete_items(queryset)})
+    
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Статистика по контенту"""
+        # Денормализованные счетчики (content.counters) вместо GROUP BY по таблице
         stats = {
-            'total': ContentItem.objects.count(),
-            'by_type': dict(ContentItem.objects.values('content_type').annotate(
-                count=Count('id')
-            ).values_list('content_type', 'count')),
-            'by_status': dict(ContentItem.objects.values('status').annotate(
-                count=Count('id')
-            ).values_list('status', 'count')),
+            'total': counters.get(counters.ITEMS),
+            'by_type': {key: value for key, value in counters.values(counters.TYPE).items() if value},
+            'by_status': {key: value for key, value in counters.values(counters.STATUS).items() if value},
         }
         return Response(stats)
 
-class RecommendationViewSet(viewsets.ModelViewSet):
+class RecommendationViewSet(PlannedQuerysetMixin, viewsets.ModelViewSet):
     """API для рекомендаций"""
-    queryset = Recommendation.objects.select_related('user', 'content_item').order_by('-score')
+    queryset = Recommendation.objects.order_by('-score')
     serializer_class = RecommendationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cached_actions = ('list',)
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.cached_actions:
+            # Для ключей кэша достаточно строк элементов (один JOIN)
+            queryset = queryset.select_related('user', 'content_item')
+        return queryset
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
+    def _items(self, recommendations):
+        """Представления элементов рекомендаций (content.representation_cache)"""
+        cached = representation_cache.representations(
+            [rec['content_item'] for rec in recommendations], ContentItemSerializer()
+        )
+        return [
+            (rec, cached.get(rec['content_item'].pk) or ContentItemSerializer(rec['content_item']).data)
+            for rec in recommendations
+        ]
+    
     @action(detail=False, methods=['get'])
     def for_me(self, request):
         """Рекомендации для текущего пользователя"""
-        engine = AdvancedRecommendationEngine() # pyright: ignore[reportUndefinedVariable]
+        engine = AdvancedRecommendationEngine()
         recommendations = engine.get_recommendations(request.user, limit=10)
         
         serialized = []
-        for rec in recommendations:
+        for rec, item in self._items(recommendations):
             serialized.append({
-                'content_item': ContentItemSerializer(
-                    rec['content_item'], 
-                    context={'request': request}
-                ).data,
+                'content_item': item,
                 'score': rec['score'],
                 'reason': rec['reason'],
                 'engine': 'advanced'
@@ -120,25 +292,33 @@ class RecommendationViewSet(viewsets.ModelViewSet):
         
         return Response(serialized)
     
+    @action(detail=False, methods=['get'])
+    def discover(self, request):
+        """Рекомендации из общего пула внешних материалов (команда ingest_feeds)"""
+        engine = AdvancedRecommendationEngine()
+        recommendations = engine.get_discovered_recommendations(request.user, limit=10)
+        
+        return Response([
+            {'item': rec['item'].as_result(), 'score': rec['score'], 'reason': rec['reason']}
+            for rec in recommendations
+        ])
+    
     @action(detail=False, methods=['get'])
     def advanced(self, request):
         """Продвинутые рекомендации с разными алгоритмами"""
-        from .recommendation_engine import AdvancedRecommendationEngine
+        import numpy as np # pyright: ignore[reportMissingImports]
         
         engine = AdvancedRecommendationEngine()
         recommendations = engine.get_recommendations(request.user, limit=15)
         
         # Группируем по причинам
         grouped = {}
-        for rec in recommendations:
+        for rec, item in self._items(recommendations):
             reason = rec['reason']
             if reason not in grouped:
                 grouped[reason] = []
             grouped[reason].append({
-                'item': ContentItemSerializer(
-                    rec['content_item'],
-                    context={'request': request}
-                ).data,
+                'item': item,
                 'score': rec['score']
             })
         
@@ -146,13 +326,23 @@ class RecommendationViewSet(viewsets.ModelViewSet):
             'total': len(recommendations),
             'grouped_by_reason': grouped,
             'top_score': recommendations[0]['score'] if recommendations else 0,
-            'average_score': np.mean([r['score'] for r in recommendations]) if recommendations else 0 # pyright: ignore[reportUndefinedVariable]
+            'average_score': np.mean([r['score'] for r in recommendations]) if recommendations else 0
         })
 
-class UserViewSet(viewsets.ReadOnlyModelView):
+class UserViewSet(PlannedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     """API для пользователей"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    cached_actions = ('contents',)
+    
+    def destroy(self, request, pk=None):
+        """Удаление учетной записи (своей или администратором) в фоне"""
+        from .deletion import delete_user
+        
+        user = self.get_object()
+        if not request.user.is_authenticated or (user != request.user and not request.user.is_staff):
+            return Response({'error': 'Можно удалить только свою учетную запись'}, status=status.HTTP_403_FORBIDDEN)
+        return _deletion_response(delete_user(user, requested_by=request.user), request)
     
     @action(detail=True, methods=['get'])
     def contents(self, request, pk=None):
@@ -172,6 +362,9 @@ class ParseContentView(generics.CreateAPIView):
     serializer_class = ContentItemSerializer
     
     def post(self, request, *args, **kwargs):
+        # requests нужен только здесь - не грузим его при старте воркера
+        import requests # pyright: ignore[reportMissingModuleSource]
+        
         url = request.data.get('url', '').strip()
         
         if not url:
@@ -180,65 +373,42 @@ class ParseContentView(generics.CreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            # Парсим мета-данные страницы
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Извлекаем заголовок
-            title = soup.title.string if soup.title else ''
-            
-            # Ищем мета-описание
-            description = ''
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if meta_desc and meta_desc.get('content'):
-                description = meta_desc['content']
-            else:
-                # Берем первый параграф
-                first_p = soup.find('p')
-                if first_p:
-                    description = first_p.get_text()[:200]
-            
-            # Определяем тип контента по домену
-            content_type = 'article'
-            if 'youtube.com' in url or 'vimeo.com' in url:
-                content_type = 'video'
-            elif 'github.com' in url or 'stackoverflow.com' in url:
-                content_type = 'article'
-            
-            # Извлекаем ключевые слова
-            keywords = []
-            meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-            if meta_keywords and meta_keywords.get('content'):
-                keywords = [k.strip() for k in meta_keywords['content'].split(',')[:5]]
+        # Асинхронный режим: сразу отвечаем 202, парсинг идет в фоновом пуле
+        is_async = str(request.data.get('async', request.query_params.get('async', ''))).lower()
+        if is_async in ('1', 'true', 'yes'):
+            try:
+                URLValidator()(url)
+            except ValidationError:
+                return Response({'error': 'Некорректный URL'}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Автоматически подбираем категорию
-            category = None
-            if any(word in url.lower() for word in ['python', 'django', 'programming', 'code']):
-                category = Category.objects.filter(slug='programming').first()
-            elif any(word in url.lower() for word in ['design', 'ui', 'ux', 'figma']):
-                category = Category.objects.filter(slug='design').first()
+            job = submit_parse_job(request.user, url)
+            return Response({
+                'job_id': str(job.id),
+                'status': job.status,
+                'status_url': reverse('api-parse-job', kwargs={'job_id': job.id}, request=request),
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        # Та же ссылка уже сохранена пользователем - возвращаем ее вместо копии
+        existing = saved_item(request.user.id, url)
+        if existing is not None:
+            data = self.get_serializer(existing).data
+            data['duplicate_of'] = existing.id
+            return Response(data, status=status.HTTP_200_OK)
+        
+        try:
+            content_data = parse_url(url)
             
-            # Создаем контент
-            content_data = {
-                'title': title[:200],
-                'url': url,
-                'description': description[:500],
-                'content_type': content_type,
-                'category_id': category.id if category else None,
-                'tags': keywords,
-                'status': 'new'
-            }
+            # Похожий материал по другой ссылке только помечается
+            duplicate = find_near_duplicate(request.user.id, content_data['title'], content_data['description'])
             
-            serializer = self.get_serializer(data=content_data)
+            serializer = self.get_serializer(data=item_data(content_data))
             if serializer.is_valid():
                 serializer.save(user=request.user)
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
+                data = serializer.data
+                data['suggested_tags'] = content_data['suggested_tags']
+                if duplicate is not None:
+                    data['duplicate_of'] = duplicate.id
+                return Response(data, status=status.HTTP_201_CREATED)
             
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
@@ -252,6 +422,133 @@ class ParseContentView(generics.CreateAPIView):
                 {'error': f'Ошибка при парсинге: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+class BatchParseView(generics.GenericAPIView):
+    """Массовый импорт списка URL с параллельной загрузкой"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+        from .bulk_import import import_urls, submit_batch
+        
+        urls = request.data.get('urls')
+        if not isinstance(urls, list) or not urls:
+            return Response(
+                {'error': 'Нужен непустой список urls'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        max_urls = getattr(settings, 'BULK_IMPORT_MAX_URLS', 5000)
+        if len(urls) > max_urls:
+            return Response(
+                {'error': f'Не более {max_urls} URL за один запрос'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        urls = [str(url) for url in urls]
+        # Длинный список импортируется в фоне, отчет - по status_url
+        if len(urls) > getattr(settings, 'BULK_IMPORT_SYNC_URLS', 50):
+            job = submit_batch(request.user, urls)
+            data = BatchImportJobSerializer(job).data
+            data['status_url'] = reverse('api-parse-batch-job', kwargs={'job_id': job.pk}, request=request)
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+        
+        report = import_urls(request.user, urls)
+        
+        return Response({
+            'total': len(report),
+            'created': sum(1 for entry in report if entry['status'] == 'created'),
+            'results': report,
+        })
+
+class BatchImportJobView(generics.RetrieveAPIView):
+    """Статус и отчет фоновой задачи массового импорта URL"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BatchImportJobSerializer
+    lookup_field = 'id'
+    lookup_url_kwarg = 'job_id'
+    
+    def get_queryset(self):
+        return BatchImportJob.objects.filter(user=self.request.user)
+
+class BookmarkImportView(generics.GenericAPIView):
+    """Импорт закладок из файла экспорта (Netscape HTML, CSV, JSON)"""
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+    
+    def post(self, request):
+        from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+        from .bookmark_import import FORMATS, ImportFormatError, import_bookmarks, iter_bookmarks, start_import
+        
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Нужен файл (поле file)'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        max_bytes = getattr(settings, 'BOOKMARK_IMPORT_MAX_BYTES', 50 * 1024 * 1024)
+        if upload.size > max_bytes:
+            return Response(
+                {'error': f'Файл больше {max_bytes // (1024 * 1024)} МБ'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        file_format = request.data.get('format') or None
+        if file_format is not None and file_format not in FORMATS:
+            return Response(
+                {'error': f"Формат: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Большой файл импортируется в фоне, прогресс - по status_url
+        if upload.size > getattr(settings, 'BOOKMARK_IMPORT_SYNC_BYTES', 1024 * 1024):
+            job = start_import(request.user, upload, file_format)
+            data = ImportJobSerializer(job).data
+            data['status_url'] = reverse('api-import-job', kwargs={'job_id': job.pk}, request=request)
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+        
+        try:
+            stats = import_bookmarks(request.user, iter_bookmarks(upload.file, file_format, name=upload.name))
+        except ImportFormatError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(stats)
+
+class ImportJobView(generics.RetrieveAPIView):
+    """Статус и прогресс фоновой задачи импорта закладок"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ImportJobSerializer
+    lookup_field = 'id'
+    lookup_url_kwarg = 'job_id'
+    
+    def get_queryset(self):
+        return ImportJob.objects.filter(user=self.request.user)
+
+class ParseJobView(generics.RetrieveAPIView):
+    """Статус и результат фоновой задачи парсинга"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ParseJobSerializer
+    lookup_field = 'id'
+    lookup_url_kwarg = 'job_id'
+    
+    def get_queryset(self):
+        return ParseJob.objects.filter(user=self.request.user).select_related('content_item')
+
+class DeletionJobView(generics.RetrieveAPIView):
+    """Статус и прогресс фоновой задачи удаления"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = DeletionJobSerializer
+    lookup_field = 'id'
+    lookup_url_kwarg = 'job_id'
+    
+    def get_queryset(self):
+        return DeletionJob.objects.filter(requested_by=self.request.user)
+
+class UpstreamMetricsView(generics.GenericAPIView):
+    """Метрики исходящих запросов по upstream (задержки, ошибки, circuit breaker)"""
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        from . import http_client
+        return Response(http_client.get_metrics())
+
 class ExternalSearchView(generics.GenericAPIView):
     """Поиск контента во внешних источниках"""
     permission_classes = [permissions.IsAuthenticated]
@@ -265,37 +562,62 @@ class ExternalSearchView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Пример использования NewsAPI
-        news_client = NewsAPIClient() # pyright: ignore[reportUndefinedVariable]
-        articles = news_client.search_articles(query, page_size=5)
-        
-        # Пример использования YouTube API
-        youtube_client = YouTubeAPIClient() # pyright: ignore[reportUndefinedVariable]
-        videos = youtube_client.search_videos(query, max_results=3)
-        
-        results = {
-            'query': query,
-            'articles': articles if not isinstance(articles, dict) or 'error' not in articles else [],
-            'videos': videos,
-            'total_results': (0 if isinstance(articles, dict) and 'error' in articles else len(articles)) + len(videos)
-        }
-        
-        return Response(results)
+        # Провайдеры опрашиваются параллельно, опоздавшие не задерживают ответ
+        return Response(external_search.search(query))
 
 class AnalyticsView(generics.GenericAPIView):
     """Аналитика контента с использованием pandas"""
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        analyzer = ContentAnalyzer() # pyright: ignore[reportUndefinedVariable]
-        analyzer.load_data(ContentItem.objects.all())
+        # Все чтения - из снимка базы, чтобы дашборды не задерживали запись
+        with analytics_reads():
+            return self._get_stats(request)
+    
+    def _get_stats(self, request):
+        analyzer = ContentAnalyzer()
+        
+        # ?source=snapshot - читаем колоночный снимок вместо живых таблиц
+        source = request.query_params.get('source', 'db')
+        if source == 'snapshot':
+            try:
+                analyzer.load_snapshot()
+            except FileNotFoundError:
+                return Response(
+                    {'error': 'Снимок аналитики не найден, выполните export_analytics_snapshot'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        else:
+            analyzer.load_data(ContentItem.objects.all())
         
         stats = {
             'monthly_stats': analyzer.get_monthly_stats(),
             'content_type_distribution': analyzer.get_content_type_distribution(),
-            'total_items': ContentItem.objects.count(),
-            'unique_users': ContentItem.objects.values('user').distinct().count(),
+            'cohorts': analyzer.get_cohort_matrix(),
+            'time_to_complete': analyzer.get_time_to_complete_distribution(),
+            'source': source,
         }
+        # Итоги - на момент снимка (из meta.json) или из денормализованных счетчиков
+        if analyzer.snapshot_meta:
+            stats['total_items'] = analyzer.snapshot_meta['rows']
+            stats['unique_users'] = analyzer.snapshot_meta.get('users', int(analyzer.df['user'].nunique()))
+        else:
+            stats['total_items'] = counters.get(counters.ITEMS)
+            stats['unique_users'] = counters.get(counters.USERS)
+        
+        # ?approximate=true - уникальные пользователи и теги из скетчей (постоянное время)
+        if request.query_params.get('approximate', '').lower() in ('1', 'true', 'yes'):
+            category_names = dict(Category.objects.values_list('id', 'name'))
+            by_category = sketches.estimate_unique_users_by_prefix('users:category:')
+            stats['approximate'] = True
+            stats['unique_users'] = sketches.estimate_unique_users()
+            stats['unique_users_by_month'] = sketches.estimate_unique_users_by_prefix('users:month:')
+            stats['unique_users_by_category'] = {
+                category_names.get(int(cat_id), cat_id): count for cat_id, count in by_category.items()
+            }
+            stats['top_tags'] = [{'name': name, 'count': count} for name, count in sketches.top_tags(10)]
+        if analyzer.snapshot_meta:
+            stats['snapshot_generated_at'] = analyzer.snapshot_meta['generated_at']
         
         # Если пользователь авторизован, добавляем персонализированные рекомендации
         if request.user.is_authenticated:
@@ -309,7 +631,11 @@ class VisualizationView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
     def get(self, request):
-        from .visualizations import ContentVisualizer # pyright: ignore[reportMissingImports]
+        with analytics_reads():
+            return self._get_charts(request)
+    
+    def _get_charts(self, request):
+        from .vizualizations import ContentVisualizer
         
         chart_type = request.query_params.get('type', 'all')
         
@@ -322,7 +648,8 @@ class VisualizationView(generics.GenericAPIView):
             return Response({'chart': fig.to_json()})
         
         elif chart_type == 'tag_cloud':
-            data = ContentVisualizer.create_tag_cloud_data()
+            approximate = request.query_params.get('approximate', '').lower() in ('1', 'true', 'yes')
+            data = ContentVisualizer.create_tag_cloud_data(approximate=approximate)
             return Response({'data': data})
         
         elif chart_type == 'categories':
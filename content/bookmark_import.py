@@ -0,0 +1,556 @@
+"""
+Импорт закладок из файлов экспорта браузеров и read-later сервисов.
+
+Форматы: Netscape bookmark HTML (Chrome, Firefox, Safari, Pinboard),
+CSV (Pocket, Instapaper, Raindrop) и JSON (массив объектов или объект
+Pocket). Файл читается потоком (включая список внутри объекта-обертки): парсеры - генераторы строк, импорт идет
+чанками по BOOKMARK_IMPORT_CHUNK_SIZE строк, поэтому память не зависит
+от размера файла. Сеть не используется - страницы не загружаются.
+
+Чанк - одна транзакция: ресурсы (content.resources.resolve), bulk_create
+элементов, пакетные теги (content.tagging) и обновление производных
+структур, которые bulk_create обходит (SimHash, счетчики, скетчи,
+частоты терминов). Папки закладок сопоставляются с категориями по имени или slug; для
+остальных категорию предлагает классификатор (content.classifier).
+
+Запуск - API загрузки файла (BookmarkImportView) и команда import_bookmarks.
+Файл больше BOOKMARK_IMPORT_SYNC_BYTES API сохраняет на диск
+(BOOKMARK_IMPORT_DIR, общий для веб-процесса и пула) и импортирует задачей
+ImportJob в пуле 'imports'; прогресс - прочитанные байты файла.
+"""
+import csv
+import io
+import json
+import os
+import re
+import tempfile
+from collections import Counter
+from html.parser import HTMLParser
+from itertools import islice
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.core.exceptions import ValidationError # pyright: ignore[reportMissingModuleSource]
+from django.core.validators import URLValidator # pyright: ignore[reportMissingModuleSource]
+from django.db import transaction # pyright: ignore[reportMissingModuleSource]
+from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+
+READ_CHUNK = 64 * 1024
+FORMATS = ('netscape', 'csv', 'json')
+TAG_SPLIT_RE = re.compile(r'[,|]')
+
+# Значения статуса в экспортах, означающие "прочитано"
+COMPLETED_VALUES = {'archive', 'archived', 'read', 'done', 'completed', '1', 'true'}
+
+# Колонки CSV / ключи JSON разных сервисов
+URL_KEYS = ('url', 'href', 'link', 'given_url', 'resolved_url')
+TITLE_KEYS = ('title', 'name', 'given_title', 'resolved_title')
+DESCRIPTION_KEYS = ('description', 'excerpt', 'note', 'selection', 'extended')
+TAG_KEYS = ('tags', 'tag', 'labels')
+FOLDER_KEYS = ('folder', 'collection', 'category')
+STATUS_KEYS = ('status', 'archived', 'read', 'is_archived')
+
+
+class ImportFormatError(ValueError):
+    """Файл не разобран: неизвестный формат или поврежденные данные"""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _status(value):
+    return 'completed' if str(value).strip().lower() in COMPLETED_VALUES else 'new'
+
+
+def _tags(value):
+    """Теги из строки 'a,b' / 'a|b', списка строк или объектов, словаря Pocket"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [tag.strip() for tag in TAG_SPLIT_RE.split(value) if tag.strip()]
+    if isinstance(value, dict):
+        value = list(value)
+    tags = []
+    for tag in value:
+        if isinstance(tag, dict):
+            tag = tag.get('name') or tag.get('tag') or ''
+        if str(tag).strip():
+            tags.append(str(tag).strip())
+    return tags
+
+
+def _first(mapping, keys):
+    for key in keys:
+        value = mapping.get(key)
+        if value not in (None, ''):
+            return value
+    return ''
+
+
+def _row(mapping):
+    """Строка импорта из записи CSV / JSON (ключи без учета регистра)"""
+    mapping = {str(key).strip().lower(): value for key, value in mapping.items()}
+    folder = _first(mapping, FOLDER_KEYS)
+    return {
+        'url': str(_first(mapping, URL_KEYS)).strip(),
+        'title': str(_first(mapping, TITLE_KEYS)).strip(),
+        'description': str(_first(mapping, DESCRIPTION_KEYS)).strip(),
+        'tags': _tags(_first(mapping, TAG_KEYS)),
+        'folders': [str(folder).strip()] if folder else [],
+        'status': _status(_first(mapping, STATUS_KEYS)),
+    }
+
+
+class NetscapeBookmarkParser(HTMLParser):
+    """
+    Инкрементальный разбор Netscape bookmark HTML: <DT><A HREF TAGS>,
+    описание в <DD>, папки <H3> с вложенными <DL>. Готовые строки
+    накапливаются в rows; строка выдается, когда ее описание уже прочитано.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self._folders = []
+        self._pending_folder = None
+        self._folder_parts = None
+        self._current = None
+        self._title_parts = None
+        self._description_parts = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self._finish_row()
+            attrs = dict(attrs)
+            self._current = {
+                'url': (attrs.get('href') or '').strip(),
+                'title': '',
+                'description': '',
+                'tags': _tags(attrs.get('tags') or ''),
+                'folders': [folder for folder in reversed(self._folders) if folder],
+                'status': 'new',
+            }
+            self._title_parts = []
+        elif tag == 'dd' and self._current is not None:
+            self._description_parts = []
+        elif tag == 'h3':
+            self._finish_row()
+            self._folder_parts = []
+        elif tag == 'dl':
+            self._finish_row()
+            self._folders.append(self._pending_folder)
+            self._pending_folder = None
+        elif tag == 'dt':
+            self._finish_row()
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._title_parts is not None:
+            self._current['title'] = ' '.join(''.join(self._title_parts).split())
+            self._title_parts = None
+        elif tag == 'h3' and self._folder_parts is not None:
+            self._pending_folder = ' '.join(''.join(self._folder_parts).split())
+            self._folder_parts = None
+        elif tag == 'dl':
+            self._finish_row()
+            if self._folders:
+                self._folders.pop()
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        elif self._folder_parts is not None:
+            self._folder_parts.append(data)
+        elif self._description_parts is not None:
+            self._description_parts.append(data)
+
+    def _finish_row(self):
+        if self._current is None:
+            return
+        if self._title_parts is not None:
+            self._current['title'] = ' '.join(''.join(self._title_parts).split())
+            self._title_parts = None
+        if self._description_parts is not None:
+            self._current['description'] = ' '.join(''.join(self._description_parts).split())
+            self._description_parts = None
+        self.rows.append(self._current)
+        self._current = None
+
+    def close(self):
+        super().close()
+        self._finish_row()
+
+
+def iter_netscape(stream):
+    parser = NetscapeBookmarkParser()
+    while True:
+        chunk = stream.read(READ_CHUNK)
+        if not chunk:
+            break
+        parser.feed(chunk)
+        yield from parser.rows
+        parser.rows.clear()
+    parser.close()
+    yield from parser.rows
+
+
+def iter_csv(stream):
+    reader = csv.DictReader(stream)
+    if not reader.fieldnames or not {name.strip().lower() for name in reader.fieldnames} & set(URL_KEYS):
+        raise ImportFormatError('В CSV нет колонки с URL')
+    for record in reader:
+        yield _row({key: value for key, value in record.items() if key is not None})
+
+
+# Ключи объекта-обертки со списком закладок ({"list": {id: {...}}} у Pocket)
+WRAPPER_KEYS = ('list', 'bookmarks', 'items', 'links', 'data')
+JSON_SPACE = ' \t\r\n'
+
+
+class _JsonReader:
+    """Чтение JSON по значениям (raw_decode по буферу) с дочитыванием из потока"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.stream.read(READ_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self, skip=JSON_SPACE):
+        """Следующий символ после пропуска skip ('' в конце данных)"""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in skip:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                return ''
+
+    def take(self, expected):
+        found = self.peek()
+        if not found:
+            raise ImportFormatError('Некорректный JSON: неожиданный конец данных')
+        if found != expected:
+            raise ImportFormatError(f'Некорректный JSON: ожидается {expected!r}')
+        self.position += 1
+
+    def value(self):
+        """Следующее значение целиком (строка, число, запись)"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as e:
+                error = e
+            else:
+                # Число на границе буфера могло быть прочитано не полностью
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+                error = None
+            if not self._fill() and error is not None:
+                raise ImportFormatError(f'Некорректный JSON: {error}')
+
+
+def _iter_array(reader):
+    reader.take('[')
+    while reader.peek(JSON_SPACE + ',') not in (']', ''):
+        item = reader.value()
+        if isinstance(item, dict):
+            yield _row(item)
+    reader.take(']')
+
+
+def _iter_object_values(reader):
+    reader.take('{')
+    while reader.peek(JSON_SPACE + ',') not in ('}', ''):
+        reader.value()
+        reader.take(':')
+        item = reader.value()
+        if isinstance(item, dict):
+            yield _row(item)
+    reader.take('}')
+
+
+def iter_json(stream):
+    """
+    Записи JSON по одной, без загрузки всего файла: массив верхнего уровня
+    или список (массив либо объект {id: запись}) под ключом WRAPPER_KEYS
+    объекта-обертки. Остальные значения обертки читаются и пропускаются.
+    """
+    reader = _JsonReader(stream)
+    first = reader.peek('\ufeff' + JSON_SPACE)
+    if first == '[':
+        yield from _iter_array(reader)
+        return
+    if first != '{':
+        raise ImportFormatError('Ожидается JSON-массив или объект')
+
+    reader.take('{')
+    while reader.peek(JSON_SPACE + ',') not in ('}', ''):
+        key = reader.value()
+        reader.take(':')
+        kind = reader.peek()
+        if key in WRAPPER_KEYS and kind == '[':
+            yield from _iter_array(reader)
+            return
+        if key in WRAPPER_KEYS and kind == '{':
+            yield from _iter_object_values(reader)
+            return
+        reader.value()
+    raise ImportFormatError('В JSON не найден список закладок')
+
+
+PARSERS = {
+    'netscape': iter_netscape,
+    'csv': iter_csv,
+    'json': iter_json,
+}
+
+
+def detect_format(name='', head=b''):
+    """Формат по расширению файла, иначе по первому значимому символу"""
+    name = (name or '').lower()
+    if name.endswith(('.html', '.htm')):
+        return 'netscape'
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith('.json'):
+        return 'json'
+    head = head.lstrip(b'\xef\xbb\xbf \t\r\n')
+    if head.startswith(b'<'):
+        return 'netscape'
+    if head.startswith((b'[', b'{')):
+        return 'json'
+    return 'csv'
+
+
+def iter_bookmarks(binary_file, file_format=None, name=''):
+    """
+    Строки импорта из бинарного файла: {'url', 'title', 'description',
+    'tags', 'folders', 'status'}. Без file_format формат определяется по
+    имени или началу файла (файл должен поддерживать seek).
+    """
+    if file_format is None:
+        head = binary_file.read(1024)
+        binary_file.seek(0)
+        file_format = detect_format(name, head)
+    if file_format not in PARSERS:
+        raise ImportFormatError(f'Неизвестный формат: {file_format}')
+    stream = io.TextIOWrapper(binary_file, encoding='utf-8-sig', errors='replace', newline='')
+    try:
+        yield from PARSERS[file_format](stream)
+    finally:
+        # Файл закрывает вызывающий
+        stream.detach()
+
+
+def _chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _create_chunk(user, rows, categories):
+    """Создание элементов одного чанка в одной транзакции"""
+    from . import classifier, counters, keywords, resources, simhash, sketches, tagging
+    from .models import ContentItem
+    from .parsing import detect_content_type
+
+    for row in rows:
+        row['title'] = (row['title'] or row['url'])[:200]
+        row['content_type'] = detect_content_type(row['url'])
+        row['category_id'] = next(
+            (categories[folder.lower()] for folder in row['folders'] if folder.lower() in categories), None
+        )
+
+    # Без тегов - автотеги, без подходящей папки - категория от классификатора
+    untagged = [row for row in rows if not row['tags']]
+    for row, tags in zip(untagged, keywords.suggest_batch([(row['title'], row['description']) for row in untagged])):
+        row['tags'] = tags
+    uncategorized = [row for row in rows if row['category_id'] is None]
+    predicted = classifier.predict_categories(
+        [(row['title'], row['description'], row['tags']) for row in uncategorized],
+        known_ids=set(categories.values()),
+    )
+    for row, category_id in zip(uncategorized, predicted):
+        row['category_id'] = category_id
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Описание из файла - заметка пользователя: остается в закладке, не в ресурсе
+        linked = resources.resolve(
+            (row['url'], {'title': row['title'], 'content_type': row['content_type']}) for row in rows
+        )
+        items = ContentItem.objects.bulk_create([
+            ContentItem(
+                user=user,
+                title=row['title'],
+                url=row['url'],
+                description=resources.own_description(row['description'], linked[row['url']]),
+                content_type=row['content_type'],
+                category_id=row['category_id'],
+                status=row['status'],
+                # bulk_create не вызывает save() - дата завершения и отпечаток здесь
+                completed_at=now if row['status'] == 'completed' else None,
+                resource=linked[row['url']],
+                **simhash.fingerprint_fields(row['title'], row['description']),
+            )
+            for row in rows
+        ])
+        counters.add_items(items)
+        tagging.assign_tags((item, row['tags']) for item, row in zip(items, rows))
+        sketches.record_content_items((item.user_id, item.created_at, item.category_id) for item in items)
+        keywords.record_items(items)
+    return items
+
+
+def import_bookmarks(user, rows, chunk_size=None, progress=None):
+    """
+    Импорт строк закладок для пользователя чанками.
+
+    Ссылки, уже сохраненные пользователем или повторяющиеся в файле (с
+    точностью до нормализации URL), пропускаются. progress(stats)
+    вызывается после каждого чанка. Возвращает статистику: total,
+    created, duplicate, invalid.
+    """
+    from .models import Category, ContentItem
+    from .urlnorm import url_hash
+
+    chunk_size = chunk_size or _setting('BOOKMARK_IMPORT_CHUNK_SIZE', 1000)
+    categories = {}
+    for category_id, name, slug in Category.objects.values_list('pk', 'name', 'slug'):
+        categories[name.lower()] = category_id
+        categories[slug.lower()] = category_id
+
+    stats = Counter(total=0, created=0, duplicate=0, invalid=0)
+    seen = set()
+    validate = URLValidator()
+    for chunk in _chunked(rows, chunk_size):
+        prepared = {}
+        for row in chunk:
+            stats['total'] += 1
+            url = row['url']
+            try:
+                validate(url)
+            except ValidationError:
+                stats['invalid'] += 1
+                continue
+            if len(url) > 500:
+                stats['invalid'] += 1
+                continue
+            key = url_hash(url)
+            if key in seen:
+                stats['duplicate'] += 1
+                continue
+            seen.add(key)
+            prepared[key] = row
+
+        saved = set(
+            ContentItem.objects.filter(user=user, resource__url_hash__in=list(prepared))
+            .values_list('resource__url_hash', flat=True)
+        )
+        stats['duplicate'] += len(saved)
+        new_rows = [row for key, row in prepared.items() if key not in saved]
+        if new_rows:
+            stats['created'] += len(_create_chunk(user, new_rows, categories))
+        if progress is not None:
+            progress(dict(stats))
+
+    return dict(stats)
+
+
+
+def start_import(user, upload, file_format=None, background=True):
+    """Сохранить загруженный файл и поставить его импорт в очередь (ImportJob)"""
+    from . import jobs
+    from .models import ImportJob
+
+    directory = _setting('BOOKMARK_IMPORT_DIR', os.path.join(tempfile.gettempdir(), 'bookmark_imports'))
+    os.makedirs(directory, exist_ok=True)
+    job = ImportJob(user=user, name=(upload.name or '')[:255], file_format=file_format or '', size=upload.size)
+    job.path = os.path.join(directory, str(job.id))
+    with open(job.path, 'wb') as target:
+        for chunk in upload.chunks():
+            target.write(chunk)
+    job.save()
+    if background:
+        jobs.submit('imports', run_import_job, job.pk, max_workers=_setting('BOOKMARK_IMPORT_JOB_WORKERS', 1))
+    return job
+
+
+def run_import_job(job_id):
+    """Выполнение задачи импорта: статистика и прочитанные байты - после каждого чанка"""
+    from .models import ImportJob
+
+    # Задачу берет только один исполнитель (она могла быть поставлена повторно recover_jobs)
+    if not ImportJob.objects.filter(pk=job_id, status='pending').update(status='running', started_at=timezone.now()):
+        return ImportJob.objects.get(pk=job_id)
+    job = ImportJob.objects.select_related('user').get(pk=job_id)
+
+    try:
+        with open(job.path, 'rb') as binary_file:
+            def progress(stats):
+                ImportJob.objects.filter(pk=job.pk).update(processed_bytes=binary_file.tell(), **stats)
+
+            stats = import_bookmarks(
+                job.user, iter_bookmarks(binary_file, job.file_format or None, name=job.name), progress=progress
+            )
+        for field, value in stats.items():
+            setattr(job, field, value)
+        job.processed_bytes = job.size
+        job.status = 'done'
+    except ImportFormatError as e:
+        job.status = 'failed'
+        job.error = str(e)
+    except Exception as e:
+        job.status = 'failed'
+        job.error = f'Ошибка при импорте: {str(e)}'
+    finally:
+        try:
+            os.remove(job.path)
+        except OSError:
+            pass
+
+    if job.status == 'failed':
+        # Статистика уже импортированных чанков
+        job.refresh_from_db(fields=['total', 'created', 'duplicate', 'invalid', 'processed_bytes'])
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'total', 'created', 'duplicate', 'invalid', 'processed_bytes', 'error', 'finished_at'
+    ])
+    return job
+
+
+def expire_import_jobs(timeout=None):
+    """
+    Пометить failed импорты, которые выполняются дольше timeout секунд с
+    запуска, и удалить их файлы. Возвращает их число
+    """
+    from datetime import timedelta
+    from .models import ImportJob
+
+    if timeout is None:
+        timeout = _setting('BOOKMARK_IMPORT_JOB_TIMEOUT', 3600)
+    now = timezone.now()
+    stale = ImportJob.objects.filter(status='running', started_at__lt=now - timedelta(seconds=timeout))
+    paths = list(stale.values_list('path', flat=True))
+    expired = stale.update(status='failed', error='Задача прервана: превышено время выполнения', finished_at=now)
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return expired
@@ -0,0 +1,78 @@
+"""
+Массовые операции над элементами контента (API bulk_update / bulk_delete).
+
+Вместо save() и delete() по одному элементу - UPDATE и DELETE по набору
+строк в одной транзакции. Набор - queryset, уже ограниченный владельцем,
+так что проверка прав входит в тот же запрос. Логика completed_at из
+ContentItem.save выражена в SQL: при переходе в completed дата
+сохраняется, если уже была, иначе ставится текущая; для других
+статусов сбрасывается.
+
+Набор читается один раз (id), дальше все шаги работают по этим id: фильтр
+набора может зависеть от меняемых тегов и статуса, и повторный запрос
+после первого шага нашел бы другие строки.
+"""
+from django.db import models, transaction # pyright: ignore[reportMissingModuleSource]
+from django.db.models.functions import Coalesce # pyright: ignore[reportMissingModuleSource]
+from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+
+from . import counters, keywords, sketches, tagging
+
+# Категория не меняется (None - снять категорию)
+UNCHANGED = object()
+# id в одном UPDATE ... WHERE id IN (...)
+QUERY_CHUNK = 500
+
+
+def update_items(queryset, status=None, category_id=UNCHANGED, add_tags=(), remove_tags=()):
+    """
+    Изменить статус, категорию и теги набора элементов.
+    Возвращает {'updated', 'tags_added', 'tags_removed'}.
+    """
+    now = timezone.now()
+    fields = {'updated_at': now}
+    if status is not None:
+        fields['status'] = status
+        fields['completed_at'] = (
+            Coalesce('completed_at', models.Value(now, output_field=models.DateTimeField()))
+            if status == 'completed' else None
+        )
+    if category_id is not UNCHANGED:
+        fields['category_id'] = category_id
+
+    counted = status is not None or category_id is not UNCHANGED
+    result = {'updated': 0, 'tags_added': 0, 'tags_removed': 0}
+    with transaction.atomic():
+        ids = list(queryset.values_list('pk', flat=True))
+        if remove_tags:
+            result['tags_removed'] = tagging.remove_tags(ids, remove_tags)
+        if add_tags:
+            result['tags_added'] = tagging.assign_tags(
+                (queryset.model(pk=pk), add_tags) for pk in ids
+            )
+        # Счетчики: набор вычитается до UPDATE и прибавляется после (по тем же id).
+        # Теги по категориям меняются только вместе с категорией
+        with_tags = category_id is not UNCHANGED
+        deltas = counters.ids_deltas(ids, -1, with_tags) if counted else None
+        for start in range(0, len(ids), QUERY_CHUNK):
+            chunk = queryset.model.objects.filter(pk__in=ids[start:start + QUERY_CHUNK])
+            result['updated'] += chunk.update(**fields)
+            if category_id not in (None, UNCHANGED):
+                # Пользователи - в скетч новой категории (post_save при UPDATE не срабатывает)
+                sketches.record_content_items(chunk.values_list('user_id', 'created_at', 'category_id'))
+        if counted:
+            deltas.update(counters.ids_deltas(ids, with_tags=with_tags))
+            counters.apply(deltas)
+    return result
+
+
+def delete_items(queryset):
+    """Удалить набор элементов вместе со связанными строками. Возвращает число элементов"""
+    with transaction.atomic():
+        counters.remove_queryset(queryset)
+        keywords.remove_queryset(queryset)
+        # Счетчики и частоты терминов уже вычтены пачкой - сигнал по каждому элементу не нужен,
+        # поэтому коллектору каскада достаточно id
+        with counters.suspended():
+            _, per_model = queryset.only('pk').delete()
+    return per_model.get(queryset.model._meta.label, 0)
@@ -0,0 +1,229 @@
+"""
+Массовый импорт URL (списки чтения).
+
+Страницы загружаются параллельно (content.fetching) с общим лимитом,
+лимитом на хост и дедлайнами, разбираются той же логикой, что и в
+ParseContentView (content.parsing), а элементы создаются через bulk_create.
+Свежие записи кэша метаданных (content.url_cache) не загружаются вовсе,
+устаревшие перепроверяются условным GET. Большие списки импортируются в
+фоне (BatchImportJob, content.jobs) со своим дедлайном.
+"""
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.core.exceptions import ValidationError # pyright: ignore[reportMissingModuleSource]
+from django.core.validators import URLValidator # pyright: ignore[reportMissingModuleSource]
+from django.db import transaction # pyright: ignore[reportMissingModuleSource]
+from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+
+from .fetching import DeadlineExceeded, run_concurrently
+from .models import Category, ContentItem
+from .parsing import build_content_data, fetch_metadata_conditional
+from . import classifier, counters, keywords, page_text, resources, simhash, sketches, tagging, url_cache
+from .urlnorm import url_hash
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def import_urls(user, urls, max_workers=None, per_host=None, timeout=None, deadline=None):
+    """
+    Импорт списка URL для пользователя.
+
+    Возвращает отчет: список {'url', 'status', 'id' | 'error'} в порядке
+    входного списка. Статусы: created, invalid, duplicate (та же ссылка),
+    failed, timeout; у созданных почти-дубликатов - еще duplicate_of (id
+    сохраненного элемента) или similar_to (ссылка из той же пачки).
+    """
+    max_workers = max_workers or _setting('BULK_IMPORT_CONCURRENCY', 32)
+    per_host = per_host or _setting('BULK_IMPORT_PER_HOST', 4)
+    timeout = timeout or _setting('BULK_IMPORT_TIMEOUT', 10)
+    deadline = deadline or _setting('BULK_IMPORT_DEADLINE', 120)
+
+    report = {}
+    seen = set()
+    validate = URLValidator()
+    for raw_url in urls:
+        url = (raw_url or '').strip()
+        if not url or url in report:
+            continue
+        try:
+            validate(url)
+        except ValidationError:
+            report[url] = {'url': url, 'status': 'invalid', 'error': 'Некорректный URL'}
+            continue
+        key = url_hash(url)
+        if key in seen:
+            report[url] = {'url': url, 'status': 'duplicate', 'error': 'Ссылка уже есть в списке'}
+            continue
+        seen.add(key)
+        report[url] = None
+
+    # Уже сохраненные пользователем ссылки (с точностью до нормализации) не загружаем повторно
+    candidates = [url for url, entry in report.items() if entry is None]
+    saved_hashes = set(
+        ContentItem.objects.filter(user=user, resource__url_hash__in=[url_hash(url) for url in candidates])
+        .values_list('resource__url_hash', flat=True)
+    )
+    existing = {url for url in candidates if url_hash(url) in saved_hashes}
+    for url in existing:
+        report[url] = {'url': url, 'status': 'duplicate', 'error': 'Ссылка уже сохранена'}
+    to_parse = [url for url in candidates if url not in existing]
+
+    # Кэш читаем в основном потоке, в пул уходят только сетевые запросы
+    cached = url_cache.lookup(to_parse)
+    fresh = {url: entry for url, entry in cached.items() if url_cache.is_fresh(entry)}
+    to_fetch = [url for url in to_parse if url not in fresh]
+
+    results = run_concurrently(
+        to_fetch,
+        lambda url: fetch_metadata_conditional(url, timeout=timeout, **url_cache.validators(cached.get(url))),
+        max_workers=max_workers, per_host=per_host, deadline=deadline
+    )
+
+    # Разбор и подготовка строк (один запрос за категориями на всю пачку)
+    categories = {c.slug: c for c in Category.objects.all()}
+    prepared = []
+    for url in to_parse:
+        if url in fresh:
+            prepared.append(build_content_data(url, fresh[url].as_metadata(), categories=categories))
+            continue
+
+        page, error = results[url]
+        if isinstance(error, DeadlineExceeded):
+            report[url] = {'url': url, 'status': 'timeout', 'error': str(error)}
+            continue
+        if error is not None:
+            report[url] = {'url': url, 'status': 'failed', 'error': f'Ошибка при загрузке URL: {error}'}
+            continue
+        try:
+            metadata = url_cache.apply_response(url, cached.get(url), page)
+            data = build_content_data(url, metadata, categories=categories)
+        except Exception as e:
+            report[url] = {'url': url, 'status': 'failed', 'error': f'Ошибка при парсинге: {e}'}
+            continue
+        prepared.append(data)
+
+    # Почти-дубликаты (SimHash) по другим ссылкам сохраняются, но помечаются в отчете:
+    # среди сохраненного пользователем - id, внутри пачки - первая похожая ссылка
+    fingerprints = [simhash.fingerprint(row['title'] or row['url'], row['description']) for row in prepared]
+    existing_matches = simhash.match_existing(user.id, fingerprints)
+    batch_matches = simhash.dedupe_batch(fingerprints)
+    new_rows = []
+    similar = {}
+    for row, value, existing_id, batch_position in zip(prepared, fingerprints, existing_matches, batch_matches):
+        if existing_id is not None:
+            similar[row['url']] = {'duplicate_of': existing_id}
+        elif batch_position is not None:
+            similar[row['url']] = {'similar_to': prepared[batch_position]['url']}
+        new_rows.append({**row, 'fingerprint': value})
+
+    # Страницы без meta keywords получают автотеги (TF-IDF одной пачкой)
+    untagged = [row for row in new_rows if not row['tags']]
+    texts = page_text.texts_for_urls(row['url'] for row in untagged) if _setting('PAGE_TEXT_ENABLED', False) else {}
+    suggestions = keywords.suggest_batch(
+        [(row['title'], row['description'], texts.get(row['url'], '')) for row in untagged]
+    )
+    for row, tags in zip(untagged, suggestions):
+        row['tags'] = tags
+
+    # Категория - по классификатору, если он уверен; иначе остается эвристика по URL
+    predicted = classifier.predict_categories(
+        [(row['title'], row['description'], row['tags']) for row in new_rows],
+        known_ids={category.id for category in categories.values()},
+    )
+    for row, category_id in zip(new_rows, predicted):
+        if category_id is not None:
+            row['category_id'] = category_id
+
+    created = create_items(user, new_rows)
+    for item in created:
+        report[item.url] = {'url': item.url, 'status': 'created', 'id': item.id, **similar.get(item.url, {})}
+
+    return [entry for entry in report.values() if entry is not None]
+
+
+def create_items(user, rows):
+    """Создание элементов пачкой: ресурсы + bulk_create + теги + скетчи и частоты терминов"""
+    if not rows:
+        return []
+
+    linked = resources.resolve((row['url'], row) for row in rows)
+    items = [
+        ContentItem(
+            user=user,
+            title=row['title'] or row['url'][:200],
+            url=row['url'],
+            description=resources.own_description(row['description'], linked[row['url']]),
+            content_type=row['content_type'],
+            category_id=row['category_id'],
+            status=row['status'],
+            resource=linked[row['url']],
+            # bulk_create не вызывает save() - отпечаток считаем здесь
+            **simhash.columns(
+                row['fingerprint'] if 'fingerprint' in row
+                else simhash.fingerprint(row['title'] or row['url'][:200], row['description'])
+            ),
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        items = ContentItem.objects.bulk_create(items)
+        # bulk_create не вызывает post_save - счетчики и скетчи обновляем пачкой
+        counters.add_items(items)
+        tagging.assign_tags((item, row['tags']) for item, row in zip(items, rows))
+        sketches.record_content_items(
+            (item.user_id, item.created_at, item.category_id) for item in items
+        )
+        keywords.record_items(items)
+
+    return items
+
+
+def submit_batch(user, urls):
+    """Поставить импорт списка URL в очередь (BatchImportJob)"""
+    from . import jobs
+    from .models import BatchImportJob
+
+    job = BatchImportJob.objects.create(user=user, urls=list(urls), total=len(urls))
+    jobs.submit('batches', run_batch_job, job.pk, max_workers=_setting('BULK_IMPORT_JOB_WORKERS', 1))
+    return job
+
+
+def run_batch_job(job_id):
+    """Выполнение задачи массового импорта: отчет и число созданных - по завершении"""
+    from .models import BatchImportJob
+
+    # Задачу берет только один исполнитель (она могла быть поставлена повторно recover_jobs)
+    if not BatchImportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now()
+    ):
+        return BatchImportJob.objects.get(pk=job_id)
+    job = BatchImportJob.objects.select_related('user').get(pk=job_id)
+
+    try:
+        job.results = import_urls(job.user, job.urls, deadline=_setting('BULK_IMPORT_JOB_DEADLINE', 30 * 60))
+        job.created = sum(1 for entry in job.results if entry['status'] == 'created')
+        job.status = 'done'
+    except Exception as e:
+        job.status = 'failed'
+        job.error = f'Ошибка при импорте: {str(e)}'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'results', 'created', 'error', 'finished_at'])
+    return job
+
+
+def expire_batch_jobs(timeout=None):
+    """
+    Пометить failed задачи массового импорта, которые выполняются дольше
+    timeout секунд с запуска. Возвращает их число
+    """
+    from datetime import timedelta
+    from .models import BatchImportJob
+
+    if timeout is None:
+        timeout = _setting('BULK_IMPORT_JOB_TIMEOUT', 60 * 60)
+    now = timezone.now()
+    return BatchImportJob.objects.filter(
+        status='running', started_at__lt=now - timedelta(seconds=timeout)
+    ).update(status='failed', error='Задача прервана: превышено время выполнения', finished_at=now)
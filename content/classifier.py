@@ -0,0 +1,217 @@
+"""
+Автоматическая категоризация: мультиномиальный наивный Байес на NumPy.
+
+Признаки - термины заголовка и описания (content.keywords.terms) и теги,
+хешированные в FEATURES корзин (без словаря). Модель - априорные
+log-вероятности категорий и матрица log-вероятностей признаков
+(категорий x FEATURES, float32), обучается командой train_classifier по
+уже категоризированным ContentItem и хранится в одном .npz файле
+(CATEGORY_MODEL_PATH). Файл загружается один раз на процесс и
+перечитывается, только когда изменился.
+
+Предсказание пачки векторизовано: все документы - один разреженный набор
+(документ, признак, вес), оценки - одна выборка столбцов матрицы. Если
+модели нет или уверенность ниже CATEGORY_MIN_CONFIDENCE, категория
+остается за эвристикой по URL (parsing.detect_category_slug).
+"""
+import os
+import threading
+import zlib
+from pathlib import Path
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+
+from .keywords import terms
+
+FEATURES = 1 << 14
+TAG_WEIGHT = 2
+ALPHA = 1.0
+MODEL_VERSION = 1
+
+_lock = threading.Lock()
+_loaded = {'key': None, 'model': None}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def get_model_path():
+    return Path(_setting('CATEGORY_MODEL_PATH', settings.BASE_DIR / 'category_model.npz'))
+
+
+def features(title, description='', tags=()):
+    """Хешированные признаки документа: {номер корзины: вес}"""
+    weights = terms(title, description)
+    for tag in tags or ():
+        weights['#' + str(tag).lower()] += TAG_WEIGHT
+    result = {}
+    for term, weight in weights.items():
+        bucket = zlib.crc32(term.encode('utf-8')) % FEATURES
+        result[bucket] = result.get(bucket, 0) + weight
+    return result
+
+
+def _sparse(documents):
+    """Пачка документов (заголовок, описание, теги) -> массивы (документ, признак, вес)"""
+    import numpy as np # pyright: ignore[reportMissingImports]
+
+    doc_ids, feature_ids, counts = [], [], []
+    for position, (title, description, tags) in enumerate(documents):
+        for bucket, weight in features(title, description, tags).items():
+            doc_ids.append(position)
+            feature_ids.append(bucket)
+            counts.append(weight)
+    return (
+        np.array(doc_ids, dtype=np.int64),
+        np.array(feature_ids, dtype=np.int64),
+        np.array(counts, dtype=np.float32),
+    )
+
+
+class CategoryModel:
+    """Обученная модель: id категорий, log P(категория), log P(признак | категория)"""
+
+    def __init__(self, category_ids, log_prior, log_prob):
+        self.category_ids = category_ids
+        self.log_prior = log_prior
+        self.log_prob = log_prob
+
+    def predict(self, documents, min_confidence=0.0):
+        """id категории для каждого документа (None - нет признаков или мала уверенность)"""
+        import numpy as np # pyright: ignore[reportMissingImports]
+
+        doc_ids, feature_ids, counts = _sparse(documents)
+        scores = np.tile(self.log_prior, (len(documents), 1))
+        np.add.at(scores, doc_ids, (self.log_prob[:, feature_ids] * counts).T)
+
+        # Апостериорные вероятности (softmax по категориям)
+        scores -= scores.max(axis=1, keepdims=True)
+        posterior = np.exp(scores)
+        posterior /= posterior.sum(axis=1, keepdims=True)
+        best = posterior.argmax(axis=1)
+        confident = posterior[np.arange(len(documents)), best] >= min_confidence
+        has_features = np.bincount(doc_ids, minlength=len(documents)) > 0
+
+        return [
+            int(self.category_ids[index]) if ok else None
+            for index, ok in zip(best, confident & has_features)
+        ]
+
+    def save(self, path):
+        """Атомарная запись .npz (читатели видят либо старую, либо новую модель)"""
+        import numpy as np # pyright: ignore[reportMissingImports]
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f, version=np.array(MODEL_VERSION), category_ids=self.category_ids,
+                log_prior=self.log_prior, log_prob=self.log_prob,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np # pyright: ignore[reportMissingImports]
+
+        with np.load(path) as data:
+            if int(data['version']) != MODEL_VERSION or data['log_prob'].shape[1] != FEATURES:
+                return None
+            return cls(data['category_ids'], data['log_prior'], data['log_prob'])
+
+
+def load_model(path=None):
+    """Модель из файла (кэш процесса по пути и времени изменения; None - модели нет)"""
+    path = Path(path or get_model_path())
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if _loaded['key'] != key:
+            _loaded['model'] = CategoryModel.load(path)
+            _loaded['key'] = key
+        return _loaded['model']
+
+
+def train(path=None, chunk_size=5000, min_items=None):
+    """
+    Обучение по категоризированным элементам (чанками по id) и запись модели.
+
+    Возвращает {'items', 'categories'}; модель не записывается, если
+    примеров меньше min_items или категория всего одна.
+    """
+    import numpy as np # pyright: ignore[reportMissingImports]
+    from .models import Category, ContentItem
+    from .resources import FULL_DESCRIPTION
+
+    min_items = min_items if min_items is not None else _setting('CATEGORY_MODEL_MIN_ITEMS', 20)
+    category_ids = list(Category.objects.order_by('pk').values_list('pk', flat=True))
+    class_index = {category_id: index for index, category_id in enumerate(category_ids)}
+    counts = np.zeros((len(category_ids), FEATURES), dtype=np.float64)
+    documents_per_class = np.zeros(len(category_ids), dtype=np.int64)
+    TaggedItem = ContentItem.tags.through
+
+    last_id = 0
+    while True:
+        rows = list(
+            ContentItem.objects.filter(pk__gt=last_id, category__in=category_ids)
+            .order_by('pk').values_list('pk', 'title', FULL_DESCRIPTION, 'category_id')[:chunk_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        tags = {}
+        tagged = TaggedItem.objects.filter(
+            content_type__app_label='content', content_type__model='contentitem',
+            object_id__in=[pk for pk, *_ in rows],
+        ).values_list('object_id', 'tag__name')
+        for object_id, name in tagged:
+            tags.setdefault(object_id, []).append(name)
+
+        doc_ids, feature_ids, weights = _sparse(
+            [(title, description, tags.get(pk, ())) for pk, title, description, _ in rows]
+        )
+        classes = np.array([class_index[category_id] for *_, category_id in rows], dtype=np.int64)
+        np.add.at(counts, (classes[doc_ids], feature_ids), weights)
+        documents_per_class += np.bincount(classes, minlength=len(category_ids))
+
+    present = documents_per_class > 0
+    total = int(documents_per_class.sum())
+    stats = {'items': total, 'categories': int(present.sum())}
+    if total < min_items or stats['categories'] < 2:
+        return stats
+
+    counts = counts[present]
+    log_prior = np.log(documents_per_class[present] / total)
+    log_prob = np.log((counts + ALPHA) / (counts.sum(axis=1, keepdims=True) + ALPHA * FEATURES))
+    model = CategoryModel(
+        np.array(category_ids, dtype=np.int64)[present],
+        log_prior.astype(np.float32), log_prob.astype(np.float32),
+    )
+    model.save(path or get_model_path())
+    stats['saved'] = True
+    return stats
+
+
+def predict_categories(documents, known_ids=None):
+    """
+    Категории для пачки документов (заголовок, описание, теги): список id
+    или None. known_ids - существующие категории (иначе один запрос).
+    """
+    model = load_model()
+    if model is None or not documents:
+        return [None] * len(documents)
+
+    predicted = model.predict(documents, min_confidence=_setting('CATEGORY_MIN_CONFIDENCE', 0.6))
+    if known_ids is None and any(pk is not None for pk in predicted):
+        from .models import Category
+        known_ids = set(
+            Category.objects.filter(pk__in={pk for pk in predicted if pk is not None}).values_list('pk', flat=True)
+        )
+    # Категория могла быть удалена после обучения
+    return [pk if pk is not None and pk in known_ids else None for pk in predicted]
@@ -0,0 +1,285 @@
+"""
+Денормализованные счетчики для главной, облака тегов и страниц категорий.
+
+Таблица Counter - строка (вид, ключ, значение): всего элементов и
+категорий, элементы по категории, тегу, типу, статусу, категории и типу,
+категории и тегу, по пользователю и число пользователей с контентом.
+Страницы читают несколько строк по ключу вместо COUNT и annotate по
+всей базе. Учитываются только видимые элементы (не pending_deletion).
+
+Счетчики меняются в той же транзакции, что и данные: одиночные записи -
+через сигналы (content.signals), массовые пути (bulk_create, UPDATE и
+DELETE по набору, пакетные теги) - явными вызовами со сгруппированными
+дельтами. Обновление - атомарное value = value + дельта (UPDATE на группу
+ключей с равной дельтой), как у частот терминов (content.keywords), поэтому
+параллельные транзакции не теряют изменений друг друга. Дрейф от правок в
+обход ORM исправляет полная пересборка - команда rebuild_counters (--loop
+для периодической сверки).
+
+Вид GENERATION - номера поколений кэшей (content.representation_cache,
+content.tagging): общие для всех процессов, увеличиваются bump и не
+пересобираются.
+"""
+import threading
+from collections import Counter as Deltas, defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction # pyright: ignore[reportMissingModuleSource]
+from django.db.models import Count, F, OuterRef, Subquery, Value # pyright: ignore[reportMissingModuleSource]
+from django.db.models.functions import Greatest # pyright: ignore[reportMissingModuleSource]
+
+ITEMS = 'items'
+USERS = 'users'
+CATEGORIES = 'categories'
+CATEGORY = 'category'
+TAG = 'tag'
+TYPE = 'type'
+STATUS = 'status'
+CATEGORY_TYPE = 'category_type'
+CATEGORY_TAG = 'category_tag'
+USER = 'user'
+GENERATION = 'generation'
+
+QUERY_CHUNK = 500
+
+_local = threading.local()
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), QUERY_CHUNK):
+        yield values[start:start + QUERY_CHUNK]
+
+
+@contextmanager
+def suspended():
+    """Не учитывать удаления в сигналах (массовый путь учел их сам)"""
+    previous = getattr(_local, 'suspended', False)
+    _local.suspended = True
+    try:
+        yield
+    finally:
+        _local.suspended = previous
+
+
+def is_suspended():
+    return getattr(_local, 'suspended', False)
+
+
+def item_deltas(rows, sign=1):
+    """Дельты для элементов: rows - итерируемое (user_id, category_id, тип, статус[, число])"""
+    deltas = Deltas()
+    for user_id, category_id, content_type, status, *count in rows:
+        count = sign * (count[0] if count else 1)
+        deltas[(ITEMS, '')] += count
+        deltas[(TYPE, content_type)] += count
+        deltas[(STATUS, status)] += count
+        deltas[(USER, str(user_id))] += count
+        if category_id is not None:
+            deltas[(CATEGORY, str(category_id))] += count
+            deltas[(CATEGORY_TYPE, f'{category_id}:{content_type}')] += count
+    return deltas
+
+
+def tag_deltas(links, sign=1):
+    """Дельты для связей с тегами: links - итерируемое (category_id, tag_id[, число])"""
+    deltas = Deltas()
+    for category_id, tag_id, *count in links:
+        count = sign * (count[0] if count else 1)
+        deltas[(TAG, str(tag_id))] += count
+        if category_id is not None:
+            deltas[(CATEGORY_TAG, f'{category_id}:{tag_id}')] += count
+    return deltas
+
+
+def _tag_links(content_item_model, tagged_item_model, item_ids=None):
+    """Связи (категория элемента, тег, число) по видимым элементам (item_ids - подзапрос id)"""
+    links = tagged_item_model.objects.filter(
+        content_type__app_label='content', content_type__model='contentitem',
+    )
+    if item_ids is not None:
+        links = links.filter(object_id__in=item_ids)
+    category = content_item_model._base_manager.filter(
+        pk=OuterRef('object_id'), pending_deletion=False
+    ).values('category_id')
+    return (
+        links.filter(object_id__in=content_item_model._base_manager.filter(pending_deletion=False).values('pk'))
+        .annotate(item_category=Subquery(category)).order_by()
+        .values_list('item_category', 'tag_id').annotate(count=Count('pk'))
+    )
+
+
+def queryset_deltas(queryset, sign=1, with_tags=True):
+    """Сгруппированные дельты для набора элементов (with_tags - вместе с их тегами)"""
+    from .models import ContentItem
+
+    rows = (
+        queryset.order_by().values_list('user_id', 'category_id', 'content_type', 'status')
+        .annotate(count=Count('pk'))
+    )
+    deltas = item_deltas(rows, sign)
+    if with_tags:
+        deltas.update(tag_deltas(_tag_links(ContentItem, ContentItem.tags.through, queryset.values('pk')), sign))
+    return deltas
+
+
+def ids_deltas(ids, sign=1, with_tags=True):
+    """queryset_deltas для списка id элементов (порциями)"""
+    from .models import ContentItem
+
+    deltas = Deltas()
+    for chunk in _chunks(ids):
+        deltas.update(queryset_deltas(ContentItem.objects.filter(pk__in=chunk), sign, with_tags))
+    return deltas
+
+
+def link_deltas(links, sign=1):
+    """Дельты для новых или снятых связей: links - (object_id, tag_id); категории - одним запросом"""
+    from .models import ContentItem
+
+    links = list(links)
+    categories = {}
+    for chunk in _chunks({object_id for object_id, _ in links}):
+        categories.update(
+            ContentItem.objects.filter(pk__in=chunk).values_list('pk', 'category_id')
+        )
+    # Связи скрытых элементов не считаются
+    return tag_deltas(
+        ((categories[object_id], tag_id) for object_id, tag_id in links if object_id in categories), sign
+    )
+
+
+def _add(deltas, counter_model):
+    """
+    Прибавить дельты: недостающие строки вставляются, затем один UPDATE
+    value = value + дельта на вид и равную дельту (значение не ниже нуля)
+    """
+    groups = defaultdict(list)
+    for (kind, key), delta in deltas.items():
+        groups[(kind, delta)].append(key)
+
+    counter_model.objects.bulk_create(
+        [counter_model(kind=kind, key=key, value=0) for (kind, key), delta in deltas.items() if delta > 0],
+        batch_size=QUERY_CHUNK, ignore_conflicts=True,
+    )
+    for (kind, delta), keys in groups.items():
+        value = F('value') + delta if delta > 0 else Greatest(F('value') + delta, Value(0))
+        for chunk in _chunks(keys):
+            counter_model.objects.filter(kind=kind, key__in=chunk).update(value=value)
+
+
+def apply(deltas, counter_model=None):
+    """Применить дельты {(вид, ключ): изменение} в текущей транзакции"""
+    if counter_model is None:
+        from .models import Counter as counter_model
+
+    deltas = Deltas({key: delta for key, delta in deltas.items() if delta})
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        _add(deltas, counter_model)
+
+        # Пользователь с контентом появился или пропал - меняется число пользователей.
+        # Строки пользователей уже заблокированы UPDATE выше, значения после него точные
+        users = {key: delta for (kind, key), delta in deltas.items() if kind == USER}
+        change = 0
+        for chunk in _chunks(users):
+            for key, after in counter_model.objects.filter(kind=USER, key__in=chunk).values_list('key', 'value'):
+                change += (after > 0) - (after - users[key] > 0)
+        if change:
+            _add({(USERS, ''): change}, counter_model)
+
+
+def add_items(items):
+    """Учесть созданные элементы (bulk_create обходит post_save)"""
+    apply(item_deltas((item.user_id, item.category_id, item.content_type, item.status) for item in items))
+
+
+def remove_queryset(queryset):
+    """Вычесть набор элементов (до удаления или скрытия)"""
+    apply(queryset_deltas(queryset, -1))
+
+
+def forget(kind, key):
+    """Удалить счетчики объекта (категория или тег удалены)"""
+    from .models import Counter
+
+    if kind == CATEGORY:
+        Counter.objects.filter(kind__in=[CATEGORY_TYPE, CATEGORY_TAG], key__startswith=f'{key}:').delete()
+    elif kind == TAG:
+        Counter.objects.filter(kind=CATEGORY_TAG, key__endswith=f':{key}').delete()
+    Counter.objects.filter(kind=kind, key=key).delete()
+
+
+def bump(kind, key=''):
+    """Атомарно увеличить счетчик на 1 (строка создается при первом вызове)"""
+    from .models import Counter
+
+    with transaction.atomic():
+        Counter.objects.bulk_create([Counter(kind=kind, key=key, value=0)], ignore_conflicts=True)
+        Counter.objects.filter(kind=kind, key=key).update(value=F('value') + 1)
+
+
+def get(kind, key=''):
+    from .models import Counter
+
+    return Counter.objects.filter(kind=kind, key=str(key)).values_list('value', flat=True).first() or 0
+
+
+def values(kind, prefix=''):
+    """{ключ без префикса: значение} для вида (prefix - например 'id_категории:')"""
+    from .models import Counter
+
+    rows = Counter.objects.filter(kind=kind, key__startswith=prefix).values_list('key', 'value')
+    return {key[len(prefix):]: value for key, value in rows}
+
+
+def top_tags(limit=10, category_id=None):
+    """Самые частые теги: список Tag с атрибутом num_times (по убыванию)"""
+    from taggit.models import Tag # pyright: ignore[reportMissingImports]
+    from .models import Counter
+
+    if category_id is None:
+        rows = Counter.objects.filter(kind=TAG, value__gt=0)
+        prefix = ''
+    else:
+        prefix = f'{category_id}:'
+        rows = Counter.objects.filter(kind=CATEGORY_TAG, key__startswith=prefix, value__gt=0)
+    counts = [
+        (int(key[len(prefix):]), value)
+        for key, value in rows.order_by('-value', 'key').values_list('key', 'value')[:limit]
+    ]
+    tags = Tag.objects.in_bulk([tag_id for tag_id, _ in counts])
+    result = []
+    for tag_id, value in counts:
+        if tag_id in tags:
+            tags[tag_id].num_times = value
+            result.append(tags[tag_id])
+    return result
+
+
+def rebuild(content_item_model=None, category_model=None, tagged_item_model=None, counter_model=None):
+    """Полная пересборка счетчиков по текущим данным. Возвращает число строк"""
+    if content_item_model is None:
+        from .models import Category, ContentItem, Counter
+        content_item_model, category_model, counter_model = ContentItem, Category, Counter
+        tagged_item_model = ContentItem.tags.through
+
+    visible = content_item_model._base_manager.filter(pending_deletion=False)
+    rows = (
+        visible.order_by().values_list('user_id', 'category_id', 'content_type', 'status')
+        .annotate(count=Count('pk'))
+    )
+    deltas = item_deltas(rows)
+    deltas.update(tag_deltas(_tag_links(content_item_model, tagged_item_model)))
+    deltas[(USERS, '')] = sum(1 for (kind, _), value in deltas.items() if kind == USER and value > 0)
+    deltas[(CATEGORIES, '')] = category_model._base_manager.filter(pending_deletion=False).count()
+
+    with transaction.atomic():
+        counter_model.objects.exclude(kind=GENERATION).delete()
+        counter_model.objects.bulk_create(
+            (counter_model(kind=kind, key=key, value=value) for (kind, key), value in deltas.items() if value),
+            batch_size=QUERY_CHUNK,
+        )
+    return sum(1 for value in deltas.values() if value)
@@ -0,0 +1,30 @@
+from .analytics_db import ANALYTICS_DB_ALIAS, has_snapshot, in_analytics_reads
+
+
+class AnalyticsRouter:
+    """
+    Направляет чтения внутри analytics_reads() в снимок базы (если он уже
+    создан командой refresh_analytics_db).
+
+    Запись всегда идет в default, миграции на снимок не применяются
+    (схема копируется вместе с данными при обновлении).
+    """
+
+    def db_for_read(self, model, **hints):
+        if in_analytics_reads() and has_snapshot():
+            return ANALYTICS_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Объекты из снимка и рабочей базы - одни и те же строки
+        if ANALYTICS_DB_ALIAS in (obj1._state.db, obj2._state.db):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == ANALYTICS_DB_ALIAS:
+            return False
+        return None
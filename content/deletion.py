@@ -0,0 +1,173 @@
+"""
+Фоновое удаление с большим каскадом (пользователь, категория, массовое
+удаление контента).
+
+Коллектор Django загружает все зависимые строки (ContentItem,
+Recommendation, TaggedItem) и удаляет их в одной длинной транзакции,
+которая в SQLite блокирует остальных писателей. Здесь цель сразу
+скрывается (флаг pending_deletion у категорий и элементов, is_active у
+пользователя), а зависимые строки удаляются задачей DeletionJob в пуле
+'deletion' порциями по DELETION_BATCH_SIZE: каждая порция - своя короткая
+транзакция, между порциями - пауза DELETION_BATCH_PAUSE. Сама цель
+удаляется последней, когда каскад уже пуст.
+
+Прогресс (total / processed) и статус хранятся в задаче и доступны через
+API. Скрытые строки выбираются заново при каждом запуске, поэтому
+прерванную задачу можно перезапустить (команда run_deletions).
+"""
+import time
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.db.models import F # pyright: ignore[reportMissingModuleSource]
+from django.db import transaction # pyright: ignore[reportMissingModuleSource]
+from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _steps(job):
+    """Шаги задачи: (queryset зависимых строк, поле для обнуления или None - удалить)"""
+    from django.contrib.auth.models import User # pyright: ignore[reportMissingModuleSource]
+    from .models import Category, ContentItem, ParseJob, Recommendation
+
+    if job.target == 'content':
+        return [(ContentItem.all_objects.filter(user_id=job.target_id, pending_deletion=True), None)], None
+    if job.target == 'category':
+        # Элементы остаются, у них только снимается категория (как SET_NULL)
+        return (
+            [(ContentItem.all_objects.filter(category_id=job.target_id), 'category')],
+            Category.all_objects.filter(pk=job.target_id),
+        )
+    return (
+        [
+            (ContentItem.all_objects.filter(user_id=job.target_id), None),
+            (Recommendation.objects.filter(user_id=job.target_id), None),
+            (ParseJob.objects.filter(user_id=job.target_id), None),
+        ],
+        User.objects.filter(pk=job.target_id),
+    )
+
+
+def _count(job):
+    dependents, target = _steps(job)
+    return sum(queryset.count() for queryset, _ in dependents) + (1 if target is not None else 0)
+
+
+def _process(job, queryset, null_field, batch_size, pause):
+    """Удалить (или отвязать) строки порциями по id, каждая порция - своя транзакция"""
+    from . import counters, keywords
+    from .models import ContentItem, DeletionJob
+
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        with transaction.atomic():
+            batch = queryset.model._base_manager.filter(pk__in=ids)
+            if null_field:
+                batch.update(**{null_field: None})
+            else:
+                # Каскад только для этой порции (теги, рекомендации элементов);
+                # скрытые элементы уже вычтены из счетчиков, из частот терминов - здесь
+                if queryset.model is ContentItem:
+                    keywords.remove_queryset(batch)
+                with counters.suspended():
+                    batch.only('pk').delete()
+            DeletionJob.objects.filter(pk=job.pk).update(processed=F('processed') + len(ids))
+        if pause:
+            time.sleep(pause)
+
+
+def _submit(job, background):
+    from . import jobs
+
+    if background:
+        jobs.submit(
+            'deletion', run_deletion_job, job.pk,
+            max_workers=_setting('DELETION_JOB_WORKERS', 1)
+        )
+    return job
+
+
+def delete_content(requested_by, queryset, background=True):
+    """
+    Скрыть элементы набора (одним UPDATE) и поставить их удаление в
+    очередь. Набор должен принадлежать одному пользователю - requested_by.
+    Возвращает задачу или None, если удалять нечего.
+    """
+    from .models import DeletionJob
+
+    from . import counters
+
+    with transaction.atomic():
+        counters.remove_queryset(queryset)
+        hidden = queryset.update(pending_deletion=True)
+        if not hidden:
+            return None
+        job = DeletionJob.objects.create(
+            requested_by=requested_by, target='content', target_id=requested_by.pk, total=hidden
+        )
+    return _submit(job, background)
+
+
+def delete_category(category, requested_by=None, background=True):
+    """Скрыть категорию и поставить в очередь отвязку элементов и удаление"""
+    from .models import Category, DeletionJob
+
+    from . import counters
+
+    with transaction.atomic():
+        if Category.objects.filter(pk=category.pk).update(pending_deletion=True):
+            counters.apply({(counters.CATEGORIES, ''): -1})
+        job = DeletionJob(requested_by=requested_by, target='category', target_id=category.pk)
+        job.total = _count(job)
+        job.save()
+    return _submit(job, background)
+
+
+def delete_user(user, requested_by=None, background=True):
+    """Отключить пользователя, скрыть его контент и поставить удаление в очередь"""
+    from django.contrib.auth.models import User # pyright: ignore[reportMissingModuleSource]
+    from .models import ContentItem, DeletionJob
+
+    from . import counters
+
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        counters.remove_queryset(ContentItem.objects.filter(user=user))
+        ContentItem.all_objects.filter(user=user).update(pending_deletion=True)
+        job = DeletionJob(requested_by=requested_by, target='user', target_id=user.pk)
+        job.total = _count(job)
+        job.save()
+    return _submit(job, background)
+
+
+def run_deletion_job(job_id):
+    """Выполнение задачи удаления: зависимые строки порциями, затем сама цель"""
+    from .models import DeletionJob
+
+    job = DeletionJob.objects.get(pk=job_id)
+    job.status = 'running'
+    job.save(update_fields=['status'])
+
+    batch_size = _setting('DELETION_BATCH_SIZE', 500)
+    pause = _setting('DELETION_BATCH_PAUSE', 0.05)
+    try:
+        dependents, target = _steps(job)
+        for queryset, null_field in dependents:
+            _process(job, queryset, null_field, batch_size, pause)
+        if target is not None:
+            with transaction.atomic():
+                deleted, _ = target.delete()
+                DeletionJob.objects.filter(pk=job.pk).update(processed=F('processed') + min(deleted, 1))
+        job.status = 'done'
+    except Exception as e:
+        job.status = 'failed'
+        job.error = f'Ошибка при удалении: {str(e)}'
+
+    job.processed = DeletionJob.objects.values_list('processed', flat=True).get(pk=job.pk)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'processed', 'error', 'finished_at'])
+    return job
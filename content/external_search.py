@@ -0,0 +1,182 @@
+"""
+Поиск во внешних источниках.
+
+Провайдеры опрашиваются параллельно в общем пуле (content.jobs), и весь
+запрос ограничен дедлайном EXTERNAL_SEARCH_DEADLINE: время ответа равно
+времени самого медленного провайдера, но не больше дедлайна. Опоздавшие
+провайдеры помечаются как timeout, а их результат, когда придет, попадает
+в кэш. Результаты кэшируются по нормализованному запросу и провайдеру.
+
+Новый провайдер - подкласс SearchProvider в списке EXTERNAL_SEARCH_PROVIDERS.
+По умолчанию поиск идет по заранее загруженному пулу (content.ingestion),
+живые NewsProvider / YouTubeProvider можно подключить в настройках.
+"""
+import hashlib
+import time
+from concurrent.futures import wait
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.core.cache import cache # pyright: ignore[reportMissingModuleSource]
+from django.utils.module_loading import import_string # pyright: ignore[reportMissingModuleSource]
+
+from . import jobs
+from .services import NewsAPIClient, YouTubeAPIClient
+
+DEFAULT_PROVIDERS = [
+    'content.external_search.CorpusArticleProvider',
+    'content.external_search.CorpusVideoProvider',
+]
+
+
+class ProviderError(Exception):
+    """Провайдер вернул ошибку (результат не кэшируется)"""
+
+
+class SearchProvider:
+    """
+    Базовый провайдер: name - ключ кэша и статуса, result_key - ключ
+    списка результатов в ответе API. Локальные провайдеры (remote = False)
+    выполняются в потоке запроса и не кэшируются.
+    """
+    name = ''
+    result_key = ''
+    limit = 5
+    remote = True
+
+    def search(self, query):
+        raise NotImplementedError
+
+
+class NewsProvider(SearchProvider):
+    name = 'news'
+    result_key = 'articles'
+    limit = 5
+
+    def search(self, query):
+        articles = NewsAPIClient().search_articles(query, page_size=self.limit)
+        if isinstance(articles, dict) and 'error' in articles:
+            raise ProviderError(articles['error'])
+        return articles
+
+
+class YouTubeProvider(SearchProvider):
+    name = 'youtube'
+    result_key = 'videos'
+    limit = 3
+
+    def search(self, query):
+        return YouTubeAPIClient().search_videos(query, max_results=self.limit)
+
+
+class CorpusArticleProvider(SearchProvider):
+    """
+    Поиск по общему пулу DiscoveredItem (без сетевых запросов).
+
+    Просматриваются только EXTERNAL_SEARCH_CORPUS_SCAN последних материалов
+    типа (индекс content_type, -published_at), поэтому стоимость запроса не
+    растет с пулом. Подстрока ищется в search_text (casefold при загрузке),
+    так что регистр кириллицы не важен.
+    """
+    name = 'corpus'
+    result_key = 'articles'
+    content_type = 'article'
+    limit = 5
+    remote = False
+
+    def search(self, query):
+        from .models import DiscoveredItem
+
+        needle = normalize_query(query).casefold()
+        if not needle:
+            return []
+        recent = DiscoveredItem.objects.filter(content_type=self.content_type).values('pk')[
+            :getattr(settings, 'EXTERNAL_SEARCH_CORPUS_SCAN', 5000)
+        ]
+        items = DiscoveredItem.objects.filter(pk__in=recent, search_text__contains=needle)[:self.limit]
+        return [item.as_result() for item in items]
+
+
+class CorpusVideoProvider(CorpusArticleProvider):
+    name = 'corpus_videos'
+    result_key = 'videos'
+    content_type = 'video'
+    limit = 3
+
+
+def get_providers():
+    paths = getattr(settings, 'EXTERNAL_SEARCH_PROVIDERS', DEFAULT_PROVIDERS)
+    return [import_string(path)() for path in paths]
+
+
+def normalize_query(query):
+    return ' '.join(query.split())
+
+
+def cache_key(provider, query):
+    digest = hashlib.sha1(normalize_query(query).casefold().encode('utf-8')).hexdigest()
+    return f'external_search:{provider.name}:{digest}'
+
+
+def _search_and_cache(provider, query, key):
+    results = provider.search(query)
+    cache.set(key, results, getattr(settings, 'EXTERNAL_SEARCH_CACHE_TTL', 600))
+    return results
+
+
+def search(query, providers=None, deadline=None):
+    """
+    Параллельный поиск по провайдерам.
+
+    Возвращает ответ API: query, списки результатов по result_key,
+    total_results, статусы провайдеров (ok / cached / timeout / error)
+    и признак partial.
+    """
+    started = time.monotonic()
+    query = normalize_query(query)
+    providers = providers if providers is not None else get_providers()
+    if deadline is None:
+        deadline = getattr(settings, 'EXTERNAL_SEARCH_DEADLINE', 3)
+
+    response = {'query': query}
+    statuses = {}
+    futures = {}
+
+    for provider in providers:
+        response.setdefault(provider.result_key, [])
+        if not provider.remote:
+            continue
+        key = cache_key(provider, query)
+        cached = cache.get(key)
+        if cached is not None:
+            response[provider.result_key] = cached
+            statuses[provider.name] = {'status': 'cached'}
+            continue
+        executor = jobs.get_executor('search', getattr(settings, 'EXTERNAL_SEARCH_WORKERS', 8))
+        futures[executor.submit(_search_and_cache, provider, query, key)] = provider
+
+    # Локальные провайдеры - пока удаленные выполняются в пуле
+    for provider in providers:
+        if provider.remote:
+            continue
+        try:
+            response[provider.result_key] = provider.search(query)
+            statuses[provider.name] = {'status': 'ok'}
+        except Exception as e:
+            statuses[provider.name] = {'status': 'error', 'error': str(e)}
+
+    # Дожидаемся всех, но не дольше дедлайна; опоздавшие досчитаются в фоне
+    remaining = max(0, deadline - (time.monotonic() - started))
+    done, _ = wait(futures, timeout=remaining) if futures else (set(), set())
+    for future, provider in futures.items():
+        if future not in done:
+            statuses[provider.name] = {'status': 'timeout'}
+        elif future.exception() is not None:
+            statuses[provider.name] = {'status': 'error', 'error': str(future.exception())}
+        else:
+            response[provider.result_key] = future.result()
+            statuses[provider.name] = {'status': 'ok'}
+
+    response['total_results'] = sum(len(response[provider.result_key]) for provider in providers)
+    response['providers'] = statuses
+    response['partial'] = any(entry['status'] in ('timeout', 'error') for entry in statuses.values())
+    return response
@@ -0,0 +1,235 @@
+"""
+Параллельное выполнение сетевых запросов с ограничениями.
+
+Общий лимит параллельности задается размером пула, лимит на хост -
+семафорами, а общий дедлайн ограничивает время всей пачки: что не успело,
+помечается как таймаут, и медленные хосты не задерживают остальные.
+
+Для длинных обходов (content.link_health) - run_batches: URL из потока
+пачек идут в общие очереди по хостам, и пул не простаивает на границе
+пачек в ожидании самого медленного хоста.
+"""
+import heapq
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+class DeadlineExceeded(Exception):
+    """Запрос не уложился в общий дедлайн пачки"""
+
+
+def get_host(url):
+    return (urlsplit(url).hostname or '').lower()
+
+
+class HostLimiter:
+    """
+    Не более per_host одновременных запросов к одному хосту и, если задан
+    min_interval, не чаще одного запуска запроса к хосту в min_interval секунд.
+    """
+
+    def __init__(self, per_host, min_interval=0):
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._semaphores = defaultdict(lambda: threading.BoundedSemaphore(self.per_host))
+        self._next_start = defaultdict(float)
+
+    def _reserve_start(self, host):
+        # Время запуска бронируется под общей блокировкой, спим - без нее
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start[host])
+            self._next_start[host] = start + self.min_interval
+        return start - now
+
+    @contextmanager
+    def slot(self, url, timeout=None):
+        host = get_host(url)
+        with self._lock:
+            semaphore = self._semaphores[host]
+        if not semaphore.acquire(timeout=timeout):
+            raise DeadlineExceeded('Не дождались свободного слота для хоста')
+        try:
+            if self.min_interval:
+                delay = self._reserve_start(host)
+                if timeout is not None and delay > timeout:
+                    raise DeadlineExceeded('Не дождались очереди к хосту')
+                time.sleep(delay)
+            yield
+        finally:
+            semaphore.release()
+
+
+def interleave_by_host(urls):
+    """
+    Перемешивание URL по хостам (round-robin).
+
+    Иначе длинная серия URL одного хоста займет все потоки пула
+    ожиданием его семафора.
+    """
+    queues = defaultdict(deque)
+    for url in urls:
+        queues[get_host(url)].append(url)
+
+    result = []
+    pending = deque(queues.values())
+    while pending:
+        queue = pending.popleft()
+        result.append(queue.popleft())
+        if queue:
+            pending.append(queue)
+    return result
+
+
+def run_concurrently(urls, func, max_workers=32, per_host=4, deadline=None, min_interval=0):
+    """
+    Выполнить func(url) для всех URL параллельно.
+
+    min_interval - минимальная пауза между запусками запросов к одному хосту.
+
+    Возвращает словарь url -> (результат, исключение). URL, не
+    обработанные до дедлайна, получают DeadlineExceeded.
+    """
+    urls = interleave_by_host(list(dict.fromkeys(urls)))
+    if not urls:
+        return {}
+
+    limiter = HostLimiter(per_host, min_interval=min_interval)
+    started = time.monotonic()
+
+    def remaining():
+        if deadline is None:
+            return None
+        return deadline - (time.monotonic() - started)
+
+    def task(url):
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded('Превышен общий дедлайн')
+        with limiter.slot(url, timeout=left):
+            return func(url)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(urls)))
+    futures = {executor.submit(task, url): url for url in urls}
+    done, _ = wait(futures, timeout=deadline)
+    # Не ждем зависшие запросы: их потоки завершатся по таймауту самого запроса
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for future, url in futures.items():
+        if future in done:
+            error = future.exception()
+            results[url] = (None, error) if error else (future.result(), None)
+        else:
+            results[url] = (None, DeadlineExceeded('Превышен общий дедлайн'))
+    return results
+
+
+class _Batch:
+    def __init__(self, label, urls):
+        self.label = label
+        self.results = {}
+        self.left = len(urls)
+
+
+def run_batches(batches, func, max_workers=32, per_host=4, min_interval=0, max_pending=4):
+    """
+    Выполнить func(url) для URL из потока пачек без остановки между пачками.
+
+    batches - итерируемое из пар (метка, [url]). URL всех прочитанных пачек
+    стоят в очередях по хостам; задача уходит в пул, только когда у хоста
+    есть свободный слот (per_host) и прошел min_interval, так что потоки не
+    ждут занятые хосты. Следующая пачка читается, когда очередь короче
+    размера пула (в работе не больше max_pending пачек).
+
+    Генератор пар (метка, {url: (результат, исключение)}) в порядке пачек:
+    пачка выдается, когда готовы все ее URL.
+    """
+    batches = iter(batches)
+    exhausted = False
+    pending = deque()
+    queues = defaultdict(deque)
+    active = defaultdict(int)
+    next_start = defaultdict(float)
+    ready, ready_set, delayed = deque(), set(), []
+    running = {}
+    queued = 0
+
+    def wake(host):
+        if host not in ready_set:
+            ready_set.add(host)
+            ready.append(host)
+
+    def dispatch():
+        now = time.monotonic()
+        while delayed and delayed[0][0] <= now:
+            wake(heapq.heappop(delayed)[1])
+        submitted = 0
+        while ready and len(running) < max_workers:
+            host = ready.popleft()
+            ready_set.discard(host)
+            queue = queues[host]
+            if not queue or active[host] >= per_host:
+                # Разбудит завершение задачи или новый URL
+                continue
+            if next_start[host] > now:
+                heapq.heappush(delayed, (next_start[host], host))
+                continue
+            batch, url = queue.popleft()
+            active[host] += 1
+            next_start[host] = now + min_interval
+            running[executor.submit(func, url)] = (batch, url, host)
+            submitted += 1
+            if queue:
+                wake(host)
+        return submitted
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while True:
+            while not exhausted and queued < max_workers and len(pending) < max_pending:
+                try:
+                    label, urls = next(batches)
+                except StopIteration:
+                    exhausted = True
+                    break
+                urls = list(dict.fromkeys(urls))
+                batch = _Batch(label, urls)
+                pending.append(batch)
+                for url in urls:
+                    host = get_host(url)
+                    queues[host].append((batch, url))
+                    wake(host)
+                queued += len(urls)
+
+            queued -= dispatch()
+
+            while pending and pending[0].left == 0:
+                batch = pending.popleft()
+                yield batch.label, batch.results
+
+            if not running:
+                if delayed:
+                    time.sleep(max(0, delayed[0][0] - time.monotonic()))
+                    continue
+                if exhausted and not pending:
+                    return
+                continue
+
+            timeout = max(0, delayed[0][0] - time.monotonic()) if delayed else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch, url, host = running.pop(future)
+                error = future.exception()
+                batch.results[url] = (None, error) if error else (future.result(), None)
+                batch.left -= 1
+                active[host] -= 1
+                if queues[host]:
+                    wake(host)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -1,5 +1,6 @@
 from django import forms # pyright: ignore[reportMissingModuleSource]
 from .models import ContentItem, Category
+from . import tagging
 
 class ContentItemForm(forms.ModelForm):
     class Meta:
@@ -25,4 +26,25 @@ class ContentItemForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Оптимизируем queryset для категорий
-        self.fields['category'].queryset = Category.objects.all().order_by('name')
\ No newline at end of file
+        self.fields['category'].queryset = Category.objects.all().order_by('name')
+        # В закладке хранится только свое описание - показываем и общее описание ресурса
+        if self.instance.pk and self.instance.description is None:
+            self.initial['description'] = self.instance.full_description
+    
+    def clean_description(self):
+        description = self.cleaned_data['description']
+        # Неизмененное общее описание не копируется в закладку - она продолжает наследовать его
+        if self.instance.pk and self.instance.description is None and description == self.initial.get('description'):
+            return None
+        return description
+    
+    def _save_m2m(self):
+        # Теги назначаются пачкой (content.tagging), а не TaggableManager.set
+        tags = self.cleaned_data.pop('tags', None)
+        try:
+            super()._save_m2m()
+        finally:
+            if tags is not None:
+                self.cleaned_data['tags'] = tags
+        if tags is not None:
+            tagging.set_tags(self.instance, tags)
@@ -0,0 +1,283 @@
+"""
+Общий HTTP-клиент для всех исходящих запросов.
+
+- одна requests.Session на процесс с пулом соединений (keep-alive), без
+  сохранения cookie: сессия общая для всех пользователей;
+- таймауты на соединение и чтение из настроек;
+- ограниченные повторы с экспоненциальной задержкой и jitter;
+- circuit breaker на хост: упавший upstream перестает занимать воркеры;
+- метрики задержек по каждому upstream.
+
+Breaker'ы и метрики хранятся для MAX_HOSTS последних хостов (LRU): импорт
+списков ссылок обходит тысячи доменов, давно не запрошенные вытесняются.
+
+Настройки - словарь HTTP_CLIENT в settings (см. DEFAULTS).
+"""
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests # pyright: ignore[reportMissingModuleSource]
+from requests.adapters import HTTPAdapter # pyright: ignore[reportMissingModuleSource]
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+
+DEFAULTS = {
+    'POOL_CONNECTIONS': 20,     # число хостов с отдельным пулом
+    'POOL_MAXSIZE': 50,         # соединений в пуле одного хоста
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 10,
+    'RETRIES': 2,               # повторов сверх первой попытки
+    'BACKOFF_BASE': 0.3,
+    'BACKOFF_MAX': 5.0,
+    'BREAKER_THRESHOLD': 5,     # подряд неудач до размыкания
+    'BREAKER_COOLDOWN': 30,     # секунд до пробного запроса
+    'MAX_HOSTS': 1000,          # хостов с breaker'ом и метриками (LRU)
+}
+
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Запрос не отправлен: circuit breaker хоста разомкнут"""
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'HTTP_CLIENT', {})}
+
+
+def get_host(url):
+    return (urlsplit(url).hostname or '').lower()
+
+
+class CircuitBreaker:
+    """Circuit breaker одного хоста: closed -> open -> half-open -> closed"""
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_in_flight:
+                # Пропускаем один пробный запрос
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Запрос прерван не по вине upstream: освободить пробный запрос без учета"""
+        with self._lock:
+            self.trial_in_flight = False
+
+
+class UpstreamMetrics:
+    """Счетчики и задержки запросов к одному хосту"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def incr(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def observe(self, elapsed_ms, error=False):
+        with self._lock:
+            self.requests += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            if error:
+                self.errors += 1
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'avg_ms': round(self.total_ms / self.requests, 1) if self.requests else 0.0,
+            'max_ms': round(self.max_ms, 1),
+        }
+
+
+_lock = threading.Lock()
+_state = {'pid': None, 'session': None}
+_breakers = OrderedDict()
+_metrics = OrderedDict()
+
+
+def get_session():
+    """Сессия процесса (пересоздается после fork, чтобы не делить сокеты)"""
+    with _lock:
+        if _state['session'] is None or _state['pid'] != os.getpid():
+            config = get_config()
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=config['POOL_CONNECTIONS'],
+                pool_maxsize=config['POOL_MAXSIZE'],
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            # Пустой список разрешенных доменов - cookie не принимаются и не отправляются
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            _state['session'] = session
+            _state['pid'] = os.getpid()
+        return _state['session']
+
+
+def _touch(table, host, factory, max_hosts):
+    """Запись хоста (новая - через factory) с вытеснением давно не запрошенных; под _lock"""
+    value = table.get(host)
+    if value is None:
+        value = table[host] = factory()
+        while len(table) > max_hosts:
+            table.popitem(last=False)
+    else:
+        table.move_to_end(host)
+    return value
+
+
+def get_breaker(host):
+    config = get_config()
+    with _lock:
+        return _touch(
+            _breakers, host,
+            lambda: CircuitBreaker(config['BREAKER_THRESHOLD'], config['BREAKER_COOLDOWN']),
+            config['MAX_HOSTS'],
+        )
+
+
+def _get_metrics(host):
+    max_hosts = get_config()['MAX_HOSTS']
+    with _lock:
+        return _touch(_metrics, host, UpstreamMetrics, max_hosts)
+
+
+def get_metrics():
+    """Метрики по upstream: {host: {...}, ...} c состоянием breaker'а"""
+    with _lock:
+        hosts = [(host, metrics, _breakers.get(host)) for host, metrics in _metrics.items()]
+    return {
+        host: {**metrics.as_dict(), 'circuit': breaker.state if breaker is not None else 'closed'}
+        for host, metrics, breaker in hosts
+    }
+
+
+def reset():
+    """Сброс сессии, breaker'ов и метрик (тесты, смена настроек)"""
+    with _lock:
+        if _state['session'] is not None:
+            _state['session'].close()
+        _state['session'] = None
+        _breakers.clear()
+        _metrics.clear()
+
+
+def _backoff(attempt, config):
+    # Full jitter: случайная задержка в [0, base * 2^attempt]
+    return random.uniform(0, min(config['BACKOFF_MAX'], config['BACKOFF_BASE'] * (2 ** attempt)))
+
+
+def request(method, url, timeout=None, retries=None, **kwargs):
+    """
+    Выполнить запрос через общий пул.
+
+    timeout - число или (connect, read); по умолчанию из настроек.
+    Повторы выполняются только для идемпотентных методов при сетевых
+    ошибках и ответах 429/502/503/504. Ответ возвращается как есть
+    (raise_for_status - на стороне вызывающего).
+    """
+    config = get_config()
+    method = method.upper()
+    host = get_host(url)
+    breaker = get_breaker(host)
+    metrics = _get_metrics(host)
+
+    if timeout is None:
+        timeout = (config['CONNECT_TIMEOUT'], config['READ_TIMEOUT'])
+    if retries is None:
+        retries = config['RETRIES'] if method in IDEMPOTENT_METHODS else 0
+
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            metrics.incr('rejected')
+            raise CircuitOpenError(f'Upstream {host} временно недоступен (circuit open)')
+
+        started = time.perf_counter()
+        try:
+            response = get_session().request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            metrics.observe((time.perf_counter() - started) * 1000, error=True)
+            breaker.record_failure()
+            if attempt >= retries:
+                raise
+        except requests.RequestException:
+            # Прочие ошибки запроса (редиректы, битый ответ) - неудача без повтора
+            metrics.observe((time.perf_counter() - started) * 1000, error=True)
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Иначе half-open breaker навсегда ждал бы ответа пробного запроса
+            breaker.release()
+            raise
+        else:
+            failed = response.status_code >= 500 or response.status_code == 429
+            metrics.observe((time.perf_counter() - started) * 1000, error=failed)
+            if failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            response.close()
+
+        attempt += 1
+        metrics.incr('retries')
+        time.sleep(_backoff(attempt, config))
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def head(url, **kwargs):
+    return request('HEAD', url, **kwargs)
@@ -0,0 +1,177 @@
+"""
+Фоновая загрузка материалов из внешних источников в общий пул.
+
+Для каждой пары (источник, запрос) из FEED_INGEST_QUERIES страницы выдачи
+забираются по очереди через NewsAPIClient / YouTubeAPIClient (формат
+_format_articles), дедуплицируются по хешу URL и external_id и
+вставляются пачкой в DiscoveredItem. Контрольная точка сохраняется в той
+же транзакции, что и страница, поэтому прерванный проход продолжается с
+места остановки. Поиск (external_search.CorpusProvider) и рекомендации
+читают этот пул, а не ходят во внешние API на пути запроса.
+
+Запуск - команда ingest_feeds (из cron или с --loop).
+"""
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.db import transaction # pyright: ignore[reportMissingModuleSource]
+from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+from django.utils.dateparse import parse_datetime # pyright: ignore[reportMissingModuleSource]
+
+from . import keywords
+from .models import DiscoveredItem, IngestionCheckpoint
+from .services import NewsAPIClient, YouTubeAPIClient
+from .urlnorm import url_hash
+
+
+class IngestionError(Exception):
+    """Источник вернул ошибку; проход продолжится с той же страницы"""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _fetch_news(query, page, page_size):
+    articles = NewsAPIClient().search_articles(query, page_size=page_size, page=page)
+    if isinstance(articles, dict):
+        raise IngestionError(articles.get('error', 'Unknown error'))
+    return articles
+
+
+def _fetch_youtube(query, page, page_size):
+    # YouTubeAPIClient не поддерживает постраничную выдачу
+    if page > 1:
+        return []
+    videos = YouTubeAPIClient().search_videos(query, max_results=page_size)
+    return [{**video, 'external_id': video.get('external_id') or video['url'][:100]} for video in videos]
+
+
+FETCHERS = {
+    'news': _fetch_news,
+    'youtube': _fetch_youtube,
+}
+
+
+def fetch_batch(provider, query, page, page_size):
+    """Одна страница выдачи источника в формате _format_articles"""
+    try:
+        fetch = FETCHERS[provider]
+    except KeyError:
+        raise IngestionError(f'Неизвестный источник: {provider}')
+    return fetch(query, page, page_size)
+
+
+def _parse_published(value):
+    try:
+        return parse_datetime(value) if value else None
+    except ValueError:
+        return None
+
+
+def store_batch(provider, query, rows):
+    """Вставка пачки без дубликатов (по хешу URL и external_id). Возвращает число новых"""
+    items = {}
+    for row in rows:
+        url = row.get('url')
+        if not url or not row.get('title'):
+            continue
+        key = url_hash(url)
+        if key in items:
+            continue
+        items[key] = DiscoveredItem(
+            provider=provider,
+            external_id=(row.get('external_id') or url)[:100],
+            url_hash=key,
+            url=url[:500],
+            title=row['title'][:500],
+            description=row.get('description') or '',
+            source=(row.get('source') or '')[:200],
+            content_type=row.get('content_type') or 'article',
+            tags=list(row.get('tags') or []),
+            query=query[:200],
+            published_at=_parse_published(row.get('published_at')),
+        )
+    if not items:
+        return 0
+
+    seen_hashes = set(
+        DiscoveredItem.objects.filter(url_hash__in=list(items)).values_list('url_hash', flat=True)
+    )
+    seen_ids = set(
+        DiscoveredItem.objects.filter(
+            provider=provider, external_id__in=[item.external_id for item in items.values()]
+        ).values_list('external_id', flat=True)
+    )
+    new_items = [
+        item for key, item in items.items()
+        if key not in seen_hashes and item.external_id not in seen_ids
+    ]
+    # Теги источника (запрос, издание) дополняются ключевыми словами (TF-IDF одной пачкой)
+    suggestions = keywords.suggest_batch([(item.title, item.description) for item in new_items])
+    for item, suggested in zip(new_items, suggestions):
+        item.tags = list(dict.fromkeys([*item.tags, *suggested]))
+        item.fill_search_text()
+    # ignore_conflicts - на случай параллельного прохода с тем же URL
+    DiscoveredItem.objects.bulk_create(new_items, ignore_conflicts=True)
+    return len(new_items)
+
+
+def ingest_query(provider, query, page_size=None, max_pages=None, interval=None, force=False):
+    """
+    Проход по страницам одной пары (источник, запрос).
+
+    Возвращает число новых материалов или None, если предыдущий проход
+    завершился меньше interval секунд назад.
+    """
+    page_size = page_size or _setting('FEED_INGEST_PAGE_SIZE', 50)
+    max_pages = max_pages or _setting('FEED_INGEST_MAX_PAGES', 5)
+    interval = interval if interval is not None else _setting('FEED_INGEST_INTERVAL', 3600)
+
+    checkpoint, _ = IngestionCheckpoint.objects.get_or_create(provider=provider, query=query)
+    if checkpoint.next_page == 1:
+        recently = checkpoint.completed_at and (timezone.now() - checkpoint.completed_at).total_seconds() < interval
+        if recently and not force:
+            return None
+        checkpoint.items_ingested = 0
+
+    inserted = 0
+    while checkpoint.next_page <= max_pages:
+        rows = fetch_batch(provider, query, checkpoint.next_page, page_size)
+        last_page = len(rows) < page_size
+        with transaction.atomic():
+            added = store_batch(provider, query, rows)
+            checkpoint.items_ingested += added
+            checkpoint.next_page = max_pages + 1 if last_page else checkpoint.next_page + 1
+            checkpoint.save()
+        inserted += added
+
+    checkpoint.next_page = 1
+    checkpoint.completed_at = timezone.now()
+    checkpoint.save()
+    return inserted
+
+
+def ingest(queries=None, providers=None, page_size=None, max_pages=None, force=False):
+    """
+    Загрузка по всем настроенным запросам и источникам.
+
+    Возвращает отчет: [{'provider', 'query', 'status', 'items' | 'error'}],
+    статусы: ingested, skipped, failed.
+    """
+    queries = queries or _setting('FEED_INGEST_QUERIES', [])
+    providers = providers or _setting('FEED_INGEST_PROVIDERS', list(FETCHERS))
+
+    report = []
+    for query in queries:
+        for provider in providers:
+            entry = {'provider': provider, 'query': query}
+            try:
+                inserted = ingest_query(provider, query, page_size=page_size, max_pages=max_pages, force=force)
+            except IngestionError as e:
+                entry.update(status='failed', error=str(e))
+            else:
+                if inserted is None:
+                    entry.update(status='skipped', items=0)
+                else:
+                    entry.update(status='ingested', items=inserted)
+            report.append(entry)
+    return report
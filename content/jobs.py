@@ -0,0 +1,57 @@
+"""
+Локальные пулы фоновых задач.
+
+Каждый вид задач получает свой ThreadPoolExecutor с собственным лимитом
+параллельности, поэтому медленные задачи не занимают воркеры запросов.
+Статус задач хранится в БД, так что его видит любой процесс. Сама очередь
+пула живет в памяти: после перезапуска задачи из очереди и зависшие
+задачи восстанавливает команда recover_jobs (удаления - run_deletions).
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.db import close_old_connections, transaction # pyright: ignore[reportMissingModuleSource]
+
+logger = logging.getLogger(__name__)
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name, max_workers):
+    """Пул потоков для вида задач (создается один раз на процесс)"""
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'content-{name}')
+            _executors[name] = executor
+        return executor
+
+
+def _run(func, *args, **kwargs):
+    # У потока пула свое соединение с БД - закрываем его до и после задачи
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception('Ошибка фоновой задачи %s', getattr(func, '__name__', func))
+        raise
+    finally:
+        close_old_connections()
+
+
+def submit(name, func, *args, max_workers=4, **kwargs):
+    """
+    Запуск задачи в пуле `name` после коммита текущей транзакции.
+
+    При BACKGROUND_JOBS_EAGER = True задача выполняется сразу в текущем
+    потоке (используется в тестах).
+    """
+    if getattr(settings, 'BACKGROUND_JOBS_EAGER', False):
+        func(*args, **kwargs)
+        return
+
+    executor = get_executor(name, max_workers)
+    transaction.on_commit(lambda: executor.submit(_run, func, *args, **kwargs))
@@ -0,0 +1,274 @@
+"""
+Ключевые слова для автотегов (TF-IDF).
+
+Документ - заголовок, описание и сохраненный текст страницы элемента
+(content.page_text), токены заголовка весят вдвое больше. Документные
+частоты корпуса хранятся в таблице TermFrequency (строка на термин и
+общий счетчик документов) и обновляются пачкой при создании, правке
+заголовка или описания и удалении элементов (content.signals, bulk_import,
+content.deletion), а не пересчитываются по всей базе. Изменения - UPDATE
+с F-выражением (параллельные записи не теряют приращения); общий счетчик,
+который меняет каждая запись, разбит на TOTAL_SHARDS строк. Оценка пачки векторизована: все документы пачки - один
+разреженный набор (документ, термин, вес) в NumPy, частоты читаются
+одним запросом на пачку.
+
+Пересборка частот по текущим данным - команда rebuild_keywords.
+"""
+import random
+from collections import Counter, defaultdict
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.db import transaction # pyright: ignore[reportMissingModuleSource]
+from django.db.models import F, Value # pyright: ignore[reportMissingModuleSource]
+from django.db.models.functions import Greatest # pyright: ignore[reportMissingModuleSource]
+
+from .simhash import tokenize
+
+TITLE_WEIGHT = 2
+MAX_TERM_LENGTH = 50
+# Сколько символов полного текста страницы учитывать (content.page_text)
+TEXT_CHARS = 20_000
+TOTAL_KEY = ''
+# Части общего счетчика (ключ с пробелом не совпадет с термином); сумма - число документов
+TOTAL_SHARDS = 8
+TOTAL_KEYS = [TOTAL_KEY, *(f' {shard}' for shard in range(1, TOTAL_SHARDS))]
+# Частоты читаются и пишутся порциями (лимит параметров запроса SQLite)
+QUERY_CHUNK = 500
+# Слишком частые термины не становятся тегами, когда корпус достаточно велик
+MIN_CORPUS_FOR_RATIO = 20
+
+STOP_WORDS = {
+    'about', 'after', 'all', 'also', 'can', 'get', 'has', 'have', 'into', 'more', 'new', 'not',
+    'one', 'our', 'out', 'use', 'using', 'was', 'were', 'when', 'which', 'who', 'why', 'will',
+    'без', 'все', 'всё', 'его', 'если', 'еще', 'ещё', 'они', 'она', 'при', 'про', 'так', 'там',
+    'уже', 'чем', 'через', 'над', 'под', 'вам', 'вас', 'нас', 'наш', 'ваш', 'был', 'была', 'было',
+}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def terms(title, description='', text=''):
+    """Веса терминов документа: {термин: вес}. text - полный текст страницы (начало)"""
+    weights = Counter()
+    for weight, part in ((TITLE_WEIGHT, title), (1, description), (1, (text or '')[:TEXT_CHARS])):
+        for token in tokenize(part or ''):
+            if len(token) < 3 or token.isdigit() or token in STOP_WORDS:
+                continue
+            weights[token[:MAX_TERM_LENGTH]] += weight
+    return weights
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), QUERY_CHUNK):
+        yield values[start:start + QUERY_CHUNK]
+
+
+def apply(delta, term_model=None):
+    """
+    Прибавить изменения {термин: дельта} к частотам: недостающие строки
+    вставляются, затем один UPDATE documents = documents + дельта на группу
+    терминов с равной дельтой (частота терминов не уходит ниже нуля).
+    """
+    if term_model is None:
+        from .models import TermFrequency as term_model
+
+    delta = {term: change for term, change in delta.items() if change}
+    if not delta:
+        return
+    groups = defaultdict(list)
+    for term, change in delta.items():
+        groups[change].append(term)
+
+    with transaction.atomic():
+        added = [term for term, change in delta.items() if change > 0 or term in TOTAL_KEYS]
+        existing = set()
+        for chunk in _chunks(added):
+            existing.update(term_model.objects.filter(term__in=chunk).values_list('term', flat=True))
+        term_model.objects.bulk_create(
+            [term_model(term=term, documents=0) for term in added if term not in existing],
+            batch_size=QUERY_CHUNK, ignore_conflicts=True,
+        )
+        for change, terms_ in groups.items():
+            for chunk in _chunks(terms_):
+                rows = term_model.objects.filter(term__in=chunk)
+                if change > 0:
+                    rows.update(documents=F('documents') + change)
+                else:
+                    # Части общего счетчика могут быть отрицательными - важна сумма
+                    rows.filter(term__in=TOTAL_KEYS).update(documents=F('documents') + change)
+                    rows.exclude(term__in=TOTAL_KEYS).update(documents=Greatest(F('documents') + change, Value(0)))
+
+
+def record_documents(documents, term_model=None, sign=1):
+    """
+    Учесть новые (sign=-1 - удаленные) документы в частотах: documents -
+    итерируемое наборов терминов (например, результатов terms).
+    Возвращает число документов.
+    """
+    delta = Counter()
+    count = 0
+    for document in documents:
+        delta.update(set(document))
+        count += 1
+    if not count:
+        return 0
+    delta = {term: sign * added for term, added in delta.items()}
+    delta[random.choice(TOTAL_KEYS)] = sign * count
+    apply(delta, term_model)
+    return count
+
+
+def replace_document(old, new, term_model=None):
+    """Документ изменился: old и new - наборы терминов до и после"""
+    old, new = set(old), set(new)
+    delta = {term: 1 for term in new - old}
+    delta.update((term, -1) for term in old - new)
+    apply(delta, term_model)
+
+
+def record_items(items, sign=1):
+    """Учесть созданные (sign=-1 - удаляемые) элементы вместе с сохраненным текстом страниц"""
+    from .page_text import texts_for_resources
+
+    items = list(items)
+    texts = texts_for_resources(item.resource_id for item in items)
+    return record_documents(
+        (terms(item.title, item.full_description, texts.get(item.resource_id, '')) for item in items),
+        sign=sign,
+    )
+
+
+def replace_item(indexed, item):
+    """Элемент изменился: indexed - прежние (заголовок, описание, id ресурса)"""
+    from .models import Resource
+    from .page_text import texts_for_resources
+
+    title, description, resource_id = indexed
+    if description is None and resource_id is not None:
+        description = Resource.objects.filter(pk=resource_id).values_list('description', flat=True).first() or ''
+    texts = texts_for_resources([resource_id, item.resource_id])
+    replace_document(
+        terms(title, description, texts.get(resource_id, '')),
+        terms(item.title, item.full_description, texts.get(item.resource_id, '')),
+    )
+
+
+def remove_queryset(queryset, chunk_size=QUERY_CHUNK):
+    """Вычесть документы набора элементов (до удаления), порциями"""
+    from .page_text import texts_for_resources
+    from .resources import FULL_DESCRIPTION
+
+    removed = 0
+    rows = queryset.order_by('pk').values_list('pk', 'title', FULL_DESCRIPTION, 'resource_id')
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(pk__gt=last_id)[:chunk_size])
+        if not chunk:
+            return removed
+        last_id = chunk[-1][0]
+        texts = texts_for_resources(resource_id for *_, resource_id in chunk)
+        removed += record_documents(
+            (terms(title, description, texts.get(resource_id, '')) for _, title, description, resource_id in chunk),
+            sign=-1,
+        )
+
+
+def document_frequencies(vocabulary):
+    """(число документов, {термин: документная частота}) для словаря пачки"""
+    from .models import TermFrequency
+
+    frequencies = {}
+    for chunk in _chunks([*vocabulary, *TOTAL_KEYS]):
+        frequencies.update(TermFrequency.objects.filter(term__in=chunk).values_list('term', 'documents'))
+    return max(sum(frequencies.pop(key, 0) for key in TOTAL_KEYS), 0), frequencies
+
+
+def suggest_batch(documents, limit=None):
+    """
+    Теги для пачки документов: documents - список (заголовок, описание)
+    или (заголовок, описание, текст страницы); возвращает списки тегов в
+    том же порядке (по убыванию TF-IDF).
+    """
+    import numpy as np # pyright: ignore[reportMissingImports]
+
+    limit = limit or _setting('AUTO_TAGS_LIMIT', 5)
+    max_ratio = _setting('AUTO_TAGS_MAX_DOCUMENT_RATIO', 0.5)
+
+    vocabulary = {}
+    doc_ids, term_ids, counts = [], [], []
+    for position, document in enumerate(documents):
+        for term, weight in terms(*document).items():
+            doc_ids.append(position)
+            term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(weight)
+    result = [[] for _ in documents]
+    if not vocabulary:
+        return result
+
+    total, frequencies = document_frequencies(vocabulary)
+    names = list(vocabulary)
+    df = np.array([frequencies.get(term, 0) for term in names], dtype=np.float64)
+    idf = np.log((1 + total) / (1 + df)) + 1
+    if total >= MIN_CORPUS_FOR_RATIO:
+        idf[df > max_ratio * total] = 0
+
+    doc_ids = np.array(doc_ids)
+    term_ids = np.array(term_ids)
+    counts = np.array(counts, dtype=np.float64)
+    lengths = np.bincount(doc_ids, weights=counts, minlength=len(documents))
+    scores = counts / lengths[doc_ids] * idf[term_ids]
+
+    # По документу, затем по убыванию оценки; при равенстве - порядок появления
+    order = np.lexsort((term_ids, -scores, doc_ids))
+    bounds = np.searchsorted(doc_ids[order], np.arange(len(documents) + 1))
+    for position in range(len(documents)):
+        selected = order[bounds[position]:bounds[position + 1]]
+        selected = selected[scores[selected] > 0][:limit]
+        result[position] = [names[term_ids[index]] for index in selected]
+    return result
+
+
+def suggest_tags(title, description='', text='', limit=None):
+    """Теги для одного документа"""
+    return suggest_batch([(title, description, text)], limit=limit)[0]
+
+
+def rebuild(chunk_size=5000, content_item_model=None, term_model=None, with_text=True):
+    """
+    Полный пересчет частот по текущим элементам (чанками по id). with_text -
+    учитывать сохраненный текст страниц. Возвращает число терминов.
+    """
+    from .page_text import texts_for_resources
+    from .resources import FULL_DESCRIPTION
+
+    if content_item_model is None or term_model is None:
+        from .models import ContentItem, TermFrequency
+        content_item_model = content_item_model or ContentItem
+        term_model = term_model or TermFrequency
+
+    frequencies = Counter()
+    last_id = 0
+    while True:
+        rows = list(
+            content_item_model.objects.filter(pk__gt=last_id).order_by('pk')
+            .values_list('pk', 'title', FULL_DESCRIPTION, 'resource_id')[:chunk_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        texts = texts_for_resources(resource_id for *_, resource_id in rows) if with_text else {}
+        for _, title, description, resource_id in rows:
+            frequencies.update(terms(title, description, texts.get(resource_id, '')).keys())
+        frequencies[TOTAL_KEY] += len(rows)
+
+    with transaction.atomic():
+        term_model.objects.all().delete()
+        term_model.objects.bulk_create(
+            (term_model(term=term, documents=count) for term, count in frequencies.items()),
+            batch_size=QUERY_CHUNK,
+        )
+    return len(frequencies) - (TOTAL_KEY in frequencies)
@@ -0,0 +1,160 @@
+"""
+Проверка доступности сохраненных ссылок.
+
+ContentItem.url обходятся чанками по возрастанию id, каждая уникальная
+(после нормализации) ссылка проверяется HEAD-запросом, а если сервер не
+поддерживает HEAD - GET первого байта (Range: bytes=0-0). Запросы идут
+параллельно (content.fetching.run_batches) с лимитом и минимальным
+интервалом на хост; следующий чанк читается, пока проверяется текущий.
+Результат - статус, итоговый URL после редиректов и время проверки
+в таблице LinkHealth; после каждого чанка сохраняется контрольная точка.
+
+Сетевые ошибки (таймаут, отказ соединения, открытый circuit breaker)
+не считаются ответом сервера: у ссылки обновляется только текст ошибки,
+статус и время последней удачной проверки остаются прежними, и ссылка
+проверяется снова в следующем проходе.
+
+Запуск - команда check_links.
+"""
+from datetime import timedelta
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.db import transaction # pyright: ignore[reportMissingModuleSource]
+from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+
+from .fetching import run_batches
+from .models import ContentItem, CrawlCheckpoint, LinkHealth
+from .parsing import REQUEST_HEADERS
+from .urlnorm import url_hash
+
+CHECKPOINT_NAME = 'link_health'
+
+# Ответы, после которых HEAD повторяется ranged GET-запросом
+HEAD_UNSUPPORTED = {403, 405, 501}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def check_url(url, timeout=None, retries=0):
+    """Проверка одной ссылки: (HTTP-статус, итоговый URL)"""
+    from . import http_client
+
+    response = http_client.head(
+        url, headers=REQUEST_HEADERS, allow_redirects=True, timeout=timeout, retries=retries
+    )
+    response.close()
+    if response.status_code in HEAD_UNSUPPORTED:
+        response = http_client.get(
+            url, headers={**REQUEST_HEADERS, 'Range': 'bytes=0-0'},
+            allow_redirects=True, stream=True, timeout=timeout, retries=retries
+        )
+        response.close()
+    return response.status_code, response.url or url
+
+
+def _save_results(results, urls, checked_at):
+    checked, failed = [], []
+    for key, url in urls.items():
+        result, error = results[url]
+        if error is not None:
+            failed.append(LinkHealth(
+                url_hash=key, url=url[:500], error=f'{type(error).__name__}: {error}'[:200], checked_at=None,
+            ))
+            continue
+        status_code, final_url = result
+        checked.append(LinkHealth(
+            url_hash=key,
+            url=url[:500],
+            status_code=status_code,
+            final_url=final_url[:500] if final_url != url else '',
+            error='',
+            checked_at=checked_at,
+        ))
+    LinkHealth.objects.bulk_create(
+        checked, update_conflicts=True, unique_fields=['url_hash'],
+        update_fields=['url', 'status_code', 'final_url', 'error', 'checked_at'],
+    )
+    # Ошибка сети не перезаписывает прошлый ответ сервера
+    LinkHealth.objects.bulk_create(
+        failed, update_conflicts=True, unique_fields=['url_hash'], update_fields=['url', 'error'],
+    )
+    return checked, failed
+
+
+def crawl(chunk_size=None, max_workers=None, per_host=None, min_interval=None,
+          timeout=None, recheck_after=None, restart=False, max_chunks=None, progress=None):
+    """
+    Проход по всем ссылкам с продолжением с контрольной точки.
+
+    recheck_after - ссылки, проверенные позже этого (секунды), пропускаются;
+    max_chunks - ограничение числа чанков за запуск; progress(stats) -
+    вызывается после каждого чанка. Возвращает статистику прохода.
+    """
+    chunk_size = chunk_size or _setting('LINK_CHECK_CHUNK_SIZE', 2000)
+    max_workers = max_workers or _setting('LINK_CHECK_CONCURRENCY', 64)
+    per_host = per_host or _setting('LINK_CHECK_PER_HOST', 2)
+    min_interval = min_interval if min_interval is not None else _setting('LINK_CHECK_MIN_INTERVAL', 0.5)
+    timeout = timeout or _setting('LINK_CHECK_TIMEOUT', 10)
+    if recheck_after is None:
+        recheck_after = _setting('LINK_CHECK_RECHECK_AFTER', 7 * 24 * 60 * 60)
+
+    checkpoint, _ = CrawlCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+    if restart or checkpoint.last_id == 0:
+        checkpoint.last_id = 0
+        checkpoint.started_at = timezone.now()
+        checkpoint.save(update_fields=['last_id', 'started_at', 'updated_at'])
+
+    stats = {'items': 0, 'checked': 0, 'skipped': 0, 'broken': 0, 'errors': 0, 'completed': False}
+    reached_end = False
+
+    def chunks():
+        nonlocal reached_end
+        last_id, count = checkpoint.last_id, 0
+        while max_chunks is None or count < max_chunks:
+            rows = list(
+                ContentItem.objects.filter(pk__gt=last_id).exclude(url='')
+                .order_by('pk').values_list('pk', 'url')[:chunk_size]
+            )
+            if not rows:
+                reached_end = True
+                return
+            last_id, count = rows[-1][0], count + 1
+
+            urls = {}
+            for _, url in rows:
+                urls.setdefault(url_hash(url), url)
+            fresh = set(
+                LinkHealth.objects.filter(
+                    url_hash__in=list(urls), checked_at__gte=timezone.now() - timedelta(seconds=recheck_after)
+                ).values_list('url_hash', flat=True)
+            )
+            to_check = {key: url for key, url in urls.items() if key not in fresh}
+            yield (rows, urls, to_check), list(to_check.values())
+
+    batches = run_batches(
+        chunks(), lambda url: check_url(url, timeout=timeout),
+        max_workers=max_workers, per_host=per_host, min_interval=min_interval,
+    )
+    for (rows, urls, to_check), results in batches:
+        with transaction.atomic():
+            checked, failed = _save_results(results, to_check, timezone.now())
+            checkpoint.last_id = rows[-1][0]
+            checkpoint.save(update_fields=['last_id', 'updated_at'])
+
+        stats['items'] += len(rows)
+        stats['checked'] += len(checked) + len(failed)
+        stats['skipped'] += len(urls) - len(to_check)
+        stats['broken'] += sum(1 for row in checked if row.is_broken)
+        stats['errors'] += len(failed)
+        if progress is not None:
+            progress(stats)
+
+    if reached_end:
+        checkpoint.last_id = 0
+        checkpoint.completed_at = timezone.now()
+        checkpoint.save(update_fields=['last_id', 'completed_at', 'updated_at'])
+        stats['completed'] = True
+
+    return stats
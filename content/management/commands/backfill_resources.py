@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from content.resources import backfill, strip_descriptions
+
+class Command(BaseCommand):
+    help = "Привязывает элементы контента без ресурса к общим ресурсам (Resource) по URL"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Элементов за транзакцию')
+
+    def handle(self, *args, **options):
+        count = backfill(
+            chunk_size=options['chunk_size'],
+            progress=lambda done: self.stdout.write(f'  обработано {done}'),
+        )
+        cleared = strip_descriptions(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Привязано элементов: {count}, убрано копий описания ресурса: {cleared}"
+        ))
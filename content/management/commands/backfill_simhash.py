@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from content.simhash import backfill
+
+class Command(BaseCommand):
+    help = "Считает SimHash-отпечатки для элементов контента без них"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Элементов за транзакцию')
+        parser.add_argument('--all', action='store_true', help='Пересчитать отпечатки всех элементов')
+
+    def handle(self, *args, **options):
+        count = backfill(
+            chunk_size=options['chunk_size'],
+            recompute=options['all'],
+            progress=lambda done: self.stdout.write(f'  обработано {done}'),
+        )
+        self.stdout.write(self.style.SUCCESS(f"✓ Обработано элементов: {count}"))
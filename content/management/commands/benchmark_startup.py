@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand, CommandError # pyright: ignore[reportMissingModuleSource]
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+import json
+import os
+import subprocess
+import sys
+
+# Тяжелые зависимости, которые не должны загружаться при старте воркера.
+# requests здесь нет: его безусловно импортирует rest_framework.compat
+HEAVY_MODULES = ['pandas', 'numpy', 'plotly', 'bs4']
+
+# Скрипт выполняется в отдельном интерпретаторе, чтобы замер был "холодным"
+BENCHMARK_SCRIPT = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+import content.views, content.api_views, content.services
+import content.vizualizations, content.recommendation_engine
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'import_ms': round(elapsed * 1000, 1),
+    'rss_mb': round(rss_kb / 1024, 1),
+    'heavy_loaded': [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def measure_startup():
+    """Замер времени импорта и RSS после django.setup() в чистом процессе"""
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+    result = subprocess.run(
+        [sys.executable, '-c', BENCHMARK_SCRIPT % (HEAVY_MODULES,)],
+        cwd=settings.BASE_DIR, env=env,
+        capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise CommandError(result.stderr.strip())
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class Command(BaseCommand):
+    help = "Замеряет время старта и память воркера (регрессионный бенчмарк)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Количество запусков')
+        parser.add_argument('--max-import-ms', type=float, default=1000.0,
+                            help='Порог времени импорта (мс)')
+        parser.add_argument('--max-rss-mb', type=float, default=80.0,
+                            help='Порог памяти процесса (МБ)')
+
+    def handle(self, *args, **options):
+        runs = [measure_startup() for _ in range(max(1, options['runs']))]
+
+        # Берем лучший результат: он меньше всего зависит от шума окружения
+        import_ms = min(r['import_ms'] for r in runs)
+        rss_mb = min(r['rss_mb'] for r in runs)
+        heavy_loaded = sorted(set(m for r in runs for m in r['heavy_loaded']))
+
+        self.stdout.write(f"Время импорта: {import_ms} мс")
+        self.stdout.write(f"Память (RSS): {rss_mb} МБ")
+
+        errors = []
+        if heavy_loaded:
+            errors.append(f"при старте загружены тяжелые модули: {', '.join(heavy_loaded)}")
+        if import_ms > options['max_import_ms']:
+            errors.append(f"время импорта {import_ms} мс > {options['max_import_ms']} мс")
+        if rss_mb > options['max_rss_mb']:
+            errors.append(f"RSS {rss_mb} МБ > {options['max_rss_mb']} МБ")
+
+        if errors:
+            raise CommandError('Регрессия старта: ' + '; '.join(errors))
+
+        self.stdout.write(self.style.SUCCESS("✓ Старт укладывается в пороги"))
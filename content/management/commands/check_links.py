@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from content.link_health import crawl
+import time
+
+class Command(BaseCommand):
+    help = "Проверяет доступность сохраненных ссылок (с продолжением с контрольной точки)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, help='Элементов контента за чанк')
+        parser.add_argument('--concurrency', type=int, help='Общий лимит параллельных запросов')
+        parser.add_argument('--per-host', type=int, help='Одновременных запросов к одному хосту')
+        parser.add_argument('--min-interval', type=float, help='Минимальная пауза между запросами к хосту (с)')
+        parser.add_argument('--timeout', type=float, help='Таймаут одного запроса (с)')
+        parser.add_argument('--recheck-after', type=int, help='Не проверять ссылки, проверенные за последние N секунд')
+        parser.add_argument('--max-chunks', type=int, help='Остановиться после N чанков (продолжение - следующим запуском)')
+        parser.add_argument('--restart', action='store_true', help='Начать проход заново, игнорируя контрольную точку')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        
+        def progress(stats):
+            self.stdout.write(f"  обработано {stats['items']}, проверено {stats['checked']}, "
+                              f"битых {stats['broken']}, ошибок {stats['errors']}")
+        
+        stats = crawl(
+            chunk_size=options['chunk_size'], max_workers=options['concurrency'],
+            per_host=options['per_host'], min_interval=options['min_interval'],
+            timeout=options['timeout'], recheck_after=options['recheck_after'],
+            restart=options['restart'], max_chunks=options['max_chunks'], progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+        
+        state = 'проход завершен' if stats['completed'] else 'продолжение со следующего запуска'
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Проверено {stats['checked']} ссылок за {elapsed:.1f} с "
+            f"(битых: {stats['broken']}, ошибок: {stats['errors']}, пропущено: {stats['skipped']}; {state})"
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError # pyright: ignore[reportMissingModuleSource]
+from django.contrib.auth.models import User # pyright: ignore[reportMissingModuleSource]
+from content.deletion import delete_user, run_deletion_job
+
+class Command(BaseCommand):
+    help = "Удаляет пользователя и его данные порциями в коротких транзакциях"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Имя пользователя')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"Пользователь {options['username']} не найден")
+
+        job = run_deletion_job(delete_user(user, background=False).pk)
+        if job.status != 'done':
+            raise CommandError(f"{job.error} (задача {job.pk}, повтор: run_deletions --failed)")
+        self.stdout.write(self.style.SUCCESS(f"✓ Удалено строк: {job.processed}"))
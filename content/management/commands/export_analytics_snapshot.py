@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from content.analytics_snapshot import export_snapshot, get_snapshot_dir
+import time
+
+class Command(BaseCommand):
+    help = "Выгружает аналитические колонки ContentItem в колоночный снимок (.npy)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Каталог снимка (по умолчанию ANALYTICS_SNAPSHOT_DIR)')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Размер чанка чтения')
+
+    def handle(self, *args, **options):
+        path = options['path'] or get_snapshot_dir()
+        started = time.perf_counter()
+        
+        rows = export_snapshot(path=path, chunk_size=options['chunk_size'])
+        
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Снимок сохранен в {path}: {rows} записей за {elapsed:.2f} с"
+        ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError # pyright: ignore[reportMissingModuleSource]
+from django.contrib.auth.models import User # pyright: ignore[reportMissingModuleSource]
+from content.bookmark_import import FORMATS, ImportFormatError, import_bookmarks, iter_bookmarks
+import sys
+import time
+
+class Command(BaseCommand):
+    help = "Импортирует закладки из файла экспорта (Netscape HTML, CSV, JSON) без загрузки страниц"
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help="Файл экспорта ('-' - stdin, нужен --format)")
+        parser.add_argument('--user', required=True, help='Имя пользователя-владельца')
+        parser.add_argument('--format', choices=FORMATS, help='Формат (по умолчанию - по имени и содержимому)')
+        parser.add_argument('--chunk-size', type=int, help='Строк в одной транзакции')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Пользователь {options['user']} не найден")
+        if options['file'] == '-' and not options['format']:
+            raise CommandError('Для stdin нужен --format')
+        
+        started = time.perf_counter()
+        
+        def progress(stats):
+            self.stdout.write(
+                f"  обработано {stats['total']}: создано {stats['created']}, "
+                f"дубликатов {stats['duplicate']}, некорректных {stats['invalid']}"
+            )
+        
+        binary = sys.stdin.buffer if options['file'] == '-' else open(options['file'], 'rb')
+        try:
+            rows = iter_bookmarks(binary, options['format'], name=options['file'])
+            stats = import_bookmarks(user, rows, chunk_size=options['chunk_size'], progress=progress)
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+        finally:
+            if binary is not sys.stdin.buffer:
+                binary.close()
+        
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Импортировано {stats['created']} из {stats['total']} закладок за {elapsed:.1f} с"
+        ))
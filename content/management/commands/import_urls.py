@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError # pyright: ignore[reportMissingModuleSource]
+from django.contrib.auth.models import User # pyright: ignore[reportMissingModuleSource]
+from content.bulk_import import import_urls
+from collections import Counter
+import sys
+import time
+
+class Command(BaseCommand):
+    help = "Импортирует список URL (по одному в строке) с параллельной загрузкой"
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help="Файл со списком URL ('-' - stdin)")
+        parser.add_argument('--user', required=True, help='Имя пользователя-владельца')
+        parser.add_argument('--concurrency', type=int, help='Общий лимит параллельных запросов')
+        parser.add_argument('--per-host', type=int, help='Лимит запросов к одному хосту')
+        parser.add_argument('--timeout', type=float, help='Таймаут одного запроса (с)')
+        parser.add_argument('--deadline', type=float, help='Дедлайн всей пачки (с)')
+        parser.add_argument('--verbose-report', action='store_true', help='Вывести результат по каждому URL')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Пользователь {options['user']} не найден")
+        
+        if options['file'] == '-':
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(options['file'], encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        urls = [line.strip() for line in lines if line.strip() and not line.startswith('#')]
+        
+        started = time.perf_counter()
+        report = import_urls(
+            user, urls,
+            max_workers=options['concurrency'], per_host=options['per_host'],
+            timeout=options['timeout'], deadline=options['deadline'],
+        )
+        elapsed = time.perf_counter() - started
+        
+        if options['verbose_report']:
+            for entry in report:
+                details = entry.get('id') or entry.get('error', '')
+                self.stdout.write(f"{entry['status']:<10} {entry['url']} {details}")
+        
+        counts = Counter(entry['status'] for entry in report)
+        summary = ', '.join(f'{status}: {count}' for status, count in sorted(counts.items()))
+        self.stdout.write(self.style.SUCCESS(f"✓ Обработано {len(report)} URL за {elapsed:.1f} с ({summary})"))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from content.ingestion import ingest
+from collections import Counter
+import time
+
+class Command(BaseCommand):
+    help = "Загружает материалы по настроенным запросам из внешних источников в общий пул"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--query', action='append', dest='queries', help='Запрос (по умолчанию FEED_INGEST_QUERIES)')
+        parser.add_argument('--provider', action='append', dest='providers', help='Источник: news, youtube')
+        parser.add_argument('--page-size', type=int, help='Размер страницы выдачи')
+        parser.add_argument('--max-pages', type=int, help='Страниц на запрос за проход')
+        parser.add_argument('--force', action='store_true', help='Не пропускать недавно загруженные запросы')
+        parser.add_argument('--loop', action='store_true', help='Повторять проходы каждые --interval секунд')
+        parser.add_argument('--interval', type=int, help='Пауза между проходами (с), по умолчанию FEED_INGEST_INTERVAL')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or getattr(settings, 'FEED_INGEST_INTERVAL', 3600)
+        
+        while True:
+            started = time.perf_counter()
+            report = ingest(
+                queries=options['queries'], providers=options['providers'],
+                page_size=options['page_size'], max_pages=options['max_pages'], force=options['force'],
+            )
+            elapsed = time.perf_counter() - started
+            
+            for entry in report:
+                if entry['status'] == 'failed':
+                    self.stderr.write(f"{entry['provider']}: {entry['query']} - {entry['error']}")
+            
+            counts = Counter(entry['status'] for entry in report)
+            summary = ', '.join(f'{status}: {count}' for status, count in sorted(counts.items()))
+            items = sum(entry.get('items', 0) for entry in report)
+            self.stdout.write(self.style.SUCCESS(f"✓ Загружено {items} материалов за {elapsed:.1f} с ({summary})"))
+            
+            if not options['loop']:
+                break
+            time.sleep(interval)
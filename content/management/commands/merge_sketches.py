@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from content.sketches import MERGE_CHUNK, merge_deltas
+
+class Command(BaseCommand):
+    help = "Вливает накопленные изменения в скетчи аналитики. Запускать по расписанию"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=MERGE_CHUNK, help='Изменений за транзакцию')
+
+    def handle(self, *args, **options):
+        count = merge_deltas(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"✓ Влито изменений: {count}"))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from content.counters import rebuild
+import time
+
+class Command(BaseCommand):
+    help = "Пересчитывает денормализованные счетчики по текущим данным (сверка, запускать периодически)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Повторять сверку каждые --interval секунд')
+        parser.add_argument('--interval', type=int, help='Пауза между сверками (с), по умолчанию COUNTERS_RECONCILE_INTERVAL')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or getattr(settings, 'COUNTERS_RECONCILE_INTERVAL', 24 * 60 * 60)
+        
+        while True:
+            count = rebuild()
+            self.stdout.write(self.style.SUCCESS(f"✓ Счетчиков: {count}"))
+            
+            if not options['loop']:
+                break
+            time.sleep(interval)
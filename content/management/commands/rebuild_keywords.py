@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from content.keywords import rebuild
+
+class Command(BaseCommand):
+    help = "Пересчитывает документные частоты терминов для автотегов по текущим данным"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Размер чанка чтения')
+
+    def handle(self, *args, **options):
+        count = rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"✓ Терминов в корпусе: {count}"))
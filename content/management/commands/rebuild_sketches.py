@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from content.sketches import rebuild_sketches
+
+class Command(BaseCommand):
+    help = "Пересобирает скетчи аналитики (HyperLogLog, Count-Min) по текущим данным"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Размер чанка чтения')
+
+    def handle(self, *args, **options):
+        count = rebuild_sketches(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"✓ Пересобрано скетчей: {count}"))
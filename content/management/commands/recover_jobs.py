@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+from content.bookmark_import import expire_import_jobs, run_import_job
+from content.bulk_import import expire_batch_jobs, run_batch_job
+from content.models import BatchImportJob, ImportJob, ParseJob
+from content.parsing import expire_parse_jobs, run_parse_job
+
+class Command(BaseCommand):
+    help = (
+        "Восстанавливает фоновые задачи парсинга и импорта (файлов и списков URL) после перезапуска: "
+        "зависшие задачи помечает ошибкой, задачи из очереди старше таймаута выполняет. "
+        "Более новые задачи могут ждать в очереди живого процесса - их выполняет только --all"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--timeout', type=int, help='Секунд с запуска (для очереди - с создания) задачи')
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Выполнить все задачи из очереди (только сразу после перезапуска, когда пулов нет)',
+        )
+
+    def handle(self, *args, **options):
+        timeout = options['timeout']
+        expired = expire_parse_jobs(timeout) + expire_import_jobs(timeout) + expire_batch_jobs(timeout)
+        if expired:
+            self.stdout.write(self.style.WARNING(f"Зависших задач: {expired}"))
+
+        # Очередь пулов живет в памяти процесса - после перезапуска задачи остаются pending
+        runs = [
+            (ParseJob, run_parse_job, getattr(settings, 'PARSE_JOB_TIMEOUT', 600)),
+            (ImportJob, run_import_job, getattr(settings, 'BOOKMARK_IMPORT_JOB_TIMEOUT', 3600)),
+            (BatchImportJob, run_batch_job, getattr(settings, 'BULK_IMPORT_JOB_TIMEOUT', 3600)),
+        ]
+        now = timezone.now()
+        count = 0
+        for model, run, default_timeout in runs:
+            pending = model.objects.filter(status='pending')
+            if not options['all']:
+                age = default_timeout if timeout is None else timeout
+                pending = pending.filter(created_at__lt=now - timedelta(seconds=age))
+            job_ids = list(pending.order_by('created_at').values_list('pk', flat=True))
+            for job_id in job_ids:
+                job = run(job_id)
+                style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+                self.stdout.write(style(f"{job} {job.error}".rstrip()))
+            count += len(job_ids)
+        self.stdout.write(self.style.SUCCESS(f"✓ Выполнено задач: {count}"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError # pyright: ignore[reportMissingModuleSource]
+from content.analytics_db import is_snapshot_enabled, refresh_snapshot
+
+class Command(BaseCommand):
+    help = "Обновляет снимок базы для аналитики (SQLite online backup). Запускать по расписанию"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=1024,
+                            help='Сколько страниц копировать за один шаг backup')
+        parser.add_argument('--max-age', type=int, default=None,
+                            help='Не обновлять снимок моложе стольких секунд (для частого cron)')
+
+    def handle(self, *args, **options):
+        if not is_snapshot_enabled():
+            raise CommandError("Снимок аналитики не настроен (нужны отдельные SQLite-базы default и analytics)")
+        
+        elapsed = refresh_snapshot(pages=options['pages'], max_age=options['max_age'])
+        if elapsed is None:
+            self.stdout.write("Снимок аналитики еще свежий")
+            return
+        self.stdout.write(self.style.SUCCESS(f"✓ Снимок аналитики обновлен за {elapsed:.2f} с"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from content.deletion import run_deletion_job
+from content.models import DeletionJob
+
+class Command(BaseCommand):
+    help = "Выполняет незавершенные задачи фонового удаления (например, после перезапуска)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true', help='Повторить и задачи с ошибкой')
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'running', 'failed'] if options['failed'] else ['pending', 'running']
+        job_ids = list(DeletionJob.objects.filter(status__in=statuses).order_by('created_at').values_list('pk', flat=True))
+        for job_id in job_ids:
+            job = run_deletion_job(job_id)
+            style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+            self.stdout.write(style(f"{job}: обработано {job.processed} из {job.total} {job.error}".rstrip()))
+        self.stdout.write(self.style.SUCCESS(f"✓ Выполнено задач: {len(job_ids)}"))
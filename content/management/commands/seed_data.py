@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
 from django.contrib.auth.models import User # pyright: ignore[reportMissingModuleSource]
 from content.models import Category, ContentItem
+from content import tagging
 import random
 
 class Command(BaseCommand):
@@ -108,6 +109,7 @@ class Command(BaseCommand):
             })
         
         created_count = 0
+        tagged = []
         for item_data in content_items:
             try:
                 category = Category.objects.get(slug=item_data["category_slug"])
@@ -124,13 +126,13 @@ class Command(BaseCommand):
                         status=random.choice(["new", "in_progress", "completed", "postponed"]),
                     )
                     
-                    # Добавляем теги
-                    for tag in item_data["tags"]:
-                        content_item.tags.add(tag)
-                    
+                    tagged.append((content_item, item_data["tags"]))
                     created_count += 1
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f"✗ Ошибка при создании {item_data['title']}: {e}"))
         
+        # Теги всех записей - одной пачкой
+        tagging.assign_tags(tagged)
+        
         self.stdout.write(self.style.SUCCESS(f"✓ Создано {created_count} записей контента"))
         self.stdout.write(self.style.SUCCESS("✓ База данных успешно заполнена!"))
\ No newline at end of file
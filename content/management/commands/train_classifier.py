@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand # pyright: ignore[reportMissingModuleSource]
+from content.classifier import get_model_path, train
+import time
+
+class Command(BaseCommand):
+    help = "Обучает классификатор категорий по категоризированным элементам контента"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Файл модели (по умолчанию CATEGORY_MODEL_PATH)')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Размер чанка чтения')
+        parser.add_argument('--min-items', type=int, help='Минимум примеров для обучения')
+
+    def handle(self, *args, **options):
+        path = options['path'] or get_model_path()
+        started = time.perf_counter()
+        
+        stats = train(path=path, chunk_size=options['chunk_size'], min_items=options['min_items'])
+        
+        elapsed = time.perf_counter() - started
+        if not stats.get('saved'):
+            self.stdout.write(self.style.WARNING(
+                f"Мало данных для обучения: {stats['items']} примеров, {stats['categories']} категорий"
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Модель сохранена в {path}: {stats['items']} примеров, "
+            f"{stats['categories']} категорий за {elapsed:.2f} с"
+        ))
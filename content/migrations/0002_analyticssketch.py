@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True, verbose_name='Ключ')),
+                ('kind', models.CharField(choices=[('hll', 'HyperLogLog'), ('cms', 'Count-Min Sketch')], max_length=3, verbose_name='Тип')),
+                ('data', models.BinaryField(default=b'', verbose_name='Данные (zlib)')),
+                ('heavy_hitters', models.JSONField(blank=True, default=dict, verbose_name='Кандидаты top-k')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Скетч аналитики',
+                'verbose_name_plural': 'Скетчи аналитики',
+            },
+        ),
+    ]
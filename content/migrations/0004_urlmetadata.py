@@ -0,0 +1,34 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_parsejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UrlMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=64, unique=True, verbose_name='Хеш URL')),
+                ('url', models.URLField(max_length=500, verbose_name='Нормализованный URL')),
+                ('title', models.CharField(blank=True, max_length=500, verbose_name='Заголовок')),
+                ('description', models.TextField(blank=True, verbose_name='Описание')),
+                ('keywords', models.JSONField(blank=True, default=list, verbose_name='Ключевые слова')),
+                ('content_type', models.CharField(default='article', max_length=20, verbose_name='Тип контента')),
+                ('category_slug', models.SlugField(blank=True, max_length=100, verbose_name='Категория')),
+                ('etag', models.CharField(blank=True, max_length=255, verbose_name='ETag')),
+                ('last_modified', models.CharField(blank=True, max_length=64, verbose_name='Last-Modified')),
+                ('validated_at', models.DateTimeField(verbose_name='Дата проверки')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Метаданные URL',
+                'verbose_name_plural': 'Метаданные URL',
+            },
+        ),
+    ]
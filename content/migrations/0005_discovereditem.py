@@ -0,0 +1,54 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_urlmetadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=20, verbose_name='Источник данных')),
+                ('query', models.CharField(max_length=200, verbose_name='Запрос')),
+                ('next_page', models.PositiveIntegerField(default=1, verbose_name='Следующая страница')),
+                ('items_ingested', models.PositiveIntegerField(default=0, verbose_name='Загружено за проход')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Проход завершен')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка загрузки',
+                'verbose_name_plural': 'Контрольные точки загрузки',
+                'unique_together': {('provider', 'query')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DiscoveredItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=20, verbose_name='Источник данных')),
+                ('external_id', models.CharField(db_index=True, max_length=100, verbose_name='Внешний ID')),
+                ('url_hash', models.CharField(max_length=64, unique=True, verbose_name='Хеш URL')),
+                ('url', models.URLField(max_length=500, verbose_name='Ссылка')),
+                ('title', models.CharField(max_length=500, verbose_name='Заголовок')),
+                ('description', models.TextField(blank=True, verbose_name='Описание')),
+                ('source', models.CharField(blank=True, max_length=200, verbose_name='Издание')),
+                ('content_type', models.CharField(default='article', max_length=20, verbose_name='Тип контента')),
+                ('tags', models.JSONField(blank=True, default=list, verbose_name='Теги')),
+                ('query', models.CharField(max_length=200, verbose_name='Запрос')),
+                ('published_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата публикации')),
+                ('ingested_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата загрузки')),
+            ],
+            options={
+                'verbose_name': 'Найденный материал',
+                'verbose_name_plural': 'Найденные материалы',
+                'ordering': ['-published_at', '-ingested_at'],
+                'indexes': [models.Index(fields=['content_type', '-published_at'], name='content_dis_content_6f0d8b_idx')],
+            },
+        ),
+    ]
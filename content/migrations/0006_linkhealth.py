@@ -0,0 +1,44 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_discovereditem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawlCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Обход')),
+                ('last_id', models.PositiveBigIntegerField(default=0, verbose_name='Последний id')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начало прохода')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Проход завершен')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка обхода',
+                'verbose_name_plural': 'Контрольные точки обхода',
+            },
+        ),
+        migrations.CreateModel(
+            name='LinkHealth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=64, unique=True, verbose_name='Хеш URL')),
+                ('url', models.URLField(max_length=500, verbose_name='Ссылка')),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='HTTP-статус')),
+                ('final_url', models.URLField(blank=True, max_length=500, verbose_name='Итоговый URL')),
+                ('error', models.CharField(blank=True, max_length=200, verbose_name='Ошибка')),
+                ('checked_at', models.DateTimeField(db_index=True, verbose_name='Дата проверки')),
+            ],
+            options={
+                'verbose_name': 'Состояние ссылки',
+                'verbose_name_plural': 'Состояние ссылок',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0006_linkhealth'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Resource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=64, unique=True, verbose_name='Хеш URL')),
+                ('url', models.URLField(max_length=500, verbose_name='Нормализованный URL')),
+                ('title', models.CharField(blank=True, max_length=200, verbose_name='Заголовок')),
+                ('description', models.TextField(blank=True, verbose_name='Описание')),
+                ('content_type', models.CharField(default='article', max_length=20, verbose_name='Тип контента')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Ресурс',
+                'verbose_name_plural': 'Ресурсы',
+            },
+        ),
+        migrations.AddField(
+            model_name='contentitem',
+            name='resource',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookmarks', to='content.resource', verbose_name='Ресурс'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations # pyright: ignore[reportMissingModuleSource]
+
+
+def backfill_resources(apps, schema_editor):
+    from content.resources import backfill
+
+    backfill(
+        content_item_model=apps.get_model('content', 'ContentItem'),
+        resource_model=apps.get_model('content', 'Resource'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0007_resource'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_resources, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0008_backfill_resources'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentitem',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='SimHash'),
+        ),
+        migrations.AddField(
+            model_name='contentitem',
+            name='simhash_band0',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='contentitem',
+            name='simhash_band1',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='contentitem',
+            name='simhash_band2',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='contentitem',
+            name='simhash_band3',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='contentitem',
+            index=models.Index(fields=['user', 'simhash_band0'], name='content_item_simhash_b0'),
+        ),
+        migrations.AddIndex(
+            model_name='contentitem',
+            index=models.Index(fields=['user', 'simhash_band1'], name='content_item_simhash_b1'),
+        ),
+        migrations.AddIndex(
+            model_name='contentitem',
+            index=models.Index(fields=['user', 'simhash_band2'], name='content_item_simhash_b2'),
+        ),
+        migrations.AddIndex(
+            model_name='contentitem',
+            index=models.Index(fields=['user', 'simhash_band3'], name='content_item_simhash_b3'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations # pyright: ignore[reportMissingModuleSource]
+
+
+def backfill_simhash(apps, schema_editor):
+    from content.simhash import backfill
+
+    backfill(content_item_model=apps.get_model('content', 'ContentItem'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0009_contentitem_simhash'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_simhash, migrations.RunPython.noop),
+    ]
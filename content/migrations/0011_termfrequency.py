@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0010_backfill_simhash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermFrequency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=50, unique=True, verbose_name='Термин')),
+                ('documents', models.PositiveIntegerField(default=0, verbose_name='Документов')),
+            ],
+            options={
+                'verbose_name': 'Частота термина',
+                'verbose_name_plural': 'Частоты терминов',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations # pyright: ignore[reportMissingModuleSource]
+
+
+def rebuild_keywords(apps, schema_editor):
+    from content.keywords import rebuild
+
+    rebuild(
+        content_item_model=apps.get_model('content', 'ContentItem'),
+        term_model=apps.get_model('content', 'TermFrequency'),
+        # Таблица текстов страниц появляется позже (0013)
+        with_text=False,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0011_termfrequency'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_keywords, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0012_rebuild_keywords'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageText',
+            fields=[
+                ('resource', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='page_text', serialize=False, to='content.resource', verbose_name='Ресурс')),
+                ('data', models.BinaryField(verbose_name='Текст (zlib)')),
+                ('length', models.PositiveIntegerField(default=0, verbose_name='Длина текста')),
+                ('terms', models.TextField(blank=True, verbose_name='Термины для поиска')),
+                ('extracted_at', models.DateTimeField(auto_now=True, verbose_name='Дата извлечения')),
+            ],
+            options={
+                'verbose_name': 'Текст страницы',
+                'verbose_name_plural': 'Тексты страниц',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations # pyright: ignore[reportMissingModuleSource]
+
+
+def rebuild_counters(apps, schema_editor):
+    from content.counters import rebuild
+
+    rebuild(
+        content_item_model=apps.get_model('content', 'ContentItem'),
+        category_model=apps.get_model('content', 'Category'),
+        tagged_item_model=apps.get_model('taggit', 'TaggedItem'),
+        counter_model=apps.get_model('content', 'Counter'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0015_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations # pyright: ignore[reportMissingModuleSource]
+
+
+def recompute_simhash(apps, schema_editor):
+    # Цифры стали токенами, короткие заголовки остаются без отпечатка
+    from content.simhash import backfill
+
+    backfill(content_item_model=apps.get_model('content', 'ContentItem'), recompute=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0016_rebuild_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_simhash, migrations.RunPython.noop),
+    ]
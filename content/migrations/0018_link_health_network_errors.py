@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-19 15:39
+
+from django.db import migrations, models
+
+
+def forget_network_errors(apps, schema_editor):
+    # Ошибки сети больше не считаются проверкой - такие ссылки проверятся снова
+    LinkHealth = apps.get_model('content', 'LinkHealth')
+    LinkHealth.objects.filter(status_code__isnull=True).update(checked_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0017_recompute_simhash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='linkhealth',
+            name='checked_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Дата проверки'),
+        ),
+        migrations.RunPython(forget_network_errors, migrations.RunPython.noop),
+    ]
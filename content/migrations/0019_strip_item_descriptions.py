@@ -0,0 +1,27 @@
+from django.db import migrations # pyright: ignore[reportMissingModuleSource]
+from django.db.models import OuterRef, Subquery # pyright: ignore[reportMissingModuleSource]
+
+
+def strip_descriptions(apps, schema_editor):
+    from content.resources import strip_descriptions
+
+    strip_descriptions(content_item_model=apps.get_model('content', 'ContentItem'), inherit='')
+
+
+def restore_descriptions(apps, schema_editor):
+    ContentItem = apps.get_model('content', 'ContentItem')
+    Resource = apps.get_model('content', 'Resource')
+    ContentItem.objects.filter(description='', resource__isnull=False).update(
+        description=Subquery(Resource.objects.filter(pk=OuterRef('resource_id')).values('description')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0018_link_health_network_errors'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_descriptions, restore_descriptions),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-19 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0019_strip_item_descriptions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='termfrequency',
+            name='documents',
+            field=models.IntegerField(default=0, verbose_name='Документов'),
+        ),
+    ]
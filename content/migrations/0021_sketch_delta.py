@@ -0,0 +1,26 @@
+# Generated by Django 4.2.11 on 2026-10-19 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0020_term_frequency_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SketchDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(db_index=True, max_length=100, verbose_name='Ключ скетча')),
+                ('member', models.CharField(max_length=100, verbose_name='Элемент')),
+                ('delta', models.IntegerField(default=1, verbose_name='Изменение')),
+            ],
+            options={
+                'verbose_name': 'Изменение скетча',
+                'verbose_name_plural': 'Изменения скетчей',
+            },
+        ),
+    ]
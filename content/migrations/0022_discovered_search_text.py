@@ -0,0 +1,30 @@
+from django.db import migrations, models # pyright: ignore[reportMissingModuleSource]
+
+
+def fill_search_text(apps, schema_editor):
+    DiscoveredItem = apps.get_model('content', 'DiscoveredItem')
+    batch = []
+    for item in DiscoveredItem.objects.only('pk', 'title', 'description').iterator(chunk_size=2000):
+        item.search_text = ' '.join(f'{item.title} {item.description}'.split()).casefold()
+        batch.append(item)
+        if len(batch) >= 2000:
+            DiscoveredItem.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        DiscoveredItem.objects.bulk_update(batch, ['search_text'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0021_sketch_delta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='discovereditem',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст для поиска'),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.11 on 2026-10-19 15:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('content', '0022_discovered_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=255, verbose_name='Имя файла')),
+                ('file_format', models.CharField(blank=True, max_length=20, verbose_name='Формат')),
+                ('path', models.CharField(max_length=500, verbose_name='Путь к файлу')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Готово'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='Размер файла')),
+                ('processed_bytes', models.PositiveBigIntegerField(default=0, verbose_name='Прочитано байт')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Строк прочитано')),
+                ('created', models.PositiveIntegerField(default=0, verbose_name='Создано')),
+                ('duplicate', models.PositiveIntegerField(default=0, verbose_name='Дубликатов')),
+                ('invalid', models.PositiveIntegerField(default=0, verbose_name='Некорректных')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата завершения')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Задача импорта',
+                'verbose_name_plural': 'Задачи импорта',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
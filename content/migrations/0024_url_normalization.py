@@ -0,0 +1,34 @@
+from django.db import migrations # pyright: ignore[reportMissingModuleSource]
+
+
+def rehash_urls(apps, schema_editor):
+    from content.resources import relink
+    from content.urlnorm import url_hash
+
+    relink(
+        content_item_model=apps.get_model('content', 'ContentItem'),
+        resource_model=apps.get_model('content', 'Resource'),
+    )
+    # Исходные URL хранятся - хеш пересчитывается (новые правила не склеивают разные хеши)
+    for name in ('DiscoveredItem', 'LinkHealth'):
+        model = apps.get_model('content', name)
+        batch = []
+        for row in model.objects.only('pk', 'url', 'url_hash').iterator(chunk_size=2000):
+            key = url_hash(row.url)
+            if key != row.url_hash:
+                row.url_hash = key
+                batch.append(row)
+        model.objects.bulk_update(batch, ['url_hash'], batch_size=2000)
+    # В кэше метаданных URL уже нормализован по старым правилам - записи загрузятся заново
+    apps.get_model('content', 'UrlMetadata').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0023_import_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(rehash_urls, migrations.RunPython.noop),
+    ]
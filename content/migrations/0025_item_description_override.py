@@ -0,0 +1,41 @@
+from django.db import migrations, models # pyright: ignore[reportMissingModuleSource]
+from django.db.models import Min, OuterRef, Subquery # pyright: ignore[reportMissingModuleSource]
+
+
+def split_descriptions(apps, schema_editor):
+    ContentItem = apps.get_model('content', 'ContentItem')
+    Resource = apps.get_model('content', 'Resource')
+    # Описание ресурса бралось из первой закладки - возвращаем его ей как свое
+    first = (
+        ContentItem.objects.filter(resource__isnull=False)
+        .values('resource_id').annotate(first_id=Min('pk')).values('first_id')
+    )
+    ContentItem.objects.filter(pk__in=first, description='').update(
+        description=Subquery(Resource.objects.filter(pk=OuterRef('resource_id')).values('description')[:1])
+    )
+    # Пустое описание раньше означало «наследовать»
+    ContentItem.objects.filter(description='').update(description=None)
+    # В ресурсах могли остаться заметки пользователей: описания заполнятся из метаданных
+    # при следующей загрузке страницы, кэш метаданных для этого сбрасывается
+    Resource.objects.exclude(description='').update(description='')
+    apps.get_model('content', 'UrlMetadata').objects.all().delete()
+
+
+def join_descriptions(apps, schema_editor):
+    apps.get_model('content', 'ContentItem').objects.filter(description__isnull=True).update(description='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0024_url_normalization'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contentitem',
+            name='description',
+            field=models.TextField(blank=True, null=True, verbose_name='Описание'),
+        ),
+        migrations.RunPython(split_descriptions, join_descriptions),
+    ]
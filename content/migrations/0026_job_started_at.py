@@ -0,0 +1,31 @@
+# Generated by Django 4.2.11 on 2026-10-19 16:24
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_started_at(apps, schema_editor):
+    # Время запуска уже выполняющихся задач неизвестно - считаем от создания
+    for name in ('ParseJob', 'ImportJob'):
+        apps.get_model('content', name).objects.filter(status='running').update(started_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0025_item_description_override'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата запуска'),
+        ),
+        migrations.AddField(
+            model_name='parsejob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата запуска'),
+        ),
+        migrations.RunPython(fill_started_at, migrations.RunPython.noop),
+    ]
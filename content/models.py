@@ -2,12 +2,26 @@ from django.db import models # pyright: ignore[reportMissingModuleSource]
 from django.contrib.auth.models import User # pyright: ignore[reportMissingModuleSource]
 from taggit.managers import TaggableManager # pyright: ignore[reportMissingImports]
 from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+from django.utils.functional import cached_property # pyright: ignore[reportMissingModuleSource]
+from .urlnorm import normalize_url, url_hash
+import uuid
+
+class VisibleManager(models.Manager):
+    """Менеджер по умолчанию: строки, поставленные в очередь удаления, скрыты"""
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(pending_deletion=False)
 
 class Category(models.Model):
     """Категория контента"""
     name = models.CharField('Название', max_length=100, unique=True)
     slug = models.SlugField('URL', max_length=100, unique=True)
     description = models.TextField('Описание', blank=True)
+    # Категория удаляется в фоне (content.deletion) и уже скрыта
+    pending_deletion = models.BooleanField('Ожидает удаления', default=False, editable=False)
+    
+    objects = VisibleManager()
+    all_objects = models.Manager()
     
     class Meta:
         verbose_name = 'Категория'
@@ -17,8 +31,61 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class Resource(models.Model):
+    """
+    Общий ресурс (страница) по нормализованному URL: одна строка на
+    уникальную ссылку, сколько бы пользователей ее ни сохранили
+    """
+    url_hash = models.CharField('Хеш URL', max_length=64, unique=True)
+    url = models.URLField('Нормализованный URL', max_length=500)
+    title = models.CharField('Заголовок', max_length=200, blank=True)
+    description = models.TextField('Описание', blank=True)
+    content_type = models.CharField('Тип контента', max_length=20, default='article')
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Ресурс'
+        verbose_name_plural = 'Ресурсы'
+    
+    def __str__(self):
+        return self.url
+    
+    @classmethod
+    def for_url(cls, url, **defaults):
+        """Ресурс для URL (создается при первом сохранении ссылки)"""
+        resource, _ = cls.objects.get_or_create(
+            url_hash=url_hash(url), defaults={'url': normalize_url(url)[:500], **defaults}
+        )
+        return resource
+
+class PageText(models.Model):
+    """
+    Читаемый текст страницы ресурса, сжатый zlib (content.page_text).
+    Вынесен из ContentItem и Resource, чтобы основные таблицы оставались
+    компактными; распаковывается только при обращении к text
+    """
+    resource = models.OneToOneField(
+        Resource, on_delete=models.CASCADE, primary_key=True, related_name='page_text', verbose_name='Ресурс'
+    )
+    data = models.BinaryField('Текст (zlib)')
+    length = models.PositiveIntegerField('Длина текста', default=0)
+    terms = models.TextField('Термины для поиска', blank=True)
+    extracted_at = models.DateTimeField('Дата извлечения', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Текст страницы'
+        verbose_name_plural = 'Тексты страниц'
+    
+    def __str__(self):
+        return f'{self.resource_id}: {self.length} симв.'
+    
+    @cached_property
+    def text(self):
+        from .page_text import decompress
+        return decompress(self.data)
+
 class ContentItem(models.Model):
-    """Элемент контента (статья, видео, книга)"""
+    """Элемент контента (статья, видео, книга) - закладка пользователя на ресурс"""
     CONTENT_TYPES = [
         ('article', 'Статья'),
         ('video', 'Видео'),
@@ -37,30 +104,121 @@ class ContentItem(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Пользователь')
     title = models.CharField('Заголовок', max_length=200)
     url = models.URLField('Ссылка', max_length=500, blank=True)
-    description = models.TextField('Описание', blank=True)
+    # Свое описание пользователя; NULL - общее описание ресурса (full_description), '' - явно пустое
+    description = models.TextField('Описание', null=True, blank=True)
     content_type = models.CharField('Тип контента', max_length=20, choices=CONTENT_TYPES, default='article')
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Категория')
     status = models.CharField('Статус', max_length=20, choices=STATUS_CHOICES, default='new')
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
     updated_at = models.DateTimeField('Дата обновления', auto_now=True)
     completed_at = models.DateTimeField('Дата завершения', null=True, blank=True)
+    resource = models.ForeignKey(
+        Resource, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='bookmarks', verbose_name='Ресурс'
+    )
+    
+    # SimHash заголовка и описания и его 16-битные полосы (content.simhash)
+    simhash = models.BigIntegerField('SimHash', null=True, blank=True, editable=False)
+    simhash_band0 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    simhash_band1 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    simhash_band2 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    simhash_band3 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    
+    # Элемент удаляется в фоне (content.deletion) и уже скрыт
+    pending_deletion = models.BooleanField('Ожидает удаления', default=False, editable=False)
     
     # Теги через django-taggit
     tags = TaggableManager()
     
+    objects = VisibleManager()
+    all_objects = models.Manager()
+    
     class Meta:
         verbose_name = 'Элемент контента'
         verbose_name_plural = 'Элементы контента'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', f'simhash_band{band}'], name=f'content_item_simhash_b{band}')
+            for band in range(4)
+        ]
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # URL на момент загрузки: ресурс пересчитывается, только если ссылка изменилась
+        instance._loaded_url = instance.__dict__.get('url')
+        # Учтенные в счетчиках поля (content.counters) - для дельты при сохранении
+        instance._counted = instance.counted_fields()
+        # Учтенный в частотах терминов документ (content.keywords)
+        instance._indexed = instance.indexed_fields()
+        return instance
+    
+    @property
+    def full_description(self):
+        """Описание для показа: свое (в том числе пустое) или общее описание ресурса"""
+        if self.description is not None:
+            return self.description
+        if self.resource_id is None:
+            return ''
+        return self.resource.description
+    
+    @full_description.setter
+    def full_description(self, value):
+        # None - снова наследовать описание ресурса
+        self.description = value
+    
+    def indexed_fields(self):
+        """(заголовок, описание, id ресурса); None, если поля загружены не все"""
+        fields = self.__dict__
+        if not all(name in fields for name in ('title', 'description', 'resource_id')):
+            return None
+        return (fields['title'], fields['description'], fields['resource_id'])
+    
+    def counted_fields(self):
+        """(user_id, category_id, тип, статус); None, если поля загружены не все"""
+        fields = self.__dict__
+        if not all(name in fields for name in ('user_id', 'category_id', 'content_type', 'status')):
+            return None
+        return (fields['user_id'], fields['category_id'], fields['content_type'], fields['status'])
+    
+    def _sync_resource(self):
+        """Привязка к ресурсу по URL. Возвращает True, если привязка изменилась"""
+        if not self.url:
+            changed = self.resource_id is not None
+            self.resource = None
+            return changed
+        if self.resource_id is not None and self.url == getattr(self, '_loaded_url', None):
+            return False
+        # Описание пользователя в общий ресурс не попадает (content.resources.describe)
+        resource = Resource.for_url(self.url, title=self.title[:200], content_type=self.content_type)
+        changed = resource.pk != self.resource_id
+        self.resource = resource
+        self._loaded_url = self.url
+        return changed
+    
     def save(self, *args, **kwargs):
         if self.status == 'completed' and not self.completed_at:
             self.completed_at = timezone.now()
         elif self.status != 'completed':
             self.completed_at = None
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'url' in update_fields:
+            if self._sync_resource() and update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'resource'}
+        if update_fields is None or {'title', 'description'} & set(update_fields):
+            from .simhash import fingerprint_fields
+            fields = fingerprint_fields(self.title, self.full_description)
+            for name, value in fields.items():
+                setattr(self, name, value)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], *fields}
+        if update_fields is not None:
+            # updated_at - версия элемента для кэша представлений
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'updated_at'}
         super().save(*args, **kwargs)
 
 class Recommendation(models.Model):
@@ -77,4 +235,340 @@ class Recommendation(models.Model):
         ordering = ['-score']
     
     def __str__(self):
-        return f"{self.user.username} → {self.content_item.title}"
\ No newline at end of file
+        return f"{self.user.username} → {self.content_item.title}"
+
+class AnalyticsSketch(models.Model):
+    """Вероятностный скетч для приближенной аналитики (HyperLogLog / Count-Min)"""
+    HYPERLOGLOG = 'hll'
+    COUNT_MIN = 'cms'
+    KIND_CHOICES = [
+        (HYPERLOGLOG, 'HyperLogLog'),
+        (COUNT_MIN, 'Count-Min Sketch'),
+    ]
+    
+    key = models.CharField('Ключ', max_length=100, unique=True)
+    kind = models.CharField('Тип', max_length=3, choices=KIND_CHOICES)
+    data = models.BinaryField('Данные (zlib)', default=b'')
+    heavy_hitters = models.JSONField('Кандидаты top-k', default=dict, blank=True)
+    updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Скетч аналитики'
+        verbose_name_plural = 'Скетчи аналитики'
+    
+    def __str__(self):
+        return self.key
+
+
+class SketchDelta(models.Model):
+    """
+    Изменение скетча, еще не влитое в AnalyticsSketch (content.sketches):
+    пользователь для HyperLogLog или тег и дельта для Count-Min Sketch
+    """
+    key = models.CharField('Ключ скетча', max_length=100, db_index=True)
+    member = models.CharField('Элемент', max_length=100)
+    delta = models.IntegerField('Изменение', default=1)
+    
+    class Meta:
+        verbose_name = 'Изменение скетча'
+        verbose_name_plural = 'Изменения скетчей'
+    
+    def __str__(self):
+        return f'{self.key}: {self.member} {self.delta:+d}'
+
+
+class ParseJob(models.Model):
+    """Фоновая задача парсинга URL"""
+    STATUS_CHOICES = [
+        ('pending', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('done', 'Готово'),
+        ('failed', 'Ошибка'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Пользователь')
+    url = models.URLField('Ссылка', max_length=500)
+    status = models.CharField('Статус', max_length=20, choices=STATUS_CHOICES, default='pending')
+    content_item = models.ForeignKey(
+        ContentItem, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Созданный контент'
+    )
+    error = models.TextField('Ошибка', blank=True)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    # Ставится вместе с running: по нему истекает время выполнения (recover_jobs)
+    started_at = models.DateTimeField('Дата запуска', null=True, blank=True)
+    finished_at = models.DateTimeField('Дата завершения', null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Задача парсинга'
+        verbose_name_plural = 'Задачи парсинга'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.url} ({self.status})"
+
+
+class DeletionJob(models.Model):
+    """
+    Фоновое удаление с большим каскадом (content.deletion): зависимые строки
+    удаляются порциями в коротких транзакциях, цель скрыта сразу
+    """
+    TARGET_CHOICES = [
+        ('content', 'Элементы контента'),
+        ('category', 'Категория'),
+        ('user', 'Пользователь'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='deletion_jobs', verbose_name='Кто запросил'
+    )
+    target = models.CharField('Что удаляется', max_length=20, choices=TARGET_CHOICES)
+    # id категории или пользователя; для content - владелец элементов
+    target_id = models.PositiveBigIntegerField('id цели')
+    status = models.CharField('Статус', max_length=20, choices=ParseJob.STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField('Всего строк', default=0)
+    processed = models.PositiveIntegerField('Обработано строк', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    finished_at = models.DateTimeField('Дата завершения', null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Задача удаления'
+        verbose_name_plural = 'Задачи удаления'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.target} {self.target_id} ({self.status})"
+
+
+class ImportJob(models.Model):
+    """
+    Фоновый импорт закладок из большого файла (content.bookmark_import):
+    файл сохраняется на диск, прогресс - прочитанные байты и статистика строк
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='import_jobs', verbose_name='Пользователь')
+    name = models.CharField('Имя файла', max_length=255, blank=True)
+    file_format = models.CharField('Формат', max_length=20, blank=True)
+    path = models.CharField('Путь к файлу', max_length=500)
+    status = models.CharField('Статус', max_length=20, choices=ParseJob.STATUS_CHOICES, default='pending')
+    size = models.PositiveBigIntegerField('Размер файла', default=0)
+    processed_bytes = models.PositiveBigIntegerField('Прочитано байт', default=0)
+    total = models.PositiveIntegerField('Строк прочитано', default=0)
+    created = models.PositiveIntegerField('Создано', default=0)
+    duplicate = models.PositiveIntegerField('Дубликатов', default=0)
+    invalid = models.PositiveIntegerField('Некорректных', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    started_at = models.DateTimeField('Дата запуска', null=True, blank=True)
+    finished_at = models.DateTimeField('Дата завершения', null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Задача импорта'
+        verbose_name_plural = 'Задачи импорта'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class BatchImportJob(models.Model):
+    """Фоновый массовый импорт списка URL (content.bulk_import): отчет - по завершении"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='batch_jobs', verbose_name='Пользователь')
+    urls = models.JSONField('Ссылки', default=list)
+    status = models.CharField('Статус', max_length=20, choices=ParseJob.STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField('Ссылок', default=0)
+    created = models.PositiveIntegerField('Создано', default=0)
+    results = models.JSONField('Отчет', default=list, blank=True)
+    error = models.TextField('Ошибка', blank=True)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    started_at = models.DateTimeField('Дата запуска', null=True, blank=True)
+    finished_at = models.DateTimeField('Дата завершения', null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Задача массового импорта'
+        verbose_name_plural = 'Задачи массового импорта'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.total} URL ({self.status})"
+
+class UrlMetadata(models.Model):
+    """Кэш извлеченных метаданных страницы (ключ - хеш нормализованного URL)"""
+    url_hash = models.CharField('Хеш URL', max_length=64, unique=True)
+    url = models.URLField('Нормализованный URL', max_length=500)
+    title = models.CharField('Заголовок', max_length=500, blank=True)
+    description = models.TextField('Описание', blank=True)
+    keywords = models.JSONField('Ключевые слова', default=list, blank=True)
+    content_type = models.CharField('Тип контента', max_length=20, default='article')
+    category_slug = models.SlugField('Категория', max_length=100, blank=True)
+    etag = models.CharField('ETag', max_length=255, blank=True)
+    last_modified = models.CharField('Last-Modified', max_length=64, blank=True)
+    validated_at = models.DateTimeField('Дата проверки')
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Метаданные URL'
+        verbose_name_plural = 'Метаданные URL'
+    
+    def __str__(self):
+        return self.url
+    
+    def as_metadata(self):
+        """Словарь в формате parsing.extract_metadata"""
+        return {
+            'title': self.title,
+            'description': self.description,
+            'keywords': list(self.keywords),
+            'content_type': self.content_type,
+            'category_slug': self.category_slug or None,
+        }
+
+
+class DiscoveredItem(models.Model):
+    """Материал из внешних источников в общем пуле (загружается content.ingestion)"""
+    provider = models.CharField('Источник данных', max_length=20)
+    external_id = models.CharField('Внешний ID', max_length=100, db_index=True)
+    url_hash = models.CharField('Хеш URL', max_length=64, unique=True)
+    url = models.URLField('Ссылка', max_length=500)
+    title = models.CharField('Заголовок', max_length=500)
+    description = models.TextField('Описание', blank=True)
+    source = models.CharField('Издание', max_length=200, blank=True)
+    content_type = models.CharField('Тип контента', max_length=20, default='article')
+    tags = models.JSONField('Теги', default=list, blank=True)
+    query = models.CharField('Запрос', max_length=200)
+    published_at = models.DateTimeField('Дата публикации', null=True, blank=True)
+    ingested_at = models.DateTimeField('Дата загрузки', auto_now_add=True)
+    # Заголовок и описание в casefold: LIKE в SQLite не сравнивает кириллицу без учета регистра
+    search_text = models.TextField('Текст для поиска', blank=True, editable=False)
+    
+    class Meta:
+        verbose_name = 'Найденный материал'
+        verbose_name_plural = 'Найденные материалы'
+        ordering = ['-published_at', '-ingested_at']
+        indexes = [models.Index(fields=['content_type', '-published_at'])]
+    
+    def __str__(self):
+        return self.title
+    
+    def save(self, *args, **kwargs):
+        self.fill_search_text()
+        super().save(*args, **kwargs)
+    
+    def fill_search_text(self):
+        """Заполнить search_text (bulk_create не вызывает save)"""
+        self.search_text = ' '.join(f'{self.title} {self.description}'.split()).casefold()
+    
+    def as_result(self):
+        """Словарь в формате NewsAPIClient._format_articles"""
+        return {
+            'title': self.title,
+            'url': self.url,
+            'description': self.description,
+            'source': self.source,
+            'published_at': self.published_at.isoformat() if self.published_at else '',
+            'content_type': self.content_type,
+            'tags': self.tags,
+            'external_id': self.external_id,
+        }
+
+
+class IngestionCheckpoint(models.Model):
+    """Позиция загрузки пары (источник, запрос): следующая страница и время прохода"""
+    provider = models.CharField('Источник данных', max_length=20)
+    query = models.CharField('Запрос', max_length=200)
+    next_page = models.PositiveIntegerField('Следующая страница', default=1)
+    items_ingested = models.PositiveIntegerField('Загружено за проход', default=0)
+    completed_at = models.DateTimeField('Проход завершен', null=True, blank=True)
+    updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Контрольная точка загрузки'
+        verbose_name_plural = 'Контрольные точки загрузки'
+        unique_together = ['provider', 'query']
+    
+    def __str__(self):
+        return f'{self.provider}: {self.query} (стр. {self.next_page})'
+
+
+class LinkHealth(models.Model):
+    """Результат проверки ссылки (одна строка на нормализованный URL)"""
+    url_hash = models.CharField('Хеш URL', max_length=64, unique=True)
+    url = models.URLField('Ссылка', max_length=500)
+    status_code = models.PositiveSmallIntegerField('HTTP-статус', null=True, blank=True)
+    final_url = models.URLField('Итоговый URL', max_length=500, blank=True)
+    error = models.CharField('Ошибка', max_length=200, blank=True)
+    # Время последнего ответа сервера (None - отвечали только ошибки сети)
+    checked_at = models.DateTimeField('Дата проверки', null=True, blank=True, db_index=True)
+    
+    class Meta:
+        verbose_name = 'Состояние ссылки'
+        verbose_name_plural = 'Состояние ссылок'
+    
+    def __str__(self):
+        return f'{self.url}: {self.status_code or self.error}'
+    
+    @property
+    def is_broken(self):
+        # Ошибка сети (status_code=None) может быть временной - не битая ссылка
+        return self.status_code is not None and self.status_code >= 400
+
+
+class CrawlCheckpoint(models.Model):
+    """Позиция обхода таблицы (последний обработанный id) для продолжения после остановки"""
+    name = models.CharField('Обход', max_length=50, unique=True)
+    last_id = models.PositiveBigIntegerField('Последний id', default=0)
+    started_at = models.DateTimeField('Начало прохода', null=True, blank=True)
+    completed_at = models.DateTimeField('Проход завершен', null=True, blank=True)
+    updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Контрольная точка обхода'
+        verbose_name_plural = 'Контрольные точки обхода'
+    
+    def __str__(self):
+        return f'{self.name}: {self.last_id}'
+
+
+class TermFrequency(models.Model):
+    """
+    Документная частота термина в корпусе (content.keywords). Строки
+    keywords.TOTAL_KEYS хранят части общего числа документов
+    """
+    term = models.CharField('Термин', max_length=50, unique=True)
+    # Части общего счетчика (keywords.TOTAL_KEYS) могут быть отрицательными
+    documents = models.IntegerField('Документов', default=0)
+    
+    class Meta:
+        verbose_name = 'Частота термина'
+        verbose_name_plural = 'Частоты терминов'
+    
+    def __str__(self):
+        return f'{self.term or "<всего>"}: {self.documents}'
+
+
+class Counter(models.Model):
+    """
+    Денормализованный счетчик (content.counters): вид и ключ, например
+    ('tag', id тега) или ('category_type', 'id_категории:тип')
+    """
+    kind = models.CharField('Вид', max_length=20)
+    key = models.CharField('Ключ', max_length=64, blank=True)
+    value = models.BigIntegerField('Значение', default=0)
+    
+    class Meta:
+        verbose_name = 'Счетчик'
+        verbose_name_plural = 'Счетчики'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'], name='content_counter_kind_key'),
+        ]
+        indexes = [
+            # Топ тегов - чтение по индексу, без сортировки всей таблицы
+            models.Index(fields=['kind', '-value'], name='content_counter_top'),
+        ]
+    
+    def __str__(self):
+        return f'{self.kind}:{self.key} = {self.value}'
@@ -0,0 +1,81 @@
+"""
+Полный текст страниц.
+
+Парсер (parsing.PageTextParser, при PAGE_TEXT_ENABLED) извлекает читаемый
+текст, а url_cache сохраняет его в PageText: одна строка на Resource,
+текст сжат zlib и распаковывается только при обращении (PageText.text).
+ContentItem и Resource при этом не растут. Текст используют автотеги
+(content.keywords) и поиск: рядом хранится несжатый список самых частых
+терминов страницы (terms), по которому ищут API и список контента.
+"""
+import zlib
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+
+COMPRESSION_LEVEL = 6
+SEARCH_TERMS = 200
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def compress(text):
+    return zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def decompress(data):
+    return zlib.decompress(bytes(data)).decode('utf-8') if data else ''
+
+
+def search_terms(text):
+    """Самые частые термины текста через пробел (для поиска по подстроке)"""
+    from .keywords import terms
+
+    return ' '.join(term for term, _ in terms('', text).most_common(SEARCH_TERMS))
+
+
+def store(url, text, title='', description='', content_type='article'):
+    """Сохранить текст страницы для ресурса URL. Пустой текст не хранится"""
+    from .models import PageText, Resource
+
+    text = (text or '')[:_setting('PAGE_TEXT_MAX_CHARS', 200_000)]
+    if not text:
+        return None
+    resource = Resource.for_url(url, title=title[:200], description=description, content_type=content_type)
+    page, _ = PageText.objects.update_or_create(
+        resource=resource,
+        defaults={'data': compress(text), 'length': len(text), 'terms': search_terms(text)},
+    )
+    return page
+
+
+def texts_for_resources(resource_ids):
+    """Тексты одним запросом: {resource_id: текст} (только найденные)"""
+    from .models import PageText
+
+    ids = {pk for pk in resource_ids if pk is not None}
+    if not ids:
+        return {}
+    rows = PageText.objects.filter(resource_id__in=ids).values_list('resource_id', 'data')
+    return {resource_id: decompress(data) for resource_id, data in rows}
+
+
+def texts_for_urls(urls):
+    """Тексты по URL одним запросом: {url: текст} (только найденные)"""
+    from .models import PageText
+    from .urlnorm import url_hash
+
+    hashes = {url: url_hash(url) for url in urls}
+    if not hashes:
+        return {}
+    rows = PageText.objects.filter(resource__url_hash__in=set(hashes.values())).values_list(
+        'resource__url_hash', 'data'
+    )
+    texts = {key: decompress(data) for key, data in rows}
+    return {url: texts[key] for url, key in hashes.items() if key in texts}
+
+
+def get_text(item):
+    """Текст страницы элемента контента ('' - текста нет)"""
+    return texts_for_resources([item.resource_id]).get(item.resource_id, '')
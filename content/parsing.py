@@ -0,0 +1,525 @@
+"""
+Извлечение метаданных страницы по URL.
+
+Логика, общая для ParseContentView, фоновых задач парсинга и массового
+импорта: загрузка страницы, разбор title/description/keywords, определение
+типа контента и категории.
+"""
+import codecs
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+from .models import Category
+
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Результат условной загрузки: metadata=None при 304 Not Modified
+PageMetadata = namedtuple('PageMetadata', ['metadata', 'etag', 'last_modified', 'not_modified'])
+
+STREAM_CHUNK_SIZE = 8 * 1024
+DESCRIPTION_LENGTH = 200
+# Сколько недочитанного тела дочитать, чтобы соединение вернулось в пул
+DRAIN_BYTES = 64 * 1024
+
+CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+# Разметка, текст которой не попадает в читаемый текст страницы
+SKIP_TEXT_TAGS = {
+    'script', 'style', 'noscript', 'template', 'svg', 'iframe',
+    'nav', 'header', 'footer', 'aside', 'form', 'button', 'select',
+}
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'br', 'li', 'ul', 'ol', 'table', 'tr',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'figcaption', 'dt', 'dd',
+}
+
+
+def _conditional_get(url, etag='', last_modified='', timeout=None, stream=False):
+    """GET с If-None-Match / If-Modified-Since; None - ответ 304"""
+    from . import http_client
+
+    headers = dict(REQUEST_HEADERS)
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    response = http_client.get(url, headers=headers, timeout=timeout, stream=stream)
+    if response.status_code == 304:
+        response.close()
+        return None
+    response.raise_for_status()
+    return response
+
+
+def fetch_page(url, timeout=None):
+    """Загрузка страницы целиком через общий HTTP-клиент (исключения requests пробрасываются)"""
+    return _conditional_get(url, timeout=timeout).content
+
+
+def _release(response):
+    """
+    Вернуть соединение в пул: короткий остаток тела (до DRAIN_BYTES)
+    дочитывается, длинный не качается - соединение закрывается
+    """
+    import requests # pyright: ignore[reportMissingModuleSource]
+
+    drained = 0
+    try:
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            drained += len(chunk)
+            if drained > DRAIN_BYTES:
+                break
+    except (requests.RequestException, OSError):
+        # В том числе StreamConsumedError - тело уже прочитано целиком
+        pass
+    # Прочитанный до конца ответ close() отдает в пул (release_conn), иначе закрывает
+    response.close()
+
+
+def fetch_metadata_conditional(url, etag='', last_modified='', timeout=None, max_bytes=None, with_text=None):
+    """
+    Потоковое извлечение метаданных с валидаторами кэша.
+
+    Тело читается частями до </head> (или первого абзаца) и не больше
+    max_bytes; с with_text (по умолчанию PAGE_TEXT_ENABLED) - до конца или
+    max_bytes, и в метаданных появляется text. Если сервер ответил 304,
+    тело не передается и not_modified=True.
+    """
+    if with_text is None:
+        from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+        with_text = getattr(settings, 'PAGE_TEXT_ENABLED', False)
+
+    response = _conditional_get(url, etag, last_modified, timeout=timeout, stream=True)
+    if response is None:
+        return PageMetadata(None, etag, last_modified, True)
+
+    try:
+        metadata = stream_metadata(response, url, max_bytes=max_bytes, with_text=with_text)
+    finally:
+        _release(response)
+    return PageMetadata(
+        metadata,
+        response.headers.get('ETag', ''),
+        response.headers.get('Last-Modified', ''),
+        False,
+    )
+
+
+class HeadMetadataParser(HTMLParser):
+    """
+    Инкрементальный разбор начала страницы: title, meta description и
+    keywords, текст первого <p>. done=True, когда дальше читать незачем.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = None
+        self.description = None
+        self.keywords = None
+        self.first_paragraph = None
+        self.head_closed = False
+        self.done = False
+        self._title_parts = None
+        self._paragraph_parts = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title' and self.title is None:
+            self._title_parts = []
+        elif tag == 'meta':
+            attrs = dict(attrs)
+            name = (attrs.get('name') or '').lower()
+            content = attrs.get('content')
+            if name == 'description' and self.description is None and content:
+                self.description = content
+            elif name == 'keywords' and self.keywords is None and content:
+                self.keywords = content
+        elif tag == 'p' and self.first_paragraph is None:
+            if self._paragraph_parts is not None:
+                self._finish_paragraph()
+            else:
+                self._paragraph_parts = []
+        elif tag == 'body':
+            self._close_head()
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self._title_parts is not None:
+            self.title = ''.join(self._title_parts)
+            self._title_parts = None
+        elif tag == 'head':
+            self._close_head()
+        elif tag == 'p' and self._paragraph_parts is not None:
+            self._finish_paragraph()
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        if self._paragraph_parts is not None:
+            self._paragraph_parts.append(data)
+            # Для описания нужны только первые 200 символов
+            if sum(map(len, self._paragraph_parts)) >= DESCRIPTION_LENGTH:
+                self._finish_paragraph()
+
+    def _close_head(self):
+        self.head_closed = True
+        self._update_done()
+
+    def _finish_paragraph(self):
+        self.first_paragraph = ''.join(self._paragraph_parts)[:DESCRIPTION_LENGTH]
+        self._paragraph_parts = None
+        self._update_done()
+
+    def _update_done(self):
+        # Абзац нужен только если в <head> нет meta description
+        self.done = self.head_closed and (
+            self.description is not None or self.first_paragraph is not None
+        )
+
+
+class PageTextParser(HeadMetadataParser):
+    """
+    Метаданные и читаемый текст страницы: все вне <head> без скриптов,
+    стилей и служебных блоков (навигация, шапка, подвал, формы).
+    Разбор идет до конца потока, done не выставляется.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._in_head = False
+        self._skip_depth = 0
+        self._text_parts = []
+
+    def handle_starttag(self, tag, attrs):
+        super().handle_starttag(tag, attrs)
+        if tag in ('head', 'body'):
+            self._in_head = tag == 'head'
+        elif tag in SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._text_parts.append('\n')
+
+    def handle_endtag(self, tag):
+        super().handle_endtag(tag)
+        if tag == 'head':
+            self._in_head = False
+        elif tag in SKIP_TEXT_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._text_parts.append('\n')
+
+    def handle_data(self, data):
+        in_title = self._title_parts is not None
+        super().handle_data(data)
+        if not (self._in_head or in_title or self._skip_depth):
+            self._text_parts.append(data)
+
+    def _update_done(self):
+        self.done = False
+
+    def text(self):
+        return clean_text(''.join(self._text_parts))
+
+
+def clean_text(text):
+    """Схлопывание пробелов: по строке на блок, без пустых строк"""
+    lines = (' '.join(line.split()) for line in text.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def _detect_encoding(response, first_chunk):
+    """
+    Кодировка из Content-Type, затем из <meta charset>, иначе utf-8, если
+    начало тела им декодируется, иначе угаданная по первому чанку (как
+    response.apparent_encoding, но без чтения всего потока)
+    """
+    from requests.compat import chardet # pyright: ignore[reportMissingModuleSource]
+
+    match = re.search(r'charset=["\']?([\w-]+)', response.headers.get('Content-Type', ''), re.IGNORECASE)
+    if match is not None:
+        return match.group(1)
+    match = CHARSET_RE.search(first_chunk)
+    if match is not None:
+        return match.group(1).decode('ascii')
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(first_chunk)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    guessed = chardet.detect(first_chunk).get('encoding') if chardet is not None else None
+    return guessed or 'utf-8'
+
+
+def stream_metadata(response, url, max_bytes=None, with_text=False):
+    """
+    Метаданные из потока ответа без чтения всего тела.
+
+    Полный разбор BeautifulSoup (extract_metadata) по прочитанному префиксу
+    выполняется, только если потоковый парсер ничего не нашел или не
+    справился с разметкой. with_text - дочитать тело (до max_bytes) и
+    вернуть читаемый текст в ключе text.
+    """
+    from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+
+    max_bytes = max_bytes or getattr(settings, 'PARSE_MAX_BYTES', 512 * 1024)
+    parser = PageTextParser() if with_text else HeadMetadataParser()
+    decoder = None
+    received = []
+    size = 0
+    failed = False
+
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+        if not chunk:
+            continue
+        chunk = chunk[:max_bytes - size]
+        received.append(chunk)
+        size += len(chunk)
+        if decoder is None:
+            try:
+                decoder = codecs.getincrementaldecoder(_detect_encoding(response, chunk))(errors='replace')
+            except LookupError:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        if not failed:
+            try:
+                parser.feed(decoder.decode(chunk))
+            except Exception:
+                # Дочитываем до лимита для полного разбора
+                failed = True
+        if (parser.done and not failed) or size >= max_bytes:
+            break
+
+    if not failed:
+        try:
+            parser.close()
+        except Exception:
+            failed = True
+
+    if failed or (parser.title is None and parser.description is None):
+        return extract_metadata(b''.join(received), url, with_text=with_text)
+
+    keywords = []
+    if parser.keywords:
+        keywords = [k.strip() for k in parser.keywords.split(',')[:5]]
+
+    metadata = {
+        'title': (parser.title or '').strip(),
+        'description': (parser.description or parser.first_paragraph or '').strip(),
+        'keywords': keywords,
+        'content_type': detect_content_type(url),
+        'category_slug': detect_category_slug(url),
+    }
+    if with_text:
+        metadata['text'] = parser.text()
+    return metadata
+
+
+def extract_metadata(html, url, with_text=False):
+    """Полный разбор HTML: заголовок, описание, ключевые слова, тип и категория (и текст)"""
+    from bs4 import BeautifulSoup # pyright: ignore[reportMissingImports]
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Извлекаем заголовок
+    title = soup.title.string if soup.title and soup.title.string else ''
+
+    # Ищем мета-описание
+    description = ''
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    if meta_desc and meta_desc.get('content'):
+        description = meta_desc['content']
+    else:
+        # Берем первый параграф
+        first_p = soup.find('p')
+        if first_p:
+            description = first_p.get_text()[:DESCRIPTION_LENGTH]
+
+    # Извлекаем ключевые слова
+    keywords = []
+    meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
+    if meta_keywords and meta_keywords.get('content'):
+        keywords = [k.strip() for k in meta_keywords['content'].split(',')[:5]]
+
+    metadata = {
+        'title': title.strip(),
+        'description': description.strip(),
+        'keywords': keywords,
+        'content_type': detect_content_type(url),
+        'category_slug': detect_category_slug(url),
+    }
+    if with_text:
+        body = soup.body or soup
+        for tag in body.find_all(SKIP_TEXT_TAGS):
+            tag.decompose()
+        for tag in body.find_all(BLOCK_TAGS):
+            tag.insert_before('\n')
+            tag.insert_after('\n')
+        metadata['text'] = clean_text(body.get_text())
+    return metadata
+
+
+def detect_content_type(url):
+    """Определяем тип контента по домену"""
+    if 'youtube.com' in url or 'vimeo.com' in url:
+        return 'video'
+    return 'article'
+
+
+def detect_category_slug(url):
+    """Автоматически подбираем категорию по словам в URL"""
+    url = url.lower()
+    if any(word in url for word in ['python', 'django', 'programming', 'code']):
+        return 'programming'
+    if any(word in url for word in ['design', 'ui', 'ux', 'figma']):
+        return 'design'
+    return None
+
+
+def build_content_data(url, metadata, categories=None):
+    """
+    Данные для ContentItemSerializer из метаданных.
+
+    categories - необязательный словарь slug -> Category, чтобы при
+    массовой обработке не делать запрос на каждый URL.
+    """
+    category = None
+    slug = metadata.get('category_slug')
+    if slug:
+        if categories is not None:
+            category = categories.get(slug)
+        else:
+            category = Category.objects.filter(slug=slug).first()
+
+    return {
+        'title': metadata['title'][:200],
+        'url': url,
+        'description': metadata['description'][:500],
+        'content_type': metadata['content_type'],
+        'category_id': category.id if category else None,
+        'tags': metadata['keywords'],
+        'status': 'new'
+    }
+
+
+def parse_url(url):
+    """
+    Метаданные страницы (через кэш) и данные для создания ContentItem.
+
+    suggested_tags - автотеги по заголовку, описанию и тексту (content.keywords);
+    они же становятся тегами, если у страницы нет meta keywords. Категорию
+    выбирает классификатор (content.classifier), если он уверен.
+    """
+    from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+    from .classifier import predict_categories
+    from .keywords import suggest_tags
+    from .page_text import texts_for_urls
+    from .url_cache import get_metadata
+
+    metadata = get_metadata(url)
+    content_data = build_content_data(url, metadata)
+    text = metadata.get('text')
+    if text is None and getattr(settings, 'PAGE_TEXT_ENABLED', False):
+        # Метаданные из кэша - текст сохранен при прошлой загрузке
+        text = texts_for_urls([url]).get(url, '')
+    content_data['suggested_tags'] = suggest_tags(content_data['title'], content_data['description'], text)
+    if not content_data['tags']:
+        content_data['tags'] = content_data['suggested_tags']
+
+    category_id = predict_categories(
+        [(content_data['title'], content_data['description'], content_data['tags'])]
+    )[0]
+    if category_id is not None:
+        content_data['category_id'] = category_id
+    return content_data
+
+
+def item_data(content_data):
+    """Данные для сериализатора без описания: описание страницы закладка наследует от ресурса"""
+    return {key: value for key, value in content_data.items() if key != 'description'}
+
+
+def create_content_item(user, content_data):
+    """Создание ContentItem через сериализатор. Возвращает (serializer, created)"""
+    from .serializers import ContentItemSerializer
+
+    serializer = ContentItemSerializer(data=item_data(content_data))
+    if serializer.is_valid():
+        serializer.save(user=user)
+        return serializer, True
+    return serializer, False
+
+
+def submit_parse_job(user, url):
+    """Поставить URL в очередь фонового парсинга"""
+    from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+    from . import jobs
+    from .models import ParseJob
+
+    job = ParseJob.objects.create(user=user, url=url)
+    jobs.submit(
+        'parse', run_parse_job, job.pk,
+        max_workers=getattr(settings, 'PARSE_JOB_WORKERS', 4)
+    )
+    return job
+
+
+def run_parse_job(job_id):
+    """Выполнение задачи парсинга: загрузка, разбор и создание ContentItem"""
+    import requests # pyright: ignore[reportMissingModuleSource]
+    from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+    from .models import ParseJob
+    from .resources import saved_item
+
+    # Задачу берет только один исполнитель (она могла быть поставлена повторно recover_jobs)
+    if not ParseJob.objects.filter(pk=job_id, status='pending').update(status='running', started_at=timezone.now()):
+        return ParseJob.objects.get(pk=job_id)
+    job = ParseJob.objects.select_related('user').get(pk=job_id)
+
+    try:
+        existing = saved_item(job.user_id, job.url)
+        if existing is not None:
+            # Ссылка уже сохранена - задача указывает на существующий элемент
+            job.status = 'done'
+            job.content_item_id = existing.pk
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'content_item', 'finished_at'])
+            return job
+        
+        content_data = parse_url(job.url)
+        serializer, created = create_content_item(job.user, content_data)
+        if created:
+            job.status = 'done'
+            job.content_item_id = serializer.instance.pk
+        else:
+            job.status = 'failed'
+            job.error = str(serializer.errors)
+    except requests.RequestException as e:
+        job.status = 'failed'
+        job.error = f'Ошибка при загрузке URL: {str(e)}'
+    except Exception as e:
+        job.status = 'failed'
+        job.error = f'Ошибка при парсинге: {str(e)}'
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'content_item', 'error', 'finished_at'])
+    return job
+
+
+def expire_parse_jobs(timeout=None):
+    """
+    Пометить failed задачи, которые выполняются дольше timeout секунд с
+    запуска (процесс пула перезапустили посреди задачи). Время в очереди не
+    считается. Возвращает их число
+    """
+    from datetime import timedelta
+    from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+    from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+    from .models import ParseJob
+
+    if timeout is None:
+        timeout = getattr(settings, 'PARSE_JOB_TIMEOUT', 600)
+    now = timezone.now()
+    return ParseJob.objects.filter(status='running', started_at__lt=now - timedelta(seconds=timeout)).update(
+        status='failed', error='Задача прервана: превышено время выполнения', finished_at=now
+    )
@@ -0,0 +1,111 @@
+"""
+Планировщик запросов для сериализаторов (без N+1 в списках API).
+
+Обходит поля сериализатора, которые попадут в ответ (кроме write_only),
+и собирает, что загрузить заранее:
+- прямые связи (ForeignKey, OneToOne) из source полей и вложенных
+  сериализаторов - select_related;
+- связи "ко многим" (ManyToMany, теги, обратные связи) - prefetch_related,
+  для вложенного сериализатора - Prefetch с запросом, спланированным
+  рекурсивно;
+- то, что полю нужно помимо связей модели (обычно SerializerMethodField),
+  сериализатор объявляет в Meta: annotations = {поле: выражение},
+  select_related / prefetch_related = {поле: [пути]}.
+
+Аннотации связанного объекта select_related не переносит - такой объект
+загружается через Prefetch с аннотированным запросом (один запрос на
+связь). В итоге число запросов списка не зависит от размера страницы.
+Представления применяют план через optimize (content.api_views).
+"""
+from django.db.models import Prefetch # pyright: ignore[reportMissingModuleSource]
+from rest_framework import serializers # pyright: ignore[reportMissingImports]
+
+
+def _relation(model, attr):
+    """Поле связи модели по имени атрибута (для обратных - по имени менеджера)"""
+    for field in model._meta.get_fields():
+        if not field.is_relation:
+            continue
+        name = field.get_accessor_name() if field.auto_created and not field.concrete else field.name
+        if name == attr:
+            return field
+    return None
+
+
+def _nested(field):
+    """Вложенный сериализатор поля (с учетом many=True) или None"""
+    field = getattr(field, 'child', field)
+    return field if isinstance(field, serializers.BaseSerializer) else None
+
+
+def _follow(model, attrs, nested, select, prefetch):
+    """Добавить в план связи, через которые проходит source поля"""
+    path = []
+    for position, attr in enumerate(attrs):
+        relation = _relation(model, attr)
+        if relation is None:
+            # Обычный атрибут или метод (например, count у менеджера)
+            nested = None
+            break
+        path.append(attr)
+        model = relation.related_model
+        if relation.many_to_many or relation.one_to_many:
+            lookup = '__'.join(path)
+            if nested is not None and position == len(attrs) - 1:
+                prefetch.append(Prefetch(lookup, queryset=optimize(model._default_manager.all(), nested)))
+            else:
+                prefetch.append(lookup)
+            return
+    if not path:
+        return
+
+    lookup = '__'.join(path)
+    if nested is None:
+        select.add(lookup)
+        return
+    child_select, child_prefetch, child_annotations = plan(nested)
+    if child_prefetch or child_annotations:
+        # Аннотации и prefetch вложенного - отдельным запросом по связи
+        prefetch.append(Prefetch(lookup, queryset=optimize(model._base_manager.all(), nested)))
+    else:
+        select.add(lookup)
+        select.update(f'{lookup}__{child}' for child in child_select)
+
+
+def plan(serializer):
+    """(select_related, prefetch_related, annotations) для вывода сериализатора"""
+    serializer = _nested(serializer) or serializer
+    model = serializer.Meta.model
+    declared = {
+        key: getattr(serializer.Meta, key, {})
+        for key in ('select_related', 'prefetch_related', 'annotations')
+    }
+
+    select, prefetch, annotations = set(), [], {}
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        name = field.field_name
+        select.update(declared['select_related'].get(name, ()))
+        prefetch.extend(declared['prefetch_related'].get(name, ()))
+        if name in declared['annotations']:
+            annotations[name] = declared['annotations'][name]
+            continue
+        if field.source != '*':
+            _follow(model, field.source_attrs, _nested(field), select, prefetch)
+    return select, prefetch, annotations
+
+
+def optimize(queryset, serializer):
+    """Применить план сериализатора (класса или экземпляра) к queryset"""
+    if isinstance(serializer, type):
+        serializer = serializer()
+    select, prefetch, annotations = plan(serializer)
+    if select:
+        queryset = queryset.select_related(*sorted(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    annotations = {name: value for name, value in annotations.items() if name not in queryset.query.annotations}
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    return queryset
@@ -1,6 +1,7 @@
 from django.db.models import Count, Q # pyright: ignore[reportMissingModuleSource]
 from taggit.models import Tag # pyright: ignore[reportMissingImports]
-import numpy as np # pyright: ignore[reportMissingImports]
+from .models import ContentItem, DiscoveredItem
+from .urlnorm import url_hash
 from collections import defaultdict
 from datetime import datetime, timedelta
 import math
@@ -105,7 +106,7 @@ class AdvancedRecommendationEngine:
         user_content_ids = set(user.contentitem_set.values_list('id', flat=True))
         
         # Берем свежий и релевантный контент
-        candidates = ContentItem.objects.exclude( # pyright: ignore[reportUndefinedVariable]
+        candidates = ContentItem.objects.exclude(
             id__in=user_content_ids
         ).select_related('category').prefetch_related('tags')[:100]
         
@@ -126,6 +127,34 @@ class AdvancedRecommendationEngine:
         
         return recommendations[:limit]
     
+    def get_discovered_recommendations(self, user, limit=10, candidates=500):
+        """Рекомендации из общего пула внешних материалов (без запросов к API)"""
+        user_profile = self.build_user_profile(user)
+        saved = set(url_hash(url) for url in user.contentitem_set.exclude(url='').values_list('url', flat=True))
+        
+        recommendations = []
+        for item in DiscoveredItem.objects.all()[:candidates]:
+            if item.url_hash in saved:
+                continue
+            content_vector = {
+                'tags': set(item.tags),
+                'content_type': item.content_type,
+                'category': None,
+                'popularity': 0,
+                'recency': self._calculate_recency(item.published_at or item.ingested_at)
+            }
+            similarity = self.calculate_similarity(user_profile, content_vector)
+            
+            if similarity > 0.1:
+                recommendations.append({
+                    'item': item,
+                    'score': similarity,
+                    'reason': self._generate_reason(user_profile, content_vector, similarity)
+                })
+        
+        recommendations.sort(key=lambda x: x['score'], reverse=True)
+        return recommendations[:limit]
+    
     def _calculate_time_weight(self, created_at):
         """Вес в зависимости от времени создания"""
         days_ago = (datetime.now(created_at.tzinfo) - created_at).days
@@ -143,8 +172,13 @@ class AdvancedRecommendationEngine:
     
     def _calculate_popularity(self, content_item):
         """Расчет популярности контента"""
-        # Простая метрика популярности
-        similar_count = ContentItem.objects.filter( # pyright: ignore[reportUndefinedVariable]
+        # Сколько пользователей сохранили тот же ресурс (счет по индексу resource_id)
+        if content_item.resource_id:
+            saves_count = ContentItem.objects.filter(resource_id=content_item.resource_id).count()
+            return min(saves_count / 10, 1.0)
+        
+        # Ссылки нет - простая метрика по тегам
+        similar_count = ContentItem.objects.filter(
             tags__in=content_item.tags.all()
         ).count()
         
@@ -0,0 +1,82 @@
+"""
+Кэш сериализованных представлений элементов контента.
+
+Одни и те же популярные элементы выводятся в /api/contents/, similar,
+рекомендациях и списках категорий и пользователей. Представление
+элемента (словарь ContentItemSerializer) кэшируется по ключу
+(id, updated_at): любое сохранение элемента, массовое изменение и смена
+тегов (content.signals, content.tagging - через touch) дают новый
+ключ, старая запись просто истекает.
+
+Список собирается одним get_many, сериализуются только промахи - они
+догружаются одним запросом по плану content.prefetch и кладутся обратно
+одним set_many. Представление не зависит от запроса (в нем нет ссылок),
+поэтому записи общие для всех пользователей.
+
+Вложенные категория и пользователь в ключ не входят: их изменение (и
+изменение тегов) сбрасывает все записи сразу - записи хранят поколение,
+invalidate задает новое. Поколение хранится в базе (счетчик
+content.counters.GENERATION), а не в кэше: при локальном кэше у каждого
+процесса (LocMemCache) сброс в одном процессе виден всем остальным.
+Счетчики в представлении (similar_count, content_count категории) могут
+отставать не дольше REPRESENTATION_CACHE_TTL.
+"""
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.core.cache import cache # pyright: ignore[reportMissingModuleSource]
+from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+
+from . import counters
+
+PREFIX = 'item_repr'
+QUERY_CHUNK = 500
+
+
+def _key(pk, version):
+    return f'{PREFIX}:{pk}:{version.timestamp():.6f}'
+
+
+def invalidate():
+    """Сбросить все представления (изменились категория, пользователь или тег)"""
+    counters.bump(counters.GENERATION, PREFIX)
+
+
+def touch(ids):
+    """Новая версия элементов, у которых сменились теги (updated_at = сейчас)"""
+    from .models import ContentItem
+
+    ids = list(ids)
+    now = timezone.now()
+    for start in range(0, len(ids), QUERY_CHUNK):
+        ContentItem.all_objects.filter(pk__in=ids[start:start + QUERY_CHUNK]).update(updated_at=now)
+    return now
+
+
+def representations(items, serializer):
+    """
+    {id: представление} для элементов (нужны pk и updated_at): записи кэша
+    одним get_many, промахи - сериализатором serializer после догрузки.
+    Скрытые к моменту догрузки элементы в результат не попадают.
+    """
+    from .prefetch import optimize
+
+    keys = {item.pk: _key(item.pk, item.updated_at) for item in items}
+    if not keys:
+        return {}
+    generation = counters.get(counters.GENERATION, PREFIX)
+    found = cache.get_many(list(keys.values()))
+
+    result = {}
+    for pk, key in keys.items():
+        entry = found.get(key)
+        if entry is not None and entry[0] == generation:
+            result[pk] = entry[1]
+
+    misses = [pk for pk in keys if pk not in result]
+    if misses:
+        fresh = {}
+        for item in optimize(serializer.Meta.model.objects.filter(pk__in=misses), serializer):
+            data = serializer.to_representation(item)
+            result[item.pk] = data
+            fresh[_key(item.pk, item.updated_at)] = (generation, data)
+        cache.set_many(fresh, getattr(settings, 'REPRESENTATION_CACHE_TTL', 300))
+    return result
@@ -0,0 +1,207 @@
+"""
+Общие ресурсы (Resource) для ссылок, сохраненных многими пользователями.
+
+ContentItem - закладка пользователя (статус, теги, даты), Resource - одна
+строка на нормализованный URL. ContentItem.save привязывает ресурс сам,
+пакетные пути (bulk_create) используют resolve, а существующие данные
+переносятся backfill (миграция 0008 и команда backfill_resources). После
+смены правил нормализации (content.urlnorm) элементы перепривязывает relink.
+
+Описание ресурса - только из метаданных страницы (describe), ввод
+пользователя в него не попадает. У закладки - свое описание поверх
+общего: NULL - наследовать описание ресурса, пустая строка - явно пустое
+(own_description для импорта). Показ, поиск и пересчеты берут
+ContentItem.full_description или выражение FULL_DESCRIPTION.
+Заголовок и ссылка остаются у закладки: заголовок пользователь
+переименовывает, а исходная ссылка (с якорем, параметрами) не
+восстанавливается из нормализованной.
+"""
+from django.db import transaction # pyright: ignore[reportMissingModuleSource]
+from django.db.models import F, TextField, Value # pyright: ignore[reportMissingModuleSource]
+from django.db.models.functions import Coalesce # pyright: ignore[reportMissingModuleSource]
+
+from .urlnorm import normalize_url, url_hash
+
+
+# Описание закладки для запросов: свое (и явно пустое) или общее описание ресурса
+FULL_DESCRIPTION = Coalesce('description', 'resource__description', Value(''), output_field=TextField())
+
+
+def own_description(description, resource):
+    """
+    Описание импортированной закладки: None (наследовать описание ресурса),
+    если его нет или оно совпадает с описанием страницы
+    """
+    if not description or (resource is not None and description == resource.description):
+        return None
+    return description
+
+
+def describe(url, title='', description='', content_type='article'):
+    """
+    Ресурс URL с описанием из метаданных страницы - единственный источник
+    Resource.description. Закладки, наследующие описание, получают новую
+    версию в кэше представлений
+    """
+    from . import representation_cache
+    from .models import Resource
+
+    resource = Resource.for_url(url, title=title[:200], description=description, content_type=content_type)
+    if description and resource.description != description:
+        Resource.objects.filter(pk=resource.pk).update(description=description)
+        resource.description = description
+        representation_cache.touch(
+            resource.bookmarks.filter(description__isnull=True).values_list('pk', flat=True)
+        )
+    return resource
+
+
+def _models(content_item_model, resource_model):
+    # Миграции передают исторические модели
+    if content_item_model is None or resource_model is None:
+        from .models import ContentItem, Resource
+        return content_item_model or ContentItem, resource_model or Resource
+    return content_item_model, resource_model
+
+
+def resolve(items, resource_model=None):
+    """
+    Ресурсы для пачки ссылок одним запросом на чтение и одной вставкой.
+
+    items - итерируемое (url, {'title', 'description', 'content_type'});
+    описание передают только из метаданных страницы. Возвращает {url: Resource}.
+    """
+    _, Resource = _models(None, resource_model)
+
+    by_hash = {}
+    urls = {}
+    for url, defaults in items:
+        key = url_hash(url)
+        urls[url] = key
+        by_hash.setdefault(key, (url, defaults))
+    if not by_hash:
+        return {}
+
+    found = {r.url_hash: r for r in Resource.objects.filter(url_hash__in=list(by_hash))}
+    missing = [
+        Resource(
+            url_hash=key,
+            url=normalize_url(url)[:500],
+            title=(defaults.get('title') or '')[:200],
+            description=defaults.get('description') or '',
+            content_type=defaults.get('content_type') or 'article',
+        )
+        for key, (url, defaults) in by_hash.items() if key not in found
+    ]
+    if missing:
+        # ignore_conflicts не возвращает pk - перечитываем созданные
+        Resource.objects.bulk_create(missing, ignore_conflicts=True)
+        found.update(
+            (r.url_hash, r) for r in Resource.objects.filter(url_hash__in=[r.url_hash for r in missing])
+        )
+    return {url: found[key] for url, key in urls.items()}
+
+
+def saved_item(user_id, url):
+    """Элемент пользователя с той же ссылкой (с точностью до нормализации) или None"""
+    from .models import ContentItem
+
+    return ContentItem.objects.filter(user_id=user_id, resource__url_hash=url_hash(url)).order_by('pk').first()
+
+
+def backfill(chunk_size=2000, content_item_model=None, resource_model=None, progress=None):
+    """
+    Привязка ресурсов к элементам без них (чанками по id, короткие транзакции).
+    Возвращает число обновленных элементов.
+    """
+    ContentItem, Resource = _models(content_item_model, resource_model)
+
+    updated = 0
+    last_id = 0
+    while True:
+        rows = list(
+            ContentItem.objects.filter(pk__gt=last_id, resource__isnull=True).exclude(url='')
+            .order_by('pk').values_list('pk', 'url', 'title', 'content_type')[:chunk_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        # Описание элемента остается его собственным - в общий ресурс не копируется
+        with transaction.atomic():
+            resources = resolve(
+                ((url, {'title': title, 'content_type': content_type}) for _, url, title, content_type in rows),
+                resource_model=Resource,
+            )
+            ContentItem.objects.bulk_update(
+                [ContentItem(pk=pk, resource_id=resources[url].pk) for pk, url, *_ in rows], ['resource']
+            )
+
+        updated += len(rows)
+        if progress is not None:
+            progress(updated)
+    return updated
+
+
+def relink(chunk_size=2000, content_item_model=None, resource_model=None):
+    """
+    Перепривязать элементы, чей URL после смены нормализации дает другой
+    хеш, к ресурсам по новому хешу. Новый ресурс получает заголовок и
+    описание прежнего. Возвращает число перепривязанных элементов.
+    """
+    ContentItem, Resource = _models(content_item_model, resource_model)
+
+    relinked = 0
+    last_id = 0
+    while True:
+        rows = list(
+            ContentItem.objects.filter(pk__gt=last_id, resource__isnull=False).exclude(url='')
+            .order_by('pk').values_list(
+                'pk', 'url', 'resource__url_hash', 'resource__title',
+                'resource__description', 'resource__content_type',
+            )[:chunk_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        stale = [row for row in rows if url_hash(row[1]) != row[2]]
+        if not stale:
+            continue
+
+        with transaction.atomic():
+            resources = resolve(
+                ((url, {'title': title, 'description': description, 'content_type': content_type})
+                 for _, url, _, title, description, content_type in stale),
+                resource_model=Resource,
+            )
+            ContentItem.objects.bulk_update(
+                [ContentItem(pk=pk, resource_id=resources[url].pk) for pk, url, *_ in stale], ['resource']
+            )
+        relinked += len(stale)
+    return relinked
+
+
+def strip_descriptions(chunk_size=2000, content_item_model=None, inherit=None):
+    """
+    Описания закладок, совпадающие с описанием ресурса, - наследовать
+    (чанками по id). inherit - значение «наследовать» (до миграции 0025 -
+    пустая строка). Возвращает число очищенных.
+    """
+    ContentItem, _ = _models(content_item_model, None)
+
+    cleared = 0
+    last_id = 0
+    while True:
+        ids = list(
+            ContentItem.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+        duplicated = (
+            ContentItem.objects.filter(pk__in=ids, description=F('resource__description'))
+            .exclude(description='').values('pk')
+        )
+        cleared += ContentItem.objects.filter(pk__in=duplicated).update(description=inherit)
+    return cleared
+
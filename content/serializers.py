@@ -1,6 +1,8 @@
 from rest_framework import serializers # pyright: ignore[reportMissingImports]
+from django.db.models import Count, F, Func, IntegerField, Manager, OuterRef, Q, Subquery # pyright: ignore[reportMissingModuleSource]
 from taggit.serializers import TagListSerializerField, TaggitSerializer # pyright: ignore[reportMissingImports]
-from .models import Category, ContentItem, Recommendation
+from .models import BatchImportJob, Category, ContentItem, DeletionJob, ImportJob, Recommendation, ParseJob
+from . import representation_cache, tagging
 from django.contrib.auth.models import User # pyright: ignore[reportMissingModuleSource]
 
 class UserSerializer(serializers.ModelSerializer):
@@ -8,21 +10,59 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email']
 
+def _similar_count():
+    """Число других элементов с общими тегами - подзапрос для аннотации"""
+    links = ContentItem.tags.through.objects.filter(
+        content_type__app_label='content', content_type__model='contentitem'
+    )
+    similar = links.filter(
+        tag_id__in=links.filter(object_id=OuterRef(OuterRef('pk'))).values('tag_id'),
+        object_id__in=ContentItem.objects.values('pk'),
+    ).exclude(object_id=OuterRef('pk'))
+    count = Func(F('object_id'), template='COUNT(DISTINCT %(expressions)s)', output_field=IntegerField())
+    return Subquery(similar.order_by().annotate(count=count).values('count')[:1])
+
 class CategorySerializer(serializers.ModelSerializer):
-    content_count = serializers.IntegerField(source='contentitem_set.count', read_only=True)
+    content_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'description', 'content_count']
+        # Нужды полей при выводе списком (content.prefetch)
+        annotations = {
+            'content_count': Count('contentitem', filter=Q(contentitem__pending_deletion=False)),
+        }
+    
+    def get_content_count(self, obj):
+        # Аннотация из запроса; без нее (объект не из списка) - отдельный COUNT
+        if hasattr(obj, 'content_count'):
+            return obj.content_count
+        return obj.contentitem_set.count()
+
+def _instances(data):
+    return data.all() if isinstance(data, Manager) else data
+
+class ContentItemListSerializer(serializers.ListSerializer):
+    """Список элементов из кэша представлений (content.representation_cache)"""
+    def to_representation(self, data):
+        items = list(_instances(data))
+        cached = representation_cache.representations(items, self.child)
+        return [cached[item.pk] for item in items if item.pk in cached]
 
 class ContentItemSerializer(TaggitSerializer, serializers.ModelSerializer):
     tags = TagListSerializerField()
     user = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
+    # Свое описание или общее описание ресурса (content.resources); null - снова наследовать
+    description = serializers.CharField(
+        source='full_description', required=False, allow_blank=True, allow_null=True
+    )
     category_id = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(),
         source='category',
-        write_only=True
+        write_only=True,
+        required=False,
+        allow_null=True
     )
     
     # Статистика
@@ -38,22 +78,48 @@ class ContentItemSerializer(TaggitSerializer, serializers.ModelSerializer):
             'view_count', 'similar_count'
         ]
         read_only_fields = ['user', 'created_at', 'updated_at']
+        # Связи (user, category, tags) планировщик находит сам (content.prefetch)
+        annotations = {'similar_count': _similar_count()}
+        select_related = {'description': ['resource']}
+        list_serializer_class = ContentItemListSerializer
+    
+    def to_representation(self, instance):
+        # Вложенный элемент списка: представление уже собрано из кэша
+        cached = self.context.get('item_representations', {}).get(instance.pk)
+        return cached if cached is not None else super().to_representation(instance)
     
     def get_view_count(self, obj):
         # Можно добавить систему просмотров
         return 0
     
     def get_similar_count(self, obj):
-        from taggit.models import Tag # pyright: ignore[reportMissingImports]
+        if hasattr(obj, 'similar_count'):
+            return obj.similar_count
         similar = ContentItem.objects.filter(
             tags__in=obj.tags.all()
         ).exclude(id=obj.id).distinct().count()
         return similar
     
     def create(self, validated_data):
-        # Автоматически назначаем текущего пользователя
-        validated_data['user'] = self.context['request'].user
+        # Автоматически назначаем текущего пользователя (если не передан в save())
+        if 'user' not in validated_data:
+            validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
+    
+    def _save_tags(self, tag_object, tags):
+        # Теги назначаются пачкой (content.tagging), а не TaggableManager.set
+        if 'tags' in tags:
+            tagging.set_tags(tag_object, tags['tags'])
+        return tag_object
+
+class RecommendationListSerializer(serializers.ListSerializer):
+    """Рекомендации: вложенные элементы - одним обращением к кэшу представлений"""
+    def to_representation(self, data):
+        recommendations = list(_instances(data))
+        self.context['item_representations'] = representation_cache.representations(
+            [recommendation.content_item for recommendation in recommendations], ContentItemSerializer()
+        )
+        return super().to_representation(recommendations)
 
 class RecommendationSerializer(serializers.ModelSerializer):
     content_item = ContentItemSerializer(read_only=True)
@@ -67,4 +133,49 @@ class RecommendationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Recommendation
         fields = ['id', 'user', 'content_item', 'content_item_id', 'score', 'reason', 'created_at']
-        read_only_fields = ['user', 'created_at']
\ No newline at end of file
+        read_only_fields = ['user', 'created_at']
+        list_serializer_class = RecommendationListSerializer
+
+class ParseJobSerializer(serializers.ModelSerializer):
+    content_item = ContentItemSerializer(read_only=True)
+    
+    class Meta:
+        model = ParseJob
+        fields = ['id', 'url', 'status', 'content_item', 'error', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = DeletionJob
+        fields = [
+            'id', 'target', 'target_id', 'status', 'total', 'processed', 'progress',
+            'error', 'created_at', 'finished_at'
+        ]
+        read_only_fields = fields
+    
+    def get_progress(self, obj):
+        # Доля обработанных строк (0..1)
+        return round(min(obj.processed / obj.total, 1.0), 3) if obj.total else 1.0
+
+class BatchImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BatchImportJob
+        fields = ['id', 'status', 'total', 'created', 'results', 'error', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'name', 'file_format', 'status', 'size', 'processed_bytes', 'progress',
+            'total', 'created', 'duplicate', 'invalid', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+    
+    def get_progress(self, obj):
+        # Доля прочитанных байт файла (0..1)
+        return round(min(obj.processed_bytes / obj.size, 1.0), 3) if obj.size else 1.0
@@ -1,19 +1,23 @@
-import requests # pyright: ignore[reportMissingModuleSource]
 import json
 from django.conf import settings # pyright: ignore[reportMissingModuleSource]
 from datetime import datetime, timedelta
-import pandas as pd # pyright: ignore[reportMissingModuleSource]
 from typing import List, Dict, Optional
 
+# requests и pandas импортируются лениво внутри методов: модуль подключается
+# при старте каждого воркера, а тяжелые зависимости нужны только на отдельных путях
+
 class NewsAPIClient:
     """Клиент для NewsAPI (пример внешнего API)"""
     
     def __init__(self, api_key=None):
         self.api_key = api_key or getattr(settings, 'NEWS_API_KEY', '')
-        self.base_url = 'https://newsapi.org/v2'
+        self.base_url = getattr(settings, 'NEWS_API_BASE_URL', 'https://newsapi.org/v2')
     
-    def search_articles(self, query: str, language='ru', page_size=10):
+    def search_articles(self, query: str, language='ru', page_size=10, page=1):
         """Поиск статей по запросу"""
+        import requests # pyright: ignore[reportMissingModuleSource]
+        from . import http_client
+        
         if not self.api_key:
             return {'error': 'API key not configured'}
         
@@ -23,11 +27,12 @@ class NewsAPIClient:
             'language': language,
             'pageSize': page_size,
             'apiKey': self.api_key,
-            'sortBy': 'relevance'
+            'sortBy': 'relevance',
+            'page': page
         }
         
         try:
-            response = requests.get(endpoint, params=params, timeout=10)
+            response = http_client.get(endpoint, params=params)
             response.raise_for_status()
             data = response.json()
             
@@ -43,14 +48,15 @@ class NewsAPIClient:
         formatted = []
         for article in articles:
             formatted.append({
-                'title': article.get('title', ''),
-                'url': article.get('url', ''),
-                'description': article.get('description', '')[:200],
+                'title': article.get('title') or '',
+                'url': article.get('url') or '',
+                # NewsAPI отдает null вместо пустых строк
+                'description': (article.get('description') or '')[:200],
                 'source': article.get('source', {}).get('name', ''),
                 'published_at': article.get('publishedAt', ''),
                 'content_type': 'article',
                 'tags': self._extract_tags(article, query),
-                'external_id': article.get('url', '')[:100]
+                'external_id': (article.get('url') or '')[:100]
             })
         return formatted
     
@@ -63,8 +69,8 @@ class NewsAPIClient:
         if source:
             tags.append(source)
         
-        # Можно добавить логику для извлечения ключевых слов
-        # из заголовка или описания
+        # Ключевые слова из заголовка и описания добавляются при загрузке
+        # в общий пул (content.ingestion, TF-IDF по корпусу)
         
         return list(set(tags))[:5]
 
@@ -104,17 +110,68 @@ class ContentAnalyzer:
     
     def __init__(self):
         self.df = None
+        self.columns = None
+        self.snapshot_meta = None
+    
+    LOAD_FIELDS = [
+        'id', 'title', 'content_type', 'status', 'user',
+        'created_at', 'completed_at', 'category__name'
+    ]
     
-    def load_data(self, queryset):
-        """Загрузка данных из queryset в DataFrame"""
-        data = list(queryset.values(
-            'id', 'title', 'content_type', 'status',
-            'created_at', 'category__name'
-        ))
-        self.df = pd.DataFrame(data)
+    def load_data(self, queryset, chunk_size=5000):
+        """Загрузка данных из queryset в DataFrame (чтение чанками)"""
+        import pandas as pd # pyright: ignore[reportMissingModuleSource]
+        from itertools import islice
+        
+        rows = queryset.values_list(*self.LOAD_FIELDS).iterator(chunk_size=chunk_size)
+        
+        # Каждый чанк сразу сжимается в категориальные колонки,
+        # поэтому в памяти не копится список dict'ов на все строки
+        frames = []
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            frame = pd.DataFrame.from_records(chunk, columns=self.LOAD_FIELDS)
+            for column in ('content_type', 'status', 'category__name'):
+                frame[column] = frame[column].astype('category')
+            frames.append(frame)
+        
+        if not frames:
+            self.df = pd.DataFrame(columns=self.LOAD_FIELDS)
+            return self.df
+        
+        # concat чанков с разными словарями категорий дает object - возвращаем category
+        self.df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        for column in ('content_type', 'status', 'category__name'):
+            self.df[column] = self.df[column].astype('category')
+        self.df['created_at'] = pd.to_datetime(self.df['created_at'], utc=True)
+        self.df['completed_at'] = pd.to_datetime(self.df['completed_at'], utc=True)
+        self.df['month'] = self.df['created_at'].dt.tz_localize(None).dt.to_period('M')
+        
+        return self.df
+    
+    def load_snapshot(self, path=None):
+        """Загрузка данных из колоночного снимка (memory-map, без запросов к БД)"""
+        import pandas as pd # pyright: ignore[reportMissingModuleSource]
+        from .analytics_snapshot import load_snapshot
+        
+        self.columns, self.snapshot_meta = load_snapshot(path)
+        dictionaries = self.snapshot_meta['dictionaries']
+        
+        # Категориальные колонки собираются из кодов без материализации строк
+        self.df = pd.DataFrame({
+            'id': self.columns['id'],
+            'user': self.columns['user'],
+            'content_type': pd.Categorical.from_codes(self.columns['type'], dictionaries['type']),
+            'status': pd.Categorical.from_codes(self.columns['status'], dictionaries['status']),
+            'category__name': pd.Categorical.from_codes(self.columns['category'], dictionaries['category']),
+            'created_at': self.columns['created_at'],
+            'completed_at': self.columns['completed_at'],
+            'tag_count': self.columns['tag_count'],
+        }, copy=False)
         
         if not self.df.empty:
-            self.df['created_at'] = pd.to_datetime(self.df['created_at'])
             self.df['month'] = self.df['created_at'].dt.to_period('M')
         
         return self.df
@@ -126,7 +183,8 @@ class ContentAnalyzer:
         
         monthly = self.df.groupby('month').agg({
             'id': 'count',
-            'content_type': lambda x: x.value_counts().to_dict()
+            # Для категориальных колонок (снимок) отбрасываем нулевые категории
+            'content_type': lambda x: x.value_counts()[lambda c: c > 0].to_dict()
         }).reset_index()
         
         monthly['month'] = monthly['month'].astype(str)
@@ -137,9 +195,93 @@ class ContentAnalyzer:
         if self.df is None or self.df.empty:
             return {}
         
-        distribution = self.df['content_type'].value_counts().to_dict()
+        counts = self.df['content_type'].value_counts()
+        distribution = counts[counts > 0].to_dict()
         return distribution
     
+    def get_cohort_matrix(self, max_months=12):
+        """
+        Когортный анализ по месяцу добавления.
+        
+        statuses - текущее распределение статусов в каждой когорте,
+        completion - накопленная доля завершенных через N месяцев после добавления.
+        """
+        import numpy as np # pyright: ignore[reportMissingImports]
+        import pandas as pd # pyright: ignore[reportMissingModuleSource]
+        
+        if self.df is None or self.df.empty:
+            return {'cohorts': [], 'statuses': {}, 'completion': {}}
+        
+        cohort = self.df['month']
+        sizes = cohort.value_counts().sort_index()
+        
+        statuses = pd.crosstab(cohort, self.df['status'].astype(str)).reindex(sizes.index, fill_value=0)
+        
+        # Смещение в месяцах между добавлением и завершением (без построчного Python)
+        completed = self.df['completed_at'].notna().to_numpy()
+        created_at = self.df['created_at'][completed]
+        completed_at = self.df['completed_at'][completed]
+        offset = (
+            (completed_at.dt.year - created_at.dt.year) * 12
+            + (completed_at.dt.month - created_at.dt.month)
+        ).clip(lower=0, upper=max_months)
+        
+        months = np.arange(max_months + 1)
+        if completed.any():
+            completion = pd.crosstab(cohort[completed], offset).reindex(
+                index=sizes.index, columns=months, fill_value=0
+            )
+        else:
+            completion = pd.DataFrame(0, index=sizes.index, columns=months)
+        completion_rate = completion.cumsum(axis=1).div(sizes, axis=0).round(4)
+        
+        cohorts = [str(period) for period in sizes.index]
+        return {
+            'cohorts': cohorts,
+            'sizes': dict(zip(cohorts, sizes.tolist())),
+            'statuses': {
+                status: dict(zip(cohorts, statuses[status].tolist()))
+                for status in statuses.columns
+            },
+            'completion': {
+                cohort_name: row
+                for cohort_name, row in zip(cohorts, completion_rate.to_numpy().tolist())
+            },
+        }
+    
+    # Границы корзин распределения времени до завершения (в днях)
+    TIME_TO_COMPLETE_BINS = [0, 1, 3, 7, 14, 30, 90, 365]
+    
+    def get_time_to_complete_distribution(self, bins=None):
+        """Распределение времени от добавления (new) до завершения (completed)"""
+        import numpy as np # pyright: ignore[reportMissingImports]
+        
+        empty = {'count': 0, 'mean_days': None, 'median_days': None, 'p90_days': None, 'histogram': []}
+        if self.df is None or self.df.empty:
+            return empty
+        
+        durations = (self.df['completed_at'] - self.df['created_at']).dropna()
+        days = durations.dt.total_seconds().to_numpy() / 86400
+        days = np.clip(days, 0, None)
+        if not len(days):
+            return empty
+        
+        edges = np.asarray(list(bins or self.TIME_TO_COMPLETE_BINS) + [np.inf], dtype='float64')
+        counts, _ = np.histogram(days, bins=edges)
+        
+        histogram = []
+        for low, high, count in zip(edges[:-1], edges[1:], counts.tolist()):
+            label = f'{low:g}+' if np.isinf(high) else f'{low:g}-{high:g}'
+            histogram.append({'range_days': label, 'count': count})
+        
+        return {
+            'count': int(len(days)),
+            'mean_days': round(float(days.mean()), 2),
+            'median_days': round(float(np.median(days)), 2),
+            'p90_days': round(float(np.percentile(days, 90)), 2),
+            'histogram': histogram,
+        }
+    
     def get_recommendations_based_on_history(self, user_content):
         """Рекомендации на основе истории пользователя"""
         if self.df is None or self.df.empty:
@@ -0,0 +1,154 @@
+"""
+Обработчики сигналов: обновление производных структур при записи.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete # pyright: ignore[reportMissingModuleSource]
+from django.contrib.auth.models import User # pyright: ignore[reportMissingModuleSource]
+from django.dispatch import receiver # pyright: ignore[reportMissingModuleSource]
+from taggit.models import Tag, TaggedItem # pyright: ignore[reportMissingImports]
+
+from .models import Category, ContentItem
+from . import counters, keywords, representation_cache, sketches, tagging
+
+
+@receiver(post_save, sender=ContentItem)
+def update_user_sketches(sender, instance, created, raw=False, **kwargs):
+    """Учесть пользователя элемента в HyperLogLog-скетчах: новый элемент или смена категории"""
+    if raw:
+        return
+    # Прежние поля - до update_item_counters (он подключен ниже и обновляет _counted)
+    counted = getattr(instance, '_counted', None)
+    if not created and (counted is None or counted[1] == instance.category_id):
+        return
+    sketches.record_content_item(instance.user_id, instance.created_at, instance.category_id)
+
+
+@receiver(post_save, sender=ContentItem)
+def update_term_frequencies(sender, instance, created, raw=False, **kwargs):
+    """Документные частоты автотегов: новый элемент или правка заголовка, описания, ссылки"""
+    if raw:
+        return
+    fields = instance.indexed_fields()
+    indexed = getattr(instance, '_indexed', None)
+    if created:
+        keywords.record_items([instance])
+    elif indexed is not None and fields is not None and fields != indexed:
+        keywords.replace_item(indexed, instance)
+    instance._indexed = fields
+
+
+@receiver(post_save, sender=ContentItem)
+def update_item_counters(sender, instance, created, raw=False, **kwargs):
+    """Счетчики элементов: новый элемент или смена категории, типа, статуса"""
+    if raw or instance.pending_deletion:
+        return
+    fields = instance.counted_fields()
+    counted = getattr(instance, '_counted', None)
+    if created:
+        counters.apply(counters.item_deltas([fields]))
+    elif counted is not None and fields != counted:
+        deltas = counters.item_deltas([counted], -1)
+        deltas.update(counters.item_deltas([fields]))
+        if fields[1] != counted[1]:
+            # Теги элемента переходят в другую категорию
+            tag_ids = list(instance.tags.values_list('id', flat=True))
+            deltas.update(counters.tag_deltas(((counted[1], pk) for pk in tag_ids), -1))
+            deltas.update(counters.tag_deltas((fields[1], pk) for pk in tag_ids))
+        counters.apply(deltas)
+    instance._counted = fields
+
+
+@receiver(pre_delete, sender=ContentItem)
+def remove_item_counters(sender, instance, **kwargs):
+    """Вычесть удаляемый элемент и его теги (массовые пути вычитают сами)"""
+    if counters.is_suspended():
+        return
+    counters.remove_queryset(ContentItem.objects.filter(pk=instance.pk))
+
+
+@receiver(pre_delete, sender=ContentItem)
+def remove_term_frequencies(sender, instance, **kwargs):
+    """Вычесть удаляемый элемент из частот терминов (массовые пути вычитают сами)"""
+    if counters.is_suspended():
+        return
+    keywords.remove_queryset(ContentItem.all_objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def update_tag_counters(sender, instance, action, pk_set=None, **kwargs):
+    """Счетчики тегов при add/remove/clear через TaggableManager"""
+    if not isinstance(instance, ContentItem) or instance.pending_deletion:
+        return
+
+    if action in ('post_add', 'post_remove') and pk_set:
+        sign = 1 if action == 'post_add' else -1
+        counters.apply(counters.tag_deltas(((instance.category_id, pk) for pk in pk_set), sign))
+    elif action == 'pre_clear':
+        tag_ids = instance.tags.values_list('id', flat=True)
+        counters.apply(counters.tag_deltas(((instance.category_id, pk) for pk in tag_ids), -1))
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def update_tag_sketch(sender, instance, action, pk_set=None, **kwargs):
+    """Обновить Count-Min Sketch частот тегов"""
+    if not isinstance(instance, ContentItem):
+        return
+
+    if action in ('post_add', 'post_remove') and pk_set:
+        names = Tag.objects.filter(pk__in=pk_set).values_list('name', flat=True)
+        sketches.record_tags(list(names), delta=1 if action == 'post_add' else -1)
+    elif action == 'pre_clear':
+        sketches.record_tags(list(instance.tags.names()), delta=-1)
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def bump_item_version(sender, instance, action, pk_set=None, **kwargs):
+    """Смена тегов - новая версия элемента для кэша представлений"""
+    if not isinstance(instance, ContentItem):
+        return
+    if action == 'post_clear' or (action in ('post_add', 'post_remove') and pk_set):
+        instance.updated_at = representation_cache.touch([instance.pk])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def forget_cached_tag(sender, instance, created=False, **kwargs):
+    """Сбросить тег в кэше имя -> id (content.tagging); новый тег кэш не портит"""
+    if not created:
+        tagging.forget(instance.pk)
+
+
+@receiver(post_delete, sender=Tag)
+def forget_tag_counters(sender, instance, **kwargs):
+    counters.forget(counters.TAG, str(instance.pk))
+
+
+@receiver(post_save, sender=Category)
+def count_category(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.apply({(counters.CATEGORIES, ''): 1})
+
+
+@receiver(post_delete, sender=Category)
+def forget_category_counters(sender, instance, **kwargs):
+    """Удаленная категория: ее счетчики не нужны (скрытая уже вычтена)"""
+    if not instance.pending_deletion:
+        counters.apply({(counters.CATEGORIES, ''): -1})
+    counters.forget(counters.CATEGORY, str(instance.pk))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_representations(sender, created=False, raw=False, **kwargs):
+    """Категория или тег изменились - представления элементов с ними устарели"""
+    if not created and not raw:
+        representation_cache.invalidate()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_representations(sender, created, update_fields=None, raw=False, **kwargs):
+    # Вход обновляет только last_login - его в представлении нет
+    if created or raw or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    representation_cache.invalidate()
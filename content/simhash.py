@@ -0,0 +1,216 @@
+"""
+Поиск почти-дубликатов по SimHash.
+
+64-битный отпечаток строится по нормализованным токенам заголовка и
+описания (токены заголовка весят вдвое больше). Отпечаток делится на
+BANDS полос по 16 бит, каждая хранится в отдельной индексированной
+колонке ContentItem. Если расстояние Хэмминга между отпечатками не больше
+BANDS - 1, хотя бы одна полоса у них совпадает (принцип Дирихле), поэтому
+кандидаты выбираются по индексу, а точная проверка делается только для них.
+
+Цифры - значимые токены ("Часть 1" и "Часть 2" - разные материалы), а
+у коротких заголовков ("Just a moment...") отпечатка нет вовсе: меньше
+SIMHASH_MIN_TOKENS различных токенов - слишком мало для сравнения.
+Почти-дубликат только помечается (duplicate_of): разные ссылки всегда
+сохраняются, повторно используется лишь элемент с той же ссылкой
+(content.resources.saved_item).
+"""
+import hashlib
+import re
+from collections import Counter
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.db.models import Q # pyright: ignore[reportMissingModuleSource]
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+TITLE_WEIGHT = 2
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+STOP_WORDS = {
+    'the', 'and', 'for', 'with', 'how', 'what', 'you', 'your', 'are', 'from', 'this', 'that',
+    'is', 'an', 'of', 'to', 'in', 'on', 'at', 'by', 'it', 'be', 'as', 'or',
+    'и', 'в', 'во', 'на', 'по', 'с', 'со', 'для', 'как', 'что', 'это', 'или', 'из', 'к', 'о', 'об', 'не',
+}
+
+
+def get_max_distance():
+    return min(getattr(settings, 'SIMHASH_MAX_DISTANCE', 3), BANDS - 1)
+
+
+def get_min_tokens():
+    return getattr(settings, 'SIMHASH_MIN_TOKENS', 3)
+
+
+def tokenize(text):
+    """Нормализованные токены: нижний регистр, без стоп-слов и одиночных букв (цифры остаются)"""
+    return [
+        token for token in TOKEN_RE.findall(text.lower())
+        if (len(token) > 1 or token.isdigit()) and token not in STOP_WORDS
+    ]
+
+
+def _hash64(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def fingerprint(title, description=''):
+    """SimHash заголовка и описания (беззнаковый; None - значимых токенов слишком мало)"""
+    weights = Counter()
+    for token in tokenize(title or ''):
+        weights[token] += TITLE_WEIGHT
+    for token in tokenize(description or ''):
+        weights[token] += 1
+    if not weights or len(weights) < get_min_tokens():
+        return None
+
+    vector = [0] * BITS
+    for token, weight in weights.items():
+        value = _hash64(token)
+        for bit in range(BITS):
+            vector[bit] += weight if value >> bit & 1 else -weight
+    return sum(1 << bit for bit in range(BITS) if vector[bit] > 0)
+
+
+def bands(value):
+    return [(value >> (band * BAND_BITS)) & BAND_MASK for band in range(BANDS)]
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def to_signed(value):
+    """BigIntegerField знаковый - храним дополнительный код"""
+    return value - (1 << BITS) if value >= 1 << (BITS - 1) else value
+
+
+def to_unsigned(value):
+    return value + (1 << BITS) if value < 0 else value
+
+
+def columns(value):
+    """Значения колонок ContentItem (simhash, simhash_band0..3) по отпечатку"""
+    if value is None:
+        return {'simhash': None, **{f'simhash_band{band}': None for band in range(BANDS)}}
+    return {
+        'simhash': to_signed(value),
+        **{f'simhash_band{band}': part for band, part in enumerate(bands(value))},
+    }
+
+
+def fingerprint_fields(title, description=''):
+    return columns(fingerprint(title, description))
+
+
+def _band_query(values):
+    query = Q()
+    for band in range(BANDS):
+        parts = {bands(value)[band] for value in values}
+        query |= Q(**{f'simhash_band{band}__in': list(parts)})
+    return query
+
+
+def match_existing(user_id, values, exclude_ids=(), chunk_size=500):
+    """
+    Ближайший почти-дубликат среди элементов пользователя для каждого
+    отпечатка: список id (None - дубликата нет) в порядке values.
+    """
+    from .models import ContentItem
+
+    max_distance = get_max_distance()
+    result = [None] * len(values)
+    indexed = [(position, value) for position, value in enumerate(values) if value is not None]
+
+    for start in range(0, len(indexed), chunk_size):
+        chunk = indexed[start:start + chunk_size]
+        candidates = (
+            ContentItem.objects.filter(_band_query([value for _, value in chunk]), user_id=user_id)
+            .exclude(pk__in=list(exclude_ids)).values_list('pk', 'simhash')
+        )
+        by_band = {}
+        for pk, signed in candidates:
+            candidate = to_unsigned(signed)
+            for band, part in enumerate(bands(candidate)):
+                by_band.setdefault((band, part), []).append((pk, candidate))
+
+        for position, value in chunk:
+            best = None
+            for band, part in enumerate(bands(value)):
+                for pk, candidate in by_band.get((band, part), ()):
+                    distance = hamming(value, candidate)
+                    if distance <= max_distance and (best is None or distance < best[1]):
+                        best = (pk, distance)
+            result[position] = best[0] if best else None
+    return result
+
+
+def find_near_duplicate(user_id, title, description='', exclude_id=None):
+    """Почти-дубликат среди элементов пользователя (ContentItem или None)"""
+    from .models import ContentItem
+
+    value = fingerprint(title, description)
+    if value is None:
+        return None
+    exclude = [exclude_id] if exclude_id is not None else []
+    pk = match_existing(user_id, [value], exclude_ids=exclude)[0]
+    return ContentItem.objects.filter(pk=pk).first() if pk is not None else None
+
+
+def dedupe_batch(values):
+    """Почти-дубликаты внутри пачки: для каждого - позиция первого похожего или None"""
+    max_distance = get_max_distance()
+    result = [None] * len(values)
+    by_band = {}
+    for position, value in enumerate(values):
+        if value is None:
+            continue
+        parts = bands(value)
+        for band, part in enumerate(parts):
+            for other, candidate in by_band.get((band, part), ()):
+                if hamming(value, candidate) <= max_distance:
+                    result[position] = other
+                    break
+            if result[position] is not None:
+                break
+        if result[position] is None:
+            for band, part in enumerate(parts):
+                by_band.setdefault((band, part), []).append((position, value))
+    return result
+
+
+def backfill(chunk_size=2000, content_item_model=None, progress=None, recompute=False):
+    """
+    Отпечатки для элементов без них (чанками по id); recompute - пересчитать
+    все (после смены токенизации). Возвращает число обновленных.
+    """
+    from django.db import transaction # pyright: ignore[reportMissingModuleSource]
+    from .resources import FULL_DESCRIPTION
+
+    if content_item_model is None:
+        from .models import ContentItem as content_item_model
+
+    fields = ['simhash'] + [f'simhash_band{band}' for band in range(BANDS)]
+    updated = 0
+    last_id = 0
+    while True:
+        rows = list(
+            content_item_model.objects.filter(pk__gt=last_id, **({} if recompute else {'simhash__isnull': True}))
+            .order_by('pk').values_list('pk', 'title', FULL_DESCRIPTION)[:chunk_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        items = [
+            content_item_model(pk=pk, **fingerprint_fields(title, description))
+            for pk, title, description in rows
+        ]
+        with transaction.atomic():
+            content_item_model.objects.bulk_update(items, fields)
+        updated += len(rows)
+        if progress is not None:
+            progress(updated)
+    return updated
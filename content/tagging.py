@@ -0,0 +1,246 @@
+"""
+Пакетное назначение тегов (django-taggit).
+
+TaggableManager.add/set при TAGGIT_CASE_INSENSITIVE ищет каждый тег
+отдельным запросом и создает теги и связи по одному. Здесь имена всей
+пачки разрешаются одним запросом (без учета регистра), недостающие теги
+создаются bulk_create, а строки TaggedItem вставляются пачкой. Этим
+пользуются форма, сериализатор (и через него parse), seed_data и импорт.
+
+Соответствие имя -> id кэшируется в процессе: повторяющиеся теги не
+требуют поиска. Записи попадают в кэш только после коммита транзакции
+(откат не оставит id несуществующих тегов). Удаление и переименование
+тега в любом процессе (content.signals) задают новое поколение в базе
+(счетчик content.counters.GENERATION, как у content.representation_cache):
+кэш с другим поколением очищается перед использованием.
+
+bulk_create не вызывает m2m_changed, поэтому скетч частот тегов,
+счетчики тегов (content.counters) и версии элементов для кэша
+представлений (content.representation_cache) обновляются здесь же.
+"""
+from django.db import transaction # pyright: ignore[reportMissingModuleSource]
+from django.db.models.functions import Lower # pyright: ignore[reportMissingModuleSource]
+
+from . import counters, representation_cache, sketches
+
+MAX_TAG_LENGTH = 100
+QUERY_CHUNK = 500
+# Имен на запрос поиска: у каждого до пяти написаний (лимит параметров SQLite)
+LOOKUP_CHUNK = 150
+# Ограничение кэша имя -> id (при переполнении кэш очищается)
+CACHE_SIZE = 10_000
+# Ключ поколения кэша в счетчиках
+PREFIX = 'tag_ids'
+
+_cache = {}
+# Поколение, к которому относятся записи _cache
+_state = {'generation': None}
+
+
+def normalize(name):
+    """Имя тега без лишних пробелов ('' - пустое)"""
+    return ' '.join(str(name).split())[:MAX_TAG_LENGTH]
+
+
+def _chunks(values, size=QUERY_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def clear_cache():
+    _cache.clear()
+    _state['generation'] = None
+
+
+def forget(tag_id):
+    """Тег удален или переименован: сбросить его записи и кэши других процессов"""
+    for key in [key for key, pk in _cache.items() if pk == tag_id]:
+        _cache.pop(key, None)
+    counters.bump(counters.GENERATION, PREFIX)
+
+
+def _sync_generation():
+    """Текущее поколение; кэш другого поколения очищается"""
+    generation = counters.get(counters.GENERATION, PREFIX)
+    if generation != _state['generation']:
+        _cache.clear()
+        _state['generation'] = generation
+    return generation
+
+
+def _remember(found, generation):
+    # Поколение сменилось, пока шла транзакция, - id могли устареть
+    if generation != _state['generation']:
+        return
+    if len(_cache) + len(found) > CACHE_SIZE:
+        _cache.clear()
+    _cache.update(found)
+
+
+def _variants(key, name):
+    """Написания имени для поиска по точному совпадению"""
+    return {name, key, key.upper(), key.capitalize(), key.title()}
+
+
+def _wanted(names):
+    """{имя в нижнем регистре: имя} без пустых и повторов"""
+    wanted = {}
+    for name in names:
+        name = normalize(name)
+        if name:
+            wanted.setdefault(name.lower(), name)
+    return wanted
+
+
+def _matches(wanted):
+    """
+    Существующие теги (имя в нижнем регистре, id) по порядку id:
+    wanted - {имя в нижнем регистре: имя}.
+
+    LOWER в SQLite меняет регистр только у ASCII, поэтому кроме сравнения
+    с LOWER(name) теги ищутся по точному имени в типичных написаниях
+    (как введено, строчные, ПРОПИСНЫЕ, С заглавной), а совпадение
+    проверяется уже в Python.
+    """
+    from django.db.models import Q # pyright: ignore[reportMissingModuleSource]
+    from taggit.models import Tag # pyright: ignore[reportMissingImports]
+
+    for chunk in _chunks(wanted, LOOKUP_CHUNK):
+        variants = {variant for key in chunk for variant in _variants(key, wanted[key])}
+        tags = Tag.objects.annotate(lower_name=Lower('name')).filter(
+            Q(lower_name__in=chunk) | Q(name__in=variants)
+        )
+        for name, pk in tags.order_by('pk').values_list('name', 'pk'):
+            if name.lower() in wanted:
+                yield name.lower(), pk
+
+
+def _lookup(wanted):
+    """{имя в нижнем регистре: id первого подходящего тега}"""
+    result = {}
+    for key, pk in _matches(wanted):
+        result.setdefault(key, pk)
+    return result
+
+
+def resolve_tags(names):
+    """
+    id тегов по именам без учета регистра, недостающие создаются.
+    Возвращает {имя в нижнем регистре: id тега}.
+    """
+    from taggit.models import Tag # pyright: ignore[reportMissingImports]
+
+    wanted = _wanted(names)
+    generation = _sync_generation()
+    found = {key: _cache[key] for key in wanted if key in _cache}
+    unknown = {key: name for key, name in wanted.items() if key not in found}
+    if not unknown:
+        return found
+
+    loaded = _lookup(unknown)
+    missing = {key: name for key, name in unknown.items() if key not in loaded}
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=Tag().slugify(name)) for name in missing.values()],
+            batch_size=QUERY_CHUNK, ignore_conflicts=True,
+        )
+        loaded.update(_lookup(missing))
+        # Конфликт slug (разные имена, одинаковый slug) - taggit подберет суффикс
+        for key, name in missing.items():
+            if key not in loaded:
+                loaded[key] = Tag.objects.create(name=name).pk
+
+    transaction.on_commit(lambda: _remember(loaded, generation))
+    found.update(loaded)
+    return found
+
+
+def assign_tags(pairs, replace=False):
+    """
+    Назначить теги пачке элементов: pairs - итерируемое (ContentItem, имена).
+    Уже назначенные теги пропускаются; replace - снять теги, которых нет
+    в списке. Возвращает число новых связей.
+    """
+    from django.contrib.contenttypes.models import ContentType # pyright: ignore[reportMissingModuleSource]
+    from .models import ContentItem
+
+    pairs = [(item, [normalize(name) for name in names or ()]) for item, names in pairs]
+    if not replace:
+        pairs = [(item, names) for item, names in pairs if names]
+    if not pairs:
+        return 0
+    with transaction.atomic():
+        tags = resolve_tags(name for _, names in pairs for name in names)
+
+        TaggedItem = ContentItem.tags.through
+        content_type = ContentType.objects.get_for_model(ContentItem)
+        wanted = {}
+        for item, names in pairs:
+            for name in names:
+                if name:
+                    wanted[(item.pk, tags[name.lower()])] = name.lower()
+
+        existing = {}
+        for chunk in _chunks({item.pk for item, _ in pairs}):
+            rows = TaggedItem.objects.filter(content_type=content_type, object_id__in=chunk)
+            for pk, object_id, tag_id, name in rows.values_list('pk', 'object_id', 'tag_id', 'tag__name'):
+                existing[(object_id, tag_id)] = (pk, name)
+
+        if replace:
+            stale = {key: link for key, link in existing.items() if key not in wanted}
+            for chunk in _chunks(pk for pk, _ in stale.values()):
+                TaggedItem.objects.filter(pk__in=chunk).delete()
+            sketches.record_tags([name for _, name in stale.values()], delta=-1)
+            counters.apply(counters.link_deltas(stale, -1))
+
+        new_links = [key for key in wanted if key not in existing]
+        TaggedItem.objects.bulk_create(
+            [TaggedItem(content_type=content_type, object_id=object_id, tag_id=tag_id) for object_id, tag_id in new_links],
+            batch_size=QUERY_CHUNK, ignore_conflicts=True,
+        )
+        sketches.record_tags([wanted[key] for key in new_links])
+        counters.apply(counters.link_deltas(new_links))
+
+        changed = {object_id for object_id, _ in new_links}
+        if replace:
+            changed.update(object_id for object_id, _ in stale)
+        if changed:
+            now = representation_cache.touch(changed)
+            for item, _ in pairs:
+                if item.pk in changed:
+                    item.updated_at = now
+        return len(new_links)
+
+
+def set_tags(item, names):
+    """Заменить теги одного элемента (аналог item.tags.set)"""
+    return assign_tags([(item, names)], replace=True)
+
+
+def remove_tags(object_ids, names):
+    """
+    Снять теги по именам (без учета регистра) с элементов - один DELETE
+    на порцию id. Возвращает число удаленных связей.
+    """
+    from django.contrib.contenttypes.models import ContentType # pyright: ignore[reportMissingModuleSource]
+    from .models import ContentItem
+
+    # Все теги с таким именем без учета регистра (и дубли разного регистра)
+    tag_ids = [pk for _, pk in _matches(_wanted(names))]
+    if not tag_ids:
+        return 0
+    TaggedItem = ContentItem.tags.through
+    links = TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(ContentItem), tag_id__in=tag_ids,
+    )
+    removed = []
+    with transaction.atomic():
+        for chunk in _chunks(object_ids):
+            chunk_links = links.filter(object_id__in=chunk)
+            removed.extend(chunk_links.values_list('object_id', 'tag_id', 'tag__name'))
+            chunk_links.delete()
+        sketches.record_tags([name for *_, name in removed], delta=-1)
+        counters.apply(counters.link_deltas(((object_id, tag_id) for object_id, tag_id, _ in removed), -1))
+        representation_cache.touch({object_id for object_id, *_ in removed})
+    return len(removed)
@@ -481,6 +481,2637 @@ class ManagementCommandTest(TestCase):
         self.assertTrue(Category.objects.filter(slug='programming').exists())
         self.assertTrue(ContentItem.objects.count() > 0)
 
+class AnalyticsSnapshotTest(TestCase):
+    """Тесты колоночного снимка аналитики"""
+    
+    def setUp(self):
+        import tempfile
+        
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = f'{self.tmpdir}/snapshot'
+        self.user = User.objects.create_user('snapuser', password='snappass123')
+        self.category = Category.objects.create(name='Снимок', slug='snapshot')
+        
+        self.article = ContentItem.objects.create(
+            user=self.user, title='Статья', content_type='article',
+            category=self.category, status='completed'
+        )
+        self.article.tags.add('a', 'b')
+        ContentItem.objects.create(user=self.user, title='Видео', content_type='video')
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+    
+    def test_export_and_load_snapshot(self):
+        """Тест выгрузки и чтения снимка через memory-map"""
+        from .analytics_snapshot import export_snapshot, load_snapshot
+        
+        self.assertEqual(export_snapshot(path=self.path, chunk_size=1), 2)
+        columns, meta = load_snapshot(self.path)
+        
+        self.assertEqual(meta['rows'], 2)
+        self.assertEqual(list(columns['id']), sorted(ContentItem.objects.values_list('id', flat=True)))
+        self.assertEqual(columns['category'][0], 0)
+        self.assertEqual(columns['category'][1], -1)
+        self.assertEqual(list(columns['tag_count']), [2, 0])
+        self.assertFalse(str(columns['completed_at'][0]) == 'NaT')
+        self.assertTrue(str(columns['completed_at'][1]) == 'NaT')
+    
+    def test_analyzer_snapshot_matches_database(self):
+        """Тест что анализ по снимку совпадает с анализом по БД"""
+        from .analytics_snapshot import export_snapshot
+        from .services import ContentAnalyzer
+        
+        export_snapshot(path=self.path)
+        
+        db_analyzer = ContentAnalyzer()
+        db_analyzer.load_data(ContentItem.objects.all())
+        snapshot_analyzer = ContentAnalyzer()
+        snapshot_analyzer.load_snapshot(self.path)
+        
+        self.assertEqual(
+            snapshot_analyzer.get_content_type_distribution(),
+            db_analyzer.get_content_type_distribution()
+        )
+        self.assertEqual(
+            snapshot_analyzer.get_monthly_stats(),
+            db_analyzer.get_monthly_stats()
+        )
+    
+    def test_analytics_api_snapshot_source(self):
+        """Тест API аналитики в режиме снимка"""
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        from io import StringIO
+        
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        
+        with override_settings(ANALYTICS_SNAPSHOT_DIR=self.path):
+            response = client.get('/api/analytics/?source=snapshot')
+            self.assertEqual(response.status_code, 404)
+            
+            call_command('export_analytics_snapshot', stdout=StringIO())
+            # Элемент после снимка не попадает в итоги снимка
+            other = User.objects.create_user('latecomer', password='latecomer123')
+            ContentItem.objects.create(user=other, title='После снимка')
+            response = client.get('/api/analytics/?source=snapshot')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['source'], 'snapshot')
+        self.assertEqual(response.data['content_type_distribution'], {'article': 1, 'video': 1})
+        self.assertEqual((response.data['total_items'], response.data['unique_users']), (2, 1))
+        
+        response = client.get('/api/analytics/')
+        self.assertEqual((response.data['total_items'], response.data['unique_users']), (3, 2))
+
+class CohortAnalyticsTest(TestCase):
+    """Тесты когортной аналитики и времени до завершения"""
+    
+    def setUp(self):
+        from datetime import datetime, timezone as dt_timezone
+        
+        self.user = User.objects.create_user('cohortuser', password='cohortpass123')
+        
+        def create(title, created, completed=None, status='new'):
+            item = ContentItem.objects.create(user=self.user, title=title, status=status)
+            ContentItem.objects.filter(pk=item.pk).update(created_at=created, completed_at=completed)
+        
+        jan = datetime(2024, 1, 10, tzinfo=dt_timezone.utc)
+        feb = datetime(2024, 2, 5, tzinfo=dt_timezone.utc)
+        create('Январь 1', jan, datetime(2024, 1, 12, tzinfo=dt_timezone.utc), 'completed')
+        create('Январь 2', jan, datetime(2024, 3, 10, tzinfo=dt_timezone.utc), 'completed')
+        create('Январь 3', jan, status='in_progress')
+        create('Февраль 1', feb)
+    
+    def _analyzer(self):
+        from .services import ContentAnalyzer
+        
+        analyzer = ContentAnalyzer()
+        analyzer.load_data(ContentItem.objects.all(), chunk_size=2)
+        return analyzer
+    
+    def test_cohort_matrix(self):
+        """Тест когортной матрицы по месяцам"""
+        cohorts = self._analyzer().get_cohort_matrix(max_months=3)
+        
+        self.assertEqual(cohorts['cohorts'], ['2024-01', '2024-02'])
+        self.assertEqual(cohorts['sizes'], {'2024-01': 3, '2024-02': 1})
+        self.assertEqual(cohorts['statuses']['completed'], {'2024-01': 2, '2024-02': 0})
+        # Через 0 месяцев завершена 1/3 январской когорты, через 2 месяца - 2/3
+        self.assertAlmostEqual(cohorts['completion']['2024-01'][0], 0.3333, places=4)
+        self.assertAlmostEqual(cohorts['completion']['2024-01'][2], 0.6667, places=4)
+        self.assertEqual(cohorts['completion']['2024-02'], [0.0, 0.0, 0.0, 0.0])
+    
+    def test_time_to_complete_distribution(self):
+        """Тест распределения времени до завершения"""
+        distribution = self._analyzer().get_time_to_complete_distribution()
+        
+        self.assertEqual(distribution['count'], 2)
+        self.assertEqual(distribution['median_days'], 31.0)
+        counts = {b['range_days']: b['count'] for b in distribution['histogram']}
+        self.assertEqual(counts['1-3'], 1)
+        self.assertEqual(counts['30-90'], 1)
+    
+    def test_analytics_api_exposes_cohorts(self):
+        """Тест что API аналитики отдает когорты"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        
+        response = client.get('/api/analytics/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('cohorts', response.data)
+        self.assertEqual(response.data['time_to_complete']['count'], 2)
+
+class AnalyticsDatabaseTest(TestCase):
+    """Тесты снимка базы для аналитики и роутера"""
+    
+    def test_router_sends_analytics_reads_to_snapshot(self):
+        """Тест что роутер направляет чтения в снимок только внутри analytics_reads"""
+        from unittest import mock
+        from .analytics_db import analytics_reads
+        from .db_routers import AnalyticsRouter
+        
+        router = AnalyticsRouter()
+        with mock.patch('content.db_routers.has_snapshot', return_value=True):
+            self.assertIsNone(router.db_for_read(ContentItem))
+            with analytics_reads():
+                self.assertEqual(router.db_for_read(ContentItem), 'analytics')
+                self.assertIsNone(router.db_for_write(ContentItem))
+            self.assertIsNone(router.db_for_read(ContentItem))
+        
+        self.assertFalse(router.allow_migrate('analytics', 'content'))
+        self.assertIsNone(router.allow_migrate('default', 'content'))
+    
+    def test_mirror_disables_snapshot(self):
+        """Тест что при зеркалировании (тесты) снимок не используется"""
+        from .analytics_db import analytics_reads, is_snapshot_enabled
+        
+        self.assertFalse(is_snapshot_enabled())
+        with analytics_reads() as alias:
+            self.assertEqual(alias, 'default')
+    
+    def test_refresh_snapshot_with_backup_api(self):
+        """Тест обновления снимка через sqlite3 backup"""
+        import os
+        import shutil
+        import sqlite3
+        import tempfile
+        from unittest import mock
+        from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        from . import analytics_db
+        
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        source = os.path.join(tmpdir, 'source.sqlite3')
+        target = os.path.join(tmpdir, 'analytics.sqlite3')
+        
+        conn = sqlite3.connect(source)
+        conn.execute('CREATE TABLE t (x INTEGER)')
+        conn.execute('INSERT INTO t VALUES (42)')
+        conn.commit()
+        conn.close()
+        
+        databases = {
+            'default': dict(settings.DATABASES['default'], NAME=source),
+            'analytics': dict(settings.DATABASES['analytics'], NAME=target),
+        }
+        with override_settings(DATABASES=databases), \
+                mock.patch.object(analytics_db, 'connections'):
+            self.assertTrue(analytics_db.is_snapshot_enabled())
+            self.assertIsNone(analytics_db.snapshot_age())
+            # Запрос не копирует базу сам - пока снимка нет, читает рабочую
+            with analytics_db.analytics_reads() as alias:
+                self.assertEqual(alias, 'default')
+            self.assertIsNone(analytics_db.snapshot_age())
+            
+            self.assertTrue(analytics_db.ensure_fresh_snapshot())
+            self.assertFalse(analytics_db.ensure_fresh_snapshot())
+            self.assertEqual(analytics_db.get_analytics_alias(), 'analytics')
+        
+        conn = sqlite3.connect(target)
+        self.assertEqual(conn.execute('SELECT x FROM t').fetchall(), [(42,)])
+        conn.close()
+        # Временные файлы копии не остаются
+        self.assertFalse([name for name in os.listdir(tmpdir) if name.endswith('.tmp')])
+
+class SketchTest(TestCase):
+    """Тесты вероятностных скетчей аналитики"""
+    
+    def test_hyperloglog_accuracy(self):
+        """Тест точности HyperLogLog"""
+        from .sketches import HyperLogLog
+        
+        hll = HyperLogLog()
+        for i in range(20000):
+            hll.add(i)
+            hll.add(i)  # повторы не влияют на оценку
+        
+        restored = HyperLogLog.from_bytes(hll.to_bytes())
+        self.assertAlmostEqual(restored.estimate(), 20000, delta=20000 * 0.05)
+        
+        small = HyperLogLog()
+        for i in range(10):
+            small.add(i)
+        self.assertEqual(small.estimate(), 10)
+    
+    def test_count_min_sketch_top_k(self):
+        """Тест оценки частот и top-k в Count-Min Sketch"""
+        from .sketches import CountMinSketch
+        
+        cms = CountMinSketch(top_k=5)
+        for i in range(50):
+            cms.add(f'rare{i}')
+        cms.add('python', 100)
+        cms.add('django', 40)
+        cms.add('django', -10)
+        
+        restored = CountMinSketch.from_bytes(cms.to_bytes(), cms.heavy_hitters)
+        self.assertGreaterEqual(restored.estimate('python'), 100)
+        self.assertGreaterEqual(restored.estimate('django'), 30)
+        self.assertEqual([name for _, name in restored.top(2)], ['python', 'django'])
+    
+    def test_sketches_updated_on_write(self):
+        """Тест обновления скетчей при записи контента и тегов"""
+        from .sketches import estimate_unique_users, top_tags, users_month_key
+        
+        users = [User.objects.create_user(f'sketch{i}', password='pass12345') for i in range(3)]
+        category = Category.objects.create(name='Скетчи', slug='sketches')
+        for user in users:
+            item = ContentItem.objects.create(user=user, title='Элемент', category=category)
+            item.tags.add('Python', 'web')
+        item.tags.remove('web')
+        
+        self.assertEqual(estimate_unique_users(), 3)
+        self.assertEqual(estimate_unique_users(f'users:category:{category.id}'), 3)
+        self.assertEqual(estimate_unique_users(users_month_key(item.created_at)), 3)
+        self.assertEqual(top_tags(2), [('python', 3), ('web', 2)])
+    
+    def test_writes_are_buffered_and_merged(self):
+        """Тест что запись не переписывает блоб, а слияние дает те же оценки"""
+        from io import StringIO
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        from .models import AnalyticsSketch, SketchDelta
+        from .sketches import estimate_unique_users_by_prefix, top_tags
+        
+        category = Category.objects.create(name='Буфер', slug='buffer')
+        for index in range(3):
+            user = User.objects.create_user(f'buffered{index}', password='pass12345')
+            ContentItem.objects.create(user=user, title='Элемент', category=category).tags.add('Python')
+        
+        self.assertFalse(AnalyticsSketch.objects.exists())
+        self.assertTrue(SketchDelta.objects.exists())
+        before = (estimate_unique_users_by_prefix('users:category:'), top_tags(1))
+        self.assertEqual(before, ({str(category.id): 3}, [('python', 3)]))
+        
+        call_command('merge_sketches', chunk_size=4, stdout=StringIO())
+        self.assertFalse(SketchDelta.objects.exists())
+        self.assertEqual(AnalyticsSketch.objects.count(), 4)
+        self.assertEqual((estimate_unique_users_by_prefix('users:category:'), top_tags(1)), before)
+    
+    def test_sketches_follow_category_changes(self):
+        """Тест записи в скетчи: только новый элемент и смена категории, в том числе массовая"""
+        from .bulk_actions import update_items
+        from .models import SketchDelta
+        from .sketches import estimate_unique_users_by_prefix
+        
+        first = Category.objects.create(name='Первая', slug='first')
+        second = Category.objects.create(name='Вторая', slug='second')
+        user = User.objects.create_user('mover', password='pass12345')
+        item = ContentItem.objects.create(user=user, title='Элемент', category=first)
+        other = ContentItem.objects.create(user=user, title='Другой')
+        
+        recorded = SketchDelta.objects.count()
+        item = ContentItem.objects.get(pk=item.pk)
+        item.status = 'completed'
+        item.save()
+        self.assertEqual(SketchDelta.objects.count(), recorded)
+        
+        item.category = second
+        item.save()
+        update_items(ContentItem.objects.filter(pk=other.pk), category_id=first.id)
+        self.assertEqual(
+            estimate_unique_users_by_prefix('users:category:'), {str(first.id): 1, str(second.id): 1}
+        )
+        self.assertEqual(SketchDelta.objects.filter(key=f'users:category:{first.id}').count(), 2)
+    
+    def test_analytics_api_approximate_mode(self):
+        """Тест приближенного режима API аналитики и облака тегов"""
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        from io import StringIO
+        
+        user = User.objects.create_user('approx', password='approx12345')
+        ContentItem.objects.create(user=user, title='Приближение').tags.add('django')
+        call_command('rebuild_sketches', stdout=StringIO())
+        
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.get('/api/analytics/?approximate=true')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['approximate'])
+        self.assertEqual(response.data['unique_users'], 1)
+        self.assertEqual(response.data['top_tags'], [{'name': 'django', 'count': 1}])
+        
+        response = client.get('/api/visualizations/?type=tag_cloud&approximate=true')
+        self.assertEqual(response.data['data'][0]['text'], 'django')
+
+SAMPLE_HTML = b'''<html><head><title>Django tips</title>
+<meta name="description" content="Useful Django tips">
+<meta name="keywords" content="django, python, web">
+</head><body><p>First paragraph</p></body></html>'''
+
+def _html_response(html=SAMPLE_HTML, status_code=200, headers=None):
+    """Ответ requests с телом-потоком вместо сетевого соединения"""
+    import io
+    import requests # pyright: ignore[reportMissingModuleSource]
+    
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(html)
+    response.headers.update(headers or {'Content-Type': 'text/html; charset=utf-8'})
+    return response
+
+def _serve_html(url, **kwargs):
+    return _html_response()
+
+def _serve_distinct_html(url, **kwargs):
+    """Разные страницы для разных URL (иначе они - почти-дубликаты)"""
+    slug = url.rstrip('/').rsplit('/', 1)[-1]
+    html = SAMPLE_HTML.replace(b'Django tips</title>', f'Django tips: {slug}</title>'.encode())
+    return _html_response(html.replace(b'Useful Django tips', f'Useful Django tips about {slug}'.encode()))
+
+class ParseJobTest(APITestCase):
+    """Тесты асинхронного парсинга URL"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('parser', password='parserpass123')
+        self.category = Category.objects.create(name='Программирование', slug='programming')
+        self.client.force_authenticate(user=self.user)
+    
+    def test_sync_parse(self):
+        """Тест синхронного парсинга (прежнее поведение)"""
+        from unittest import mock
+        
+        with mock.patch('content.http_client.get', side_effect=_serve_html):
+            response = self.client.post('/api/parse/', {'url': 'https://example.com/python-tips'}, format='json')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['title'], 'Django tips')
+        self.assertEqual(response.data['category']['slug'], 'programming')
+        self.assertEqual(sorted(response.data['tags']), ['django', 'python', 'web'])
+    
+    def test_async_parse_returns_job(self):
+        """Тест асинхронного режима: 202 + опрос статуса задачи"""
+        from unittest import mock
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        
+        with override_settings(BACKGROUND_JOBS_EAGER=True), \
+                mock.patch('content.http_client.get', side_effect=_serve_html):
+            response = self.client.post('/api/parse/', {'url': 'https://example.com/a', 'async': True}, format='json')
+        
+        self.assertEqual(response.status_code, 202)
+        self.assertIn('job_id', response.data)
+        
+        response = self.client.get(f"/api/parse/{response.data['job_id']}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(response.data['content_item']['title'], 'Django tips')
+        self.assertIsNone(response.data['content_item']['category'])
+    
+    def test_async_parse_failure_and_ownership(self):
+        """Тест ошибки загрузки и недоступности чужих задач"""
+        import requests # pyright: ignore[reportMissingModuleSource]
+        from unittest import mock
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        
+        with override_settings(BACKGROUND_JOBS_EAGER=True), \
+                mock.patch('content.http_client.get', side_effect=requests.ConnectionError('boom')):
+            response = self.client.post('/api/parse/?async=true', {'url': 'https://example.com/down'}, format='json')
+        job_id = response.data['job_id']
+        
+        response = self.client.get(f'/api/parse/{job_id}/')
+        self.assertEqual(response.data['status'], 'failed')
+        self.assertIn('boom', response.data['error'])
+        
+        other = User.objects.create_user('other', password='otherpass123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(f'/api/parse/{job_id}/').status_code, 404)
+    
+    def test_recover_jobs_after_restart(self):
+        """Тест восстановления задач: зависшие - ошибка, из очереди - выполняются один раз"""
+        from datetime import timedelta
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        from .models import ParseJob
+        from .parsing import run_parse_job
+        
+        hour_ago = timezone.now() - timedelta(hours=1)
+        stale = ParseJob.objects.create(user=self.user, url='https://example.com/stale', status='running')
+        # Долго ждала в очереди, но запущена только что - не зависла
+        waited = ParseJob.objects.create(user=self.user, url='https://example.com/waited', status='running')
+        ParseJob.objects.filter(pk=stale.pk).update(created_at=hour_ago, started_at=hour_ago)
+        ParseJob.objects.filter(pk=waited.pk).update(created_at=hour_ago, started_at=timezone.now())
+        queued = ParseJob.objects.create(user=self.user, url='https://example.com/queued')
+        ParseJob.objects.filter(pk=queued.pk).update(created_at=hour_ago)
+        # Может ждать в очереди живого процесса
+        recent = ParseJob.objects.create(user=self.user, url='https://example.com/recent')
+        
+        with mock.patch('content.http_client.get', side_effect=_serve_html):
+            call_command('recover_jobs', stdout=StringIO())
+            # Повторный запуск уже выполненной задачи ничего не делает
+            self.assertEqual(run_parse_job(queued.pk).status, 'done')
+        
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'failed')
+        self.assertIsNotNone(stale.finished_at)
+        self.assertEqual(ParseJob.objects.get(pk=waited.pk).status, 'running')
+        self.assertEqual(ParseJob.objects.get(pk=queued.pk).status, 'done')
+        self.assertIsNotNone(ParseJob.objects.get(pk=queued.pk).started_at)
+        self.assertEqual(ParseJob.objects.get(pk=recent.pk).status, 'pending')
+        self.assertEqual(ContentItem.objects.filter(user=self.user).count(), 1)
+        
+        with mock.patch('content.http_client.get', side_effect=_serve_html):
+            call_command('recover_jobs', all=True, stdout=StringIO())
+        self.assertEqual(ParseJob.objects.get(pk=recent.pk).status, 'done')
+    
+    def test_async_parse_invalid_url(self):
+        """Тест валидации URL в асинхронном режиме"""
+        response = self.client.post('/api/parse/', {'url': 'not a url', 'async': True}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+class BulkImportTest(APITestCase):
+    """Тесты массового импорта URL"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('importer', password='importpass123')
+        self.client.force_authenticate(user=self.user)
+    
+    def test_run_concurrently_limits_and_deadline(self):
+        """Тест лимита на хост и общего дедлайна"""
+        import threading
+        import time
+        from .fetching import DeadlineExceeded, run_concurrently
+        
+        active = {'a.com': 0, 'b.com': 0}
+        peak = {'a.com': 0, 'b.com': 0}
+        lock = threading.Lock()
+        
+        def fetch(url):
+            host = url.split('/')[2]
+            with lock:
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+            time.sleep(0.5 if 'slow' in url else 0.02)
+            with lock:
+                active[host] -= 1
+            return url
+        
+        urls = [f'https://a.com/{i}' for i in range(8)] + [f'https://b.com/{i}' for i in range(4)]
+        urls.append('https://b.com/slow')
+        results = run_concurrently(urls, fetch, max_workers=16, per_host=2, deadline=0.3)
+        
+        self.assertEqual(peak['a.com'], 2)
+        self.assertLessEqual(peak['b.com'], 2)
+        self.assertEqual(results['https://a.com/0'], ('https://a.com/0', None))
+        self.assertIsInstance(results['https://b.com/slow'][1], DeadlineExceeded)
+    
+    def test_batch_endpoint_report(self):
+        """Тест отчета массового импорта"""
+        import requests # pyright: ignore[reportMissingModuleSource]
+        from unittest import mock
+        
+        ContentItem.objects.create(user=self.user, title='Уже есть', url='https://example.com/saved')
+        
+        def fake_fetch(url, **kwargs):
+            if 'broken' in url:
+                return _html_response(b'Not found', status_code=404)
+            return _serve_distinct_html(url)
+        
+        urls = [
+            'https://example.com/one', 'https://example.com/one', 'https://other.com/two',
+            'not-a-url', 'https://example.com/broken', 'https://example.com/saved',
+        ]
+        with mock.patch('content.http_client.get', side_effect=fake_fetch):
+            response = self.client.post('/api/parse/batch/', {'urls': urls}, format='json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        statuses = {entry['url']: entry['status'] for entry in response.data['results']}
+        self.assertEqual(statuses, {
+            'https://example.com/one': 'created',
+            'https://other.com/two': 'created',
+            'not-a-url': 'invalid',
+            'https://example.com/broken': 'failed',
+            'https://example.com/saved': 'duplicate',
+        })
+        item = ContentItem.objects.get(url='https://other.com/two')
+        self.assertEqual(item.title, 'Django tips: two')
+        self.assertEqual(sorted(item.tags.names()), ['django', 'python', 'web'])
+    
+    def test_large_batch_runs_in_background(self):
+        """Тест фонового импорта длинного списка URL со статусом задачи"""
+        from unittest import mock
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        
+        urls = [f'https://example.com/batch/{index}' for index in range(5)] + ['not-a-url']
+        with override_settings(BULK_IMPORT_SYNC_URLS=3, BACKGROUND_JOBS_EAGER=True), \
+                mock.patch('content.http_client.get', side_effect=_serve_distinct_html):
+            response = self.client.post('/api/parse/batch/', {'urls': urls}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['total'], 6)
+        
+        response = self.client.get(response.data['status_url'])
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertEqual(ContentItem.objects.filter(user=self.user).count(), 5)
+        
+        other = User.objects.create_user('stranger', password='strangerpass123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(f"/api/parse/batch/{response.data['id']}/").status_code, 404)
+    
+    def test_import_urls_command(self):
+        """Тест команды импорта списка URL"""
+        import os
+        import tempfile
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('# список чтения\nhttps://example.com/alpha\nhttps://example.com/beta\n')
+        self.addCleanup(os.remove, f.name)
+        
+        out = StringIO()
+        with mock.patch('content.http_client.get', side_effect=_serve_distinct_html):
+            call_command('import_urls', f.name, user='importer', stdout=out)
+        
+        self.assertIn('created: 2', out.getvalue())
+        self.assertEqual(ContentItem.objects.filter(user=self.user).count(), 2)
+
+class HttpClientTest(TestCase):
+    """Тесты общего HTTP-клиента"""
+    
+    def setUp(self):
+        from unittest import mock
+        from . import http_client
+        
+        self.http_client = http_client
+        http_client.reset()
+        self.addCleanup(http_client.reset)
+        self.session_request = mock.patch.object(http_client.get_session(), 'request').start()
+        mock.patch('content.http_client.time.sleep').start()
+        self.addCleanup(mock.patch.stopall)
+    
+    def _response(self, status_code):
+        from unittest import mock
+        return mock.Mock(status_code=status_code)
+    
+    def test_session_is_shared(self):
+        """Тест что сессия (пул соединений) одна на процесс"""
+        self.assertIs(self.http_client.get_session(), self.http_client.get_session())
+    
+    def test_session_keeps_no_cookies(self):
+        """Тест что общая сессия не сохраняет cookie одного запроса для других"""
+        import requests
+        from requests.cookies import MockRequest, create_cookie
+        
+        jar = self.http_client.get_session().cookies
+        request = MockRequest(requests.Request('GET', 'https://example.com/').prepare())
+        jar.set_cookie_if_ok(create_cookie('sessionid', 'secret', domain='example.com'), request)
+        self.assertEqual(len(jar), 0)
+    
+    def test_host_tables_are_bounded(self):
+        """Тест вытеснения давно не запрошенных хостов из breaker'ов и метрик"""
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        
+        self.session_request.return_value = self._response(200)
+        with override_settings(HTTP_CLIENT={'MAX_HOSTS': 2}):
+            for host in ('a.com', 'b.com', 'a.com', 'c.com'):
+                self.http_client.get(f'https://{host}/')
+        self.assertEqual(list(self.http_client.get_metrics()), ['a.com', 'c.com'])
+        self.assertEqual(list(self.http_client._breakers), ['a.com', 'c.com'])
+    
+    def test_retries_with_backoff(self):
+        """Тест повторов на 503 и сетевых ошибках"""
+        import requests # pyright: ignore[reportMissingModuleSource]
+        
+        self.session_request.side_effect = [
+            requests.ConnectionError('reset'), self._response(503), self._response(200)
+        ]
+        response = self.http_client.get('https://api.example.com/x')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.session_request.call_count, 3)
+        metrics = self.http_client.get_metrics()['api.example.com']
+        self.assertEqual(metrics['requests'], 3)
+        self.assertEqual(metrics['errors'], 2)
+        self.assertEqual(metrics['retries'], 2)
+    
+    def test_no_retry_for_post(self):
+        """Тест что неидемпотентные запросы не повторяются"""
+        self.session_request.return_value = self._response(503)
+        response = self.http_client.request('POST', 'https://api.example.com/x')
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.session_request.call_count, 1)
+    
+    def test_circuit_breaker_opens(self):
+        """Тест размыкания circuit breaker у падающего upstream"""
+        import requests # pyright: ignore[reportMissingModuleSource]
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        
+        self.session_request.side_effect = requests.ConnectionError('down')
+        with override_settings(HTTP_CLIENT={'RETRIES': 0, 'BREAKER_THRESHOLD': 2, 'BREAKER_COOLDOWN': 60}):
+            for _ in range(2):
+                with self.assertRaises(requests.ConnectionError):
+                    self.http_client.get('https://down.example.com/')
+            with self.assertRaises(self.http_client.CircuitOpenError):
+                self.http_client.get('https://down.example.com/')
+            
+            # Другие хосты не затронуты
+            self.session_request.side_effect = None
+            self.session_request.return_value = self._response(200)
+            self.assertEqual(self.http_client.get('https://up.example.com/').status_code, 200)
+        
+        self.assertEqual(self.session_request.call_count, 3)
+        metrics = self.http_client.get_metrics()['down.example.com']
+        self.assertEqual(metrics['circuit'], 'open')
+        self.assertEqual(metrics['rejected'], 1)
+    
+    def test_half_open_trial_is_always_cleared(self):
+        """Тест что любая ошибка пробного запроса освобождает half-open breaker"""
+        import requests # pyright: ignore[reportMissingModuleSource]
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        
+        with override_settings(HTTP_CLIENT={'RETRIES': 0, 'BREAKER_THRESHOLD': 1, 'BREAKER_COOLDOWN': 0}):
+            for error in [requests.TooManyRedirects('loop'), ValueError('bad header')]:
+                self.session_request.side_effect = error
+                with self.assertRaises(type(error)):
+                    self.http_client.get('https://flaky.example.com/')
+                self.assertFalse(self.http_client.get_breaker('flaky.example.com').trial_in_flight)
+            
+            self.session_request.side_effect = None
+            self.session_request.return_value = self._response(200)
+            self.assertEqual(self.http_client.get('https://flaky.example.com/').status_code, 200)
+        
+        self.assertEqual(self.http_client.get_metrics()['flaky.example.com']['circuit'], 'closed')
+    
+    def test_upstream_metrics_endpoint(self):
+        """Тест API метрик upstream (только для администраторов)"""
+        self.session_request.return_value = self._response(200)
+        self.http_client.get('https://api.example.com/x')
+        
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user('regular', password='regular12345'))
+        self.assertEqual(client.get('/api/upstreams/').status_code, 403)
+        
+        client.force_authenticate(user=User.objects.create_superuser('admin', password='admin12345'))
+        response = client.get('/api/upstreams/')
+        self.assertEqual(response.data['api.example.com']['requests'], 1)
+
+class StartupBenchmarkTest(TestCase):
+    """Регрессионный тест времени старта воркера"""
+    
+    def test_heavy_modules_not_loaded_on_startup(self):
+        """Тест что pandas/plotly/numpy/bs4 не импортируются при старте"""
+        from .management.commands.benchmark_startup import measure_startup
+        
+        result = measure_startup()
+        
+        self.assertEqual(result['heavy_loaded'], [])
+        self.assertGreater(result['import_ms'], 0)
+        self.assertGreater(result['rss_mb'], 0)
+    
+    def test_benchmark_command(self):
+        """Тест команды бенчмарка старта"""
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        from io import StringIO
+        
+        out = StringIO()
+        call_command('benchmark_startup', runs=1, max_import_ms=10000, max_rss_mb=1000, stdout=out)
+        
+        output = out.getvalue()
+        self.assertIn('Время импорта', output)
+        self.assertIn('Старт укладывается в пороги', output)
+
+class UrlMetadataCacheTest(APITestCase):
+    """Тесты кэша метаданных URL"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('cacher', password='cacherpass123')
+        self.client.force_authenticate(user=self.user)
+    
+    def test_normalize_url(self):
+        """Тест нормализации URL"""
+        from .urlnorm import normalize_url, url_hash
+        
+        url = 'HTTPS://www.Example.com:443/Path/?utm_source=x&fbclid=1&b=2&a=1#frag'
+        self.assertEqual(normalize_url(url), 'https://www.example.com/Path?a=1&b=2')
+        self.assertEqual(url_hash(url), url_hash('https://www.example.com/Path?b=2&a=1'))
+        self.assertNotEqual(url_hash(url), url_hash('https://www.example.com/path?a=1&b=2'))
+        # www. и параметры вроде ref могут менять содержимое - не отбрасываются
+        self.assertNotEqual(url_hash(url), url_hash('https://example.com/Path?a=1&b=2'))
+        self.assertEqual(normalize_url('https://example.com/?ref=home&si=2'), 'https://example.com/?ref=home&si=2')
+    
+    def test_repeated_parse_uses_cache(self):
+        """Тест повторного парсинга без загрузки страницы"""
+        from unittest import mock
+        
+        other = User.objects.create_user('reader', password='readerpass123')
+        with mock.patch('content.http_client.get', side_effect=_serve_html) as fetch:
+            self.client.post('/api/parse/', {'url': 'https://example.com/post'}, format='json')
+            self.client.force_authenticate(user=other)
+            response = self.client.post('/api/parse/', {'url': 'https://example.com/post?utm_source=feed'}, format='json')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['title'], 'Django tips')
+        self.assertEqual(fetch.call_count, 1)
+    
+    def test_stale_entry_revalidated(self):
+        """Тест условного GET для устаревшей записи и ответа 304"""
+        from datetime import timedelta
+        from unittest import mock
+        from .models import UrlMetadata
+        from . import url_cache
+        
+        url = 'https://example.com/article'
+        first = _html_response(headers={'Content-Type': 'text/html', 'ETag': '"v1"'})
+        with mock.patch('content.http_client.get', return_value=first):
+            url_cache.get_metadata(url)
+        UrlMetadata.objects.update(validated_at=timezone.now() - timedelta(days=2))
+        
+        with mock.patch('content.http_client.get', return_value=_html_response(b'', status_code=304)) as get:
+            metadata = url_cache.get_metadata(url)
+        
+        self.assertEqual(get.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+        self.assertEqual(metadata['keywords'], ['django', 'python', 'web'])
+        self.assertTrue(url_cache.is_fresh(UrlMetadata.objects.get()))
+    
+    def test_bulk_import_skips_fresh_entries(self):
+        """Тест массового импорта из свежего кэша без сетевых запросов"""
+        from unittest import mock
+        from . import url_cache
+        from .parsing import extract_metadata
+        
+        url = 'https://example.com/cached'
+        url_cache.store(url, extract_metadata(SAMPLE_HTML, url))
+        with mock.patch('content.http_client.get') as get:
+            response = self.client.post('/api/parse/batch/', {'urls': [url]}, format='json')
+        
+        self.assertEqual(response.data['created'], 1)
+        get.assert_not_called()
+
+class StreamingMetadataTest(TestCase):
+    """Тесты потокового извлечения метаданных"""
+    
+    def test_matches_full_parse(self):
+        """Тест совпадения с полным разбором BeautifulSoup"""
+        from .parsing import extract_metadata, stream_metadata
+        
+        url = 'https://example.com/python'
+        self.assertEqual(stream_metadata(_html_response(), url), extract_metadata(SAMPLE_HTML, url))
+    
+    def test_stops_after_head(self):
+        """Тест чтения только начала большой страницы"""
+        from .parsing import stream_metadata
+        
+        html = SAMPLE_HTML.replace(b'</body>', b'<p>' + b'x' * 5 * 1024 * 1024 + b'</p></body>')
+        response = _html_response(html)
+        metadata = stream_metadata(response, 'https://example.com/big')
+        
+        self.assertEqual(metadata['title'], 'Django tips')
+        self.assertEqual(metadata['description'], 'Useful Django tips')
+        self.assertLess(response.raw.tell(), 64 * 1024)
+    
+    def test_first_paragraph_and_charset(self):
+        """Тест описания из первого абзаца и кодировки из заголовка"""
+        from .parsing import stream_metadata
+        
+        html = '<html><head><title>Заметки</title></head><body><p>Первый <b>абзац</b></p><p>Второй</p>'
+        response = _html_response(html.encode('cp1251'), headers={'Content-Type': 'text/html; charset=windows-1251'})
+        metadata = stream_metadata(response, 'https://example.com/notes')
+        
+        self.assertEqual(metadata['title'], 'Заметки')
+        self.assertEqual(metadata['description'], 'Первый абзац')
+        self.assertEqual(metadata['keywords'], [])
+    
+    def test_undeclared_charset_is_guessed(self):
+        """Тест кодировки без charset в заголовке и разметке - по первому чанку"""
+        from .parsing import stream_metadata
+        
+        html = (
+            '<html><head><title>Заметки о кодировках страниц</title></head><body><p>Первый абзац текста</p>'
+            + '<p>Второй абзац: страница без объявленной кодировки, текст на русском языке.</p>' * 3
+        )
+        response = _html_response(html.encode('cp1251'), headers={'Content-Type': 'text/html'})
+        self.assertEqual(stream_metadata(response, 'https://example.com/notes')['title'], 'Заметки о кодировках страниц')
+    
+    def test_short_tail_is_drained_for_pool(self):
+        """Тест: короткий остаток тела дочитывается (соединение в пул), длинный - нет"""
+        from unittest import mock
+        from .parsing import fetch_metadata_conditional
+        
+        for tail, drained in ((1024, True), (5 * 1024 * 1024, False)):
+            html = SAMPLE_HTML.replace(b'</body>', b'<p>' + b'x' * tail + b'</p></body>')
+            response = _html_response(html)
+            with mock.patch('content.http_client.get', return_value=response):
+                result = fetch_metadata_conditional('https://example.com/tail', with_text=False)
+            self.assertEqual(result.metadata['title'], 'Django tips')
+            # Прочитанный до конца ответ не закрывается, а отдается в пул
+            self.assertEqual(response.raw.closed, not drained)
+            if drained:
+                self.assertEqual(response.raw.tell(), len(html))
+    
+    def test_byte_cap_and_fallback(self):
+        """Тест лимита байт и полного разбора, когда потоковый ничего не нашел"""
+        from unittest import mock
+        from .parsing import extract_metadata, stream_metadata
+        
+        html = b'<html><body>' + b'<div>text</div>' * 10000 + b'</body></html>'
+        response = _html_response(html)
+        with mock.patch('content.parsing.extract_metadata', wraps=extract_metadata) as full_parse:
+            metadata = stream_metadata(response, 'https://example.com/', max_bytes=16 * 1024)
+        
+        self.assertEqual(metadata['title'], '')
+        self.assertLessEqual(len(full_parse.call_args.args[0]), 16 * 1024)
+
+class ExternalSearchTest(APITestCase):
+    """Тесты параллельного внешнего поиска"""
+    
+    def setUp(self):
+        from django.core.cache import cache # pyright: ignore[reportMissingModuleSource]
+        
+        cache.clear()
+        self.user = User.objects.create_user('searcher', password='searchpass123')
+        self.client.force_authenticate(user=self.user)
+    
+    def _provider(self, name, delay=0, results=None, error=None):
+        import time
+        from .external_search import SearchProvider
+        
+        calls = []
+        
+        class Provider(SearchProvider):
+            def search(self, query):
+                calls.append(query)
+                time.sleep(delay)
+                if error:
+                    raise error
+                return results if results is not None else [{'title': f'{name}: {query}'}]
+        
+        Provider.name = name
+        Provider.result_key = name
+        return Provider(), calls
+    
+    def test_fan_out_is_concurrent(self):
+        """Тест параллельного опроса: время - максимум, а не сумма"""
+        import time
+        from . import external_search
+        
+        providers = [self._provider(f'p{i}', delay=0.3)[0] for i in range(3)]
+        started = time.monotonic()
+        response = external_search.search('django', providers=providers, deadline=2)
+        
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(response['total_results'], 3)
+        self.assertFalse(response['partial'])
+    
+    def test_partial_results_and_cache(self):
+        """Тест частичного ответа при опоздании и кэша повторного запроса"""
+        from . import external_search
+        
+        fast, fast_calls = self._provider('fast')
+        slow, _ = self._provider('slow', delay=1)
+        response = external_search.search('Django  ORM', providers=[fast, slow], deadline=0.2)
+        
+        self.assertTrue(response['partial'])
+        self.assertEqual(response['providers']['slow'], {'status': 'timeout'})
+        self.assertEqual(response['slow'], [])
+        self.assertEqual(response['fast'], [{'title': 'fast: Django ORM'}])
+        
+        response = external_search.search('django orm', providers=[fast], deadline=0.2)
+        self.assertEqual(response['providers']['fast'], {'status': 'cached'})
+        self.assertEqual(len(fast_calls), 1)
+    
+    def test_errors_are_not_cached(self):
+        """Тест ошибки провайдера: статус error, результат не кэшируется"""
+        from . import external_search
+        
+        broken, calls = self._provider('broken', error=external_search.ProviderError('no key'))
+        for _ in range(2):
+            response = external_search.search('python', providers=[broken])
+        
+        self.assertEqual(response['providers']['broken'], {'status': 'error', 'error': 'no key'})
+        self.assertEqual(len(calls), 2)
+    
+    def test_api_searches_local_corpus(self):
+        """Тест ответа API по умолчанию: поиск по загруженному пулу без сети"""
+        from unittest import mock
+        from .models import DiscoveredItem
+        
+        DiscoveredItem.objects.create(
+            provider='news', external_id='a', url_hash='a' * 64, url='https://news.example.com/a',
+            title='Python 3.13 released', query='python'
+        )
+        DiscoveredItem.objects.create(
+            provider='youtube', external_id='v', url_hash='v' * 64, url='https://youtube.com/watch?v=1',
+            title='Python за час', content_type='video', query='python'
+        )
+        with mock.patch('content.http_client.get') as get:
+            response = self.client.get('/api/search/external/?q=python')
+        
+        get.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['articles'][0]['title'], 'Python 3.13 released')
+        self.assertEqual(response.data['videos'][0]['content_type'], 'video')
+        self.assertEqual(response.data['total_results'], 2)
+        self.assertFalse(response.data['partial'])
+        self.assertEqual(self.client.get('/api/search/external/').status_code, 400)
+    
+    def test_corpus_search_ignores_cyrillic_case(self):
+        """Тест поиска по пулу без учета регистра кириллицы и только среди последних материалов"""
+        from datetime import timedelta
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        from .external_search import CorpusArticleProvider
+        from .models import DiscoveredItem
+        
+        for index, title in enumerate(['Старый обзор Django', 'Новый Обзор  Python']):
+            DiscoveredItem.objects.create(
+                provider='news', external_id=str(index), url_hash=str(index) * 64,
+                url=f'https://news.example.com/{index}', title=title, query='обзор',
+                published_at=timezone.now() + timedelta(days=index),
+            )
+        
+        titles = [result['title'] for result in CorpusArticleProvider().search('ОБЗОР')]
+        self.assertEqual(titles, ['Новый Обзор  Python', 'Старый обзор Django'])
+        self.assertEqual(len(CorpusArticleProvider().search('обзор python')), 1)
+        with override_settings(EXTERNAL_SEARCH_CORPUS_SCAN=1):
+            self.assertEqual(len(CorpusArticleProvider().search('django')), 0)
+
+class FeedIngestionTest(APITestCase):
+    """Тесты фоновой загрузки внешних материалов (с локальной заглушкой NewsAPI)"""
+    
+    def setUp(self):
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlsplit
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        from . import http_client
+        
+        http_client.reset()
+        self.addCleanup(http_client.reset)
+        self.pages = []
+        self.failing_pages = set()
+        test = self
+        
+        class NewsAPIHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = parse_qs(urlsplit(self.path).query)
+                page = int(params['page'][0])
+                test.pages.append(page)
+                if page in test.failing_pages:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                # 3 страницы по 2 статьи, последняя неполная; на 2-й - дубликат с utm-меткой
+                articles = {
+                    1: [self.article('one'), self.article('two')],
+                    2: [self.article('one', '?utm_source=feed'), self.article('three')],
+                    3: [self.article('four')],
+                }.get(page, [])
+                body = json.dumps({'status': 'ok', 'articles': articles}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def article(self, slug, suffix=''):
+                return {
+                    'title': f'Django {slug}', 'url': f'https://news.example.com/{slug}{suffix}',
+                    'description': None, 'source': {'name': 'Example'},
+                    'publishedAt': '2024-05-01T10:00:00Z',
+                }
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), NewsAPIHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        
+        overrides = override_settings(
+            NEWS_API_BASE_URL=f'http://127.0.0.1:{server.server_port}/v2', NEWS_API_KEY='test-key'
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+    
+    def _ingest(self, **options):
+        from io import StringIO
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        
+        out = StringIO()
+        call_command('ingest_feeds', query=['django'], provider=['news'], page_size=2, stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+    
+    def test_ingest_dedup_and_schedule(self):
+        """Тест загрузки по страницам, дедупликации и пропуска недавних запросов"""
+        from .models import DiscoveredItem, IngestionCheckpoint
+        
+        self.assertIn('Загружено 4 материалов', self._ingest())
+        self.assertEqual(self.pages, [1, 2, 3])
+        self.assertEqual(DiscoveredItem.objects.count(), 4)
+        item = DiscoveredItem.objects.get(url='https://news.example.com/one')
+        self.assertEqual(sorted(item.tags), ['django', 'example'])
+        self.assertEqual(item.published_at.year, 2024)
+        
+        checkpoint = IngestionCheckpoint.objects.get(provider='news', query='django')
+        self.assertEqual(checkpoint.next_page, 1)
+        self.assertIsNotNone(checkpoint.completed_at)
+        
+        self.assertIn('skipped: 1', self._ingest())
+        self.assertEqual(len(self.pages), 3)
+        self.assertIn('Загружено 0 материалов', self._ingest(force=True))
+        self.assertEqual(DiscoveredItem.objects.count(), 4)
+    
+    def test_resume_from_checkpoint(self):
+        """Тест продолжения прерванного прохода с сохраненной страницы"""
+        from .models import DiscoveredItem, IngestionCheckpoint
+        
+        self.failing_pages = {2}
+        self.assertIn('failed: 1', self._ingest())
+        self.assertEqual(IngestionCheckpoint.objects.get().next_page, 2)
+        self.assertEqual(DiscoveredItem.objects.count(), 2)
+        
+        self.failing_pages = set()
+        self.pages.clear()
+        self._ingest()
+        self.assertEqual(self.pages, [2, 3])
+        self.assertEqual(DiscoveredItem.objects.count(), 4)
+    
+    def test_discover_recommendations(self):
+        """Тест рекомендаций из загруженного пула"""
+        self._ingest()
+        user = User.objects.create_user('discoverer', password='discoverpass123')
+        ContentItem.objects.create(user=user, title='Свое', url='https://news.example.com/two?utm_medium=x').tags.add('django')
+        self.client.force_authenticate(user=user)
+        
+        response = self.client.get('/api/recommendations/discover/')
+        
+        self.assertEqual(response.status_code, 200)
+        urls = [rec['item']['url'] for rec in response.data]
+        self.assertEqual(len(urls), 3)
+        self.assertNotIn('https://news.example.com/two', urls)
+
+class LinkHealthTest(TestCase):
+    """Тесты проверки ссылок (с локальным HTTP-сервером)"""
+    
+    def setUp(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from . import http_client
+        
+        http_client.reset()
+        self.addCleanup(http_client.reset)
+        self.requests = []
+        test = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def respond(self, method):
+                test.requests.append((method, self.path))
+                if self.path == '/redirect':
+                    self.send_response(301)
+                    self.send_header('Location', '/ok')
+                elif self.path == '/gone':
+                    self.send_response(404)
+                elif self.path == '/nohead' and method == 'HEAD':
+                    self.send_response(405)
+                elif self.path == '/nohead':
+                    self.send_response(206 if 'Range' in self.headers else 200)
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            
+            def do_HEAD(self):
+                self.respond('HEAD')
+            
+            def do_GET(self):
+                self.respond('GET')
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base = f'http://127.0.0.1:{server.server_port}'
+        
+        self.user = User.objects.create_user('linker', password='linkerpass123')
+        for path in ['/ok', '/gone', '/redirect', '/nohead', '/ok#dup']:
+            ContentItem.objects.create(user=self.user, title=path, url=self.base + path)
+    
+    def test_crawl_records_status(self):
+        """Тест статусов, редиректов и ranged GET вместо HEAD"""
+        from io import StringIO
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        from .models import LinkHealth
+        from .urlnorm import url_hash
+        
+        out = StringIO()
+        call_command('check_links', min_interval=0, stdout=out)
+        
+        self.assertIn('Проверено 4 ссылок', out.getvalue())
+        health = {row.url: row for row in LinkHealth.objects.all()}
+        self.assertEqual(health[self.base + '/ok'].status_code, 200)
+        self.assertTrue(health[self.base + '/gone'].is_broken)
+        self.assertEqual(health[self.base + '/redirect'].final_url, self.base + '/ok')
+        self.assertEqual(health[self.base + '/nohead'].status_code, 206)
+        self.assertIn(('GET', '/nohead'), self.requests)
+        self.assertEqual(LinkHealth.objects.get(url_hash=url_hash(self.base + '/ok#dup')).url, self.base + '/ok')
+    
+    def test_resume_and_recheck(self):
+        """Тест продолжения с контрольной точки и пропуска недавно проверенных"""
+        from .link_health import crawl
+        from .models import CrawlCheckpoint, LinkHealth
+        
+        stats = crawl(chunk_size=2, max_chunks=1, min_interval=0)
+        self.assertFalse(stats['completed'])
+        self.assertEqual(LinkHealth.objects.count(), 2)
+        self.assertGreater(CrawlCheckpoint.objects.get().last_id, 0)
+        
+        stats = crawl(chunk_size=2, min_interval=0)
+        self.assertTrue(stats['completed'])
+        self.assertEqual(stats['items'], 3)
+        self.assertEqual(CrawlCheckpoint.objects.get().last_id, 0)
+        self.assertEqual(LinkHealth.objects.count(), 4)
+        
+        self.requests.clear()
+        stats = crawl(min_interval=0)
+        self.assertEqual(stats['skipped'], 4)
+        self.assertEqual(self.requests, [])
+    
+    def test_network_errors_are_not_broken(self):
+        """Тест что ошибка сети не затирает прошлый ответ и не делает ссылку битой"""
+        import socket
+        from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+        from .link_health import crawl
+        from .models import LinkHealth
+        from .urlnorm import url_hash
+        
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            closed = f'http://127.0.0.1:{sock.getsockname()[1]}'
+        ContentItem.objects.create(user=self.user, title='down', url=closed + '/down')
+        ContentItem.objects.create(user=self.user, title='new', url=closed + '/new')
+        LinkHealth.objects.create(
+            url_hash=url_hash(closed + '/down'), url=closed + '/down', status_code=200, checked_at=timezone.now(),
+        )
+        
+        stats = crawl(min_interval=0, recheck_after=0, timeout=2)
+        
+        self.assertEqual(stats['errors'], 2)
+        down = LinkHealth.objects.get(url_hash=url_hash(closed + '/down'))
+        self.assertEqual(down.status_code, 200)
+        self.assertIn('ConnectionError', down.error)
+        new = LinkHealth.objects.get(url_hash=url_hash(closed + '/new'))
+        self.assertIsNone(new.checked_at)
+        self.assertFalse(new.is_broken)
+    
+    def test_batches_share_host_queues(self):
+        """Тест что пачки выдаются по порядку, а медленный хост не держит следующие пачки"""
+        import time
+        from .fetching import run_batches
+        
+        finished = []
+        
+        def fetch(url):
+            time.sleep(0.3 if 'slow' in url else 0.01)
+            finished.append(url)
+            return url
+        
+        batches = [
+            ('first', ['https://slow.com/1', 'https://a.com/1']),
+            ('second', [f'https://b.com/{i}' for i in range(4)]),
+            ('third', []),
+        ]
+        results = list(run_batches(batches, fetch, max_workers=4, per_host=2))
+        
+        self.assertEqual([label for label, _ in results], ['first', 'second', 'third'])
+        self.assertEqual(results[1][1]['https://b.com/3'], ('https://b.com/3', None))
+        # Вторая пачка проверена, пока первая ждала медленный хост
+        self.assertEqual(finished[-1], 'https://slow.com/1')
+    
+    def test_host_min_interval(self):
+        """Тест минимального интервала между запросами к одному хосту"""
+        import time
+        from .fetching import run_concurrently
+        
+        starts = []
+        urls = [f'https://a.com/{i}' for i in range(4)]
+        run_concurrently(urls, lambda url: starts.append(time.monotonic()), max_workers=4, per_host=4, min_interval=0.1)
+        
+        starts.sort()
+        gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+        self.assertGreaterEqual(min(gaps), 0.09)
+
+class ResourceTest(TestCase):
+    """Тесты общих ресурсов по нормализованному URL"""
+    
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', password='alicepass123')
+        self.bob = User.objects.create_user('bob', password='bobpass12345')
+    
+    def test_shared_resource_per_url(self):
+        """Тест одного ресурса для ссылки, сохраненной разными пользователями"""
+        from unittest import mock
+        from .models import Resource
+        
+        first = ContentItem.objects.create(user=self.alice, title='Статья', url='https://example.com/post')
+        second = ContentItem.objects.create(user=self.bob, title='Та же', url='https://EXAMPLE.com/post/?utm_source=x')
+        
+        self.assertEqual(Resource.objects.count(), 1)
+        self.assertEqual(first.resource_id, second.resource_id)
+        self.assertEqual(first.resource.title, 'Статья')
+        self.assertEqual(first.resource.bookmarks.count(), 2)
+        
+        second.url = 'https://example.com/other'
+        second.save()
+        self.assertNotEqual(ContentItem.objects.get(pk=second.pk).resource_id, first.resource_id)
+        
+        # Ссылка не менялась - ресурс не ищется заново
+        item = ContentItem.objects.get(pk=first.pk)
+        with mock.patch.object(Resource, 'for_url') as for_url:
+            item.status = 'completed'
+            item.save()
+        for_url.assert_not_called()
+    
+    def test_description_is_stored_once(self):
+        """Тест что описание страницы хранится в ресурсе, а закладка - только свое"""
+        from .resources import describe, strip_descriptions
+        
+        describe('https://example.com/post', title='Статья', description='Описание страницы')
+        client = APIClient()
+        client.force_authenticate(user=self.alice)
+        response = client.post('/api/contents/', {
+            'title': 'Статья', 'url': 'https://example.com/post', 'tags': [],
+        }, format='json')
+        self.assertEqual(response.data['description'], 'Описание страницы')
+        
+        own = ContentItem.objects.create(
+            user=self.bob, title='Своя', url='https://example.com/post#notes', description='Мои заметки'
+        )
+        stored = dict(ContentItem.objects.values_list('pk', 'description'))
+        self.assertIsNone(stored[response.data['id']])
+        self.assertEqual(stored[own.pk], 'Мои заметки')
+        
+        client.force_authenticate(user=self.bob)
+        rows = {row['id']: row for row in client.get('/api/contents/').data['results']}
+        self.assertEqual(rows[own.pk]['description'], 'Мои заметки')
+        self.assertEqual(client.get('/api/contents/', {'search': 'страницы'}).data['count'], 2)
+        self.assertEqual(client.get('/api/contents/', {'search': 'заметки'}).data['count'], 1)
+        
+        # Старые строки с копией описания снова наследуют его
+        ContentItem.objects.filter(pk=own.pk).update(description='Описание страницы')
+        self.assertEqual(strip_descriptions(chunk_size=1), 1)
+        self.assertIsNone(ContentItem.objects.get(pk=own.pk).description)
+        self.assertEqual(ContentItem.objects.get(pk=own.pk).full_description, 'Описание страницы')
+    
+    def test_user_description_stays_private(self):
+        """Тест что заметка пользователя не становится описанием ресурса для других"""
+        from .models import Resource
+        
+        client = APIClient()
+        client.force_authenticate(user=self.alice)
+        first = client.post('/api/contents/', {
+            'title': 'Статья', 'url': 'https://example.com/post', 'description': 'Личная заметка', 'tags': [],
+        }, format='json')
+        self.assertEqual(Resource.objects.get().description, '')
+        
+        client.force_authenticate(user=self.bob)
+        second = client.post('/api/contents/', {
+            'title': 'Та же', 'url': 'https://example.com/post', 'tags': [],
+        }, format='json')
+        self.assertEqual(second.data['description'], '')
+        
+        # Явно пустое описание не подменяется общим, null - снова наследовать
+        Resource.objects.update(description='Описание страницы')
+        response = client.patch(f"/api/contents/{second.data['id']}/", {'description': ''}, format='json')
+        self.assertEqual(response.data['description'], '')
+        response = client.patch(f"/api/contents/{second.data['id']}/", {'description': None}, format='json')
+        self.assertEqual(response.data['description'], 'Описание страницы')
+        
+        # Повторное сохранение того же текста его не стирает
+        item = ContentItem.objects.get(pk=first.data['id'])
+        item.description = 'Личная заметка'
+        item.save()
+        self.assertEqual(ContentItem.objects.get(pk=item.pk).full_description, 'Личная заметка')
+    
+    def test_backfill_command(self):
+        """Тест привязки ресурсов к существующим данным"""
+        from io import StringIO
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        from .models import Resource
+        
+        for user in (self.alice, self.bob):
+            ContentItem.objects.create(user=user, title='Пост', url='https://example.com/post')
+        ContentItem.objects.create(user=self.alice, title='Без ссылки')
+        ContentItem.objects.update(resource=None)
+        Resource.objects.all().delete()
+        
+        out = StringIO()
+        call_command('backfill_resources', chunk_size=1, stdout=out)
+        
+        self.assertIn('Привязано элементов: 2', out.getvalue())
+        self.assertEqual(Resource.objects.get().bookmarks.count(), 2)
+    
+    def test_relink_after_normalization_change(self):
+        """Тест перепривязки закладок, привязанных по старым правилам нормализации"""
+        from .models import Resource
+        from .resources import relink
+        
+        item = ContentItem.objects.create(
+            user=self.alice, title='С www', url='https://www.example.com/post', description='Общее описание'
+        )
+        apex = ContentItem.objects.create(user=self.bob, title='Без www', url='https://example.com/post')
+        # Раньше www. отбрасывался - обе закладки на одном ресурсе
+        ContentItem.objects.filter(pk=item.pk).update(resource=apex.resource)
+        Resource.objects.filter(pk=apex.resource_id).update(description='Общее описание')
+        
+        self.assertEqual(relink(), 1)
+        item = ContentItem.objects.get(pk=item.pk)
+        self.assertNotEqual(item.resource_id, apex.resource_id)
+        self.assertEqual(item.resource.url, 'https://www.example.com/post')
+        self.assertEqual(item.full_description, 'Общее описание')
+        self.assertEqual(relink(), 0)
+    
+    def test_bulk_import_links_resources(self):
+        """Тест ресурсов и дубликатов (с точностью до нормализации) при массовом импорте"""
+        from unittest import mock
+        from .bulk_import import import_urls
+        
+        ContentItem.objects.create(user=self.alice, title='Есть', url='https://example.com/saved')
+        urls = [
+            'https://example.com/new', 'https://example.com/new#top', 'https://example.com/saved/',
+            'https://www.example.com/saved/',
+        ]
+        with mock.patch('content.http_client.get', side_effect=_serve_distinct_html):
+            report = import_urls(self.alice, urls)
+        
+        statuses = [entry['status'] for entry in report]
+        self.assertEqual(statuses, ['created', 'duplicate', 'duplicate', 'created'])
+        item = ContentItem.objects.get(url='https://example.com/new')
+        self.assertEqual(item.resource.url, 'https://example.com/new')
+
+class SimHashTest(APITestCase):
+    """Тесты поиска почти-дубликатов по SimHash"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('dedup', password='deduppass123')
+        self.client.force_authenticate(user=self.user)
+    
+    def test_fingerprint_and_bands(self):
+        """Тест отпечатков и гарантии совпадения полосы при расстоянии до 3"""
+        import random
+        from . import simhash
+        
+        self.assertEqual(simhash.fingerprint('Django ORM Tips!'), simhash.fingerprint('django orm tips'))
+        self.assertIsNone(simhash.fingerprint('', ''))
+        self.assertGreater(
+            simhash.hamming(simhash.fingerprint('Django ORM tips'), simhash.fingerprint('Figma для дизайнеров интерфейсов')), 3
+        )
+        
+        rng = random.Random(40)
+        for _ in range(200):
+            value = rng.getrandbits(64)
+            other = value
+            for bit in rng.sample(range(64), 3):
+                other ^= 1 << bit
+            self.assertTrue(set(enumerate(simhash.bands(value))) & set(enumerate(simhash.bands(other))))
+            self.assertEqual(simhash.to_unsigned(simhash.to_signed(value)), value)
+    
+    def test_numbers_and_short_titles_do_not_match(self):
+        """Тест: номера частей и версий различаются, у коротких заголовков нет отпечатка"""
+        from . import simhash
+        
+        for first, second in [
+            ('Видео про python - часть 1', 'Видео про python - часть 2'),
+            ('Django 4 tutorial', 'Django 5 tutorial'),
+            ('Python course chapter 1', 'Python course chapter 2'),
+        ]:
+            with self.subTest(first=first):
+                self.assertGreater(
+                    simhash.hamming(simhash.fingerprint(first), simhash.fingerprint(second)), simhash.get_max_distance()
+                )
+        self.assertIsNone(simhash.fingerprint('Just a moment...'))
+        self.assertIsNone(simhash.fingerprint('Chapter 1'))
+    
+    def test_api_create_flags_and_rejects(self):
+        """Тест пометки дубликата при создании и режима on_duplicate=reject"""
+        original = ContentItem.objects.create(
+            user=self.user, title='Django ORM: оптимизация запросов',
+            description='select_related, prefetch_related и аннотации'
+        )
+        data = {
+            'title': 'Django ORM — оптимизация запросов', 'content_type': 'article', 'status': 'new', 'tags': [],
+            'description': 'Select_related, prefetch_related и аннотации.',
+        }
+        
+        response = self.client.post('/api/contents/?on_duplicate=reject', data, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['duplicate_of'], original.id)
+        
+        response = self.client.post('/api/contents/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['duplicate_of'], original.id)
+        
+        response = self.client.post('/api/contents/', {**data, 'title': 'Рецепт борща', 'description': ''}, format='json')
+        self.assertNotIn('duplicate_of', response.data)
+    
+    def test_parse_returns_existing_item(self):
+        """Тест повторного парсинга: та же ссылка - существующий элемент, другая - новый с пометкой"""
+        from unittest import mock
+        
+        with mock.patch('content.http_client.get', side_effect=_serve_html):
+            first = self.client.post('/api/parse/', {'url': 'https://example.com/tips'}, format='json')
+            second = self.client.post('/api/parse/', {'url': 'https://example.com/tips?utm_source=x'}, format='json')
+            mirror = self.client.post('/api/parse/', {'url': 'https://mirror.example.com/tips'}, format='json')
+        
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['duplicate_of'], first.data['id'])
+        self.assertEqual(mirror.status_code, 201)
+        self.assertEqual(mirror.data['duplicate_of'], first.data['id'])
+        self.assertNotEqual(mirror.data['id'], first.data['id'])
+        self.assertEqual(ContentItem.objects.filter(user=self.user).count(), 2)
+    
+    def test_bulk_import_and_backfill(self):
+        """Тест дубликатов при импорте и заполнения отпечатков для старых данных"""
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        from .bulk_import import import_urls
+        
+        saved = ContentItem.objects.create(user=self.user, title='Django tips', description='Useful Django tips')
+        with mock.patch('content.http_client.get', side_effect=_serve_html):
+            report = import_urls(self.user, ['https://mirror.example.com/copy'])
+        self.assertEqual(report[0]['status'], 'created')
+        self.assertEqual(report[0]['duplicate_of'], saved.id)
+        self.assertTrue(ContentItem.objects.filter(url='https://mirror.example.com/copy').exists())
+        
+        ContentItem.objects.update(simhash=None, simhash_band0=None)
+        call_command('backfill_simhash', stdout=StringIO())
+        saved.refresh_from_db()
+        self.assertIsNotNone(saved.simhash_band0)
+
+class KeywordsTest(APITestCase):
+    """Тесты автотегов по TF-IDF"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('tagger', password='taggerpass123')
+        self.client.force_authenticate(user=self.user)
+    
+    def _frequencies(self):
+        """{термин: частота} без нулевых строк; части общего счетчика - под ''"""
+        from .keywords import TOTAL_KEY, TOTAL_KEYS
+        from .models import TermFrequency
+        
+        frequencies = {}
+        for term, documents in TermFrequency.objects.values_list('term', 'documents'):
+            term = TOTAL_KEY if term in TOTAL_KEYS else term
+            frequencies[term] = frequencies.get(term, 0) + documents
+        return {term: documents for term, documents in frequencies.items() if documents}
+    
+    def test_incremental_frequencies_match_rebuild(self):
+        """Тест инкрементного учета частот и совпадения с полным пересчетом"""
+        from io import StringIO
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        from .bulk_import import create_items
+        
+        ContentItem.objects.create(user=self.user, title='Django ORM', description='Запросы Django и индексы')
+        create_items(self.user, [
+            {'url': f'https://example.com/{slug}', 'title': f'Django {slug}', 'description': '',
+             'content_type': 'article', 'category_id': None, 'status': 'new', 'tags': []}
+            for slug in ('celery', 'channels')
+        ])
+        
+        frequencies = self._frequencies()
+        self.assertEqual(frequencies[''], 3)
+        self.assertEqual(frequencies['django'], 3)
+        self.assertEqual(frequencies['индексы'], 1)
+        
+        call_command('rebuild_keywords', stdout=StringIO())
+        self.assertEqual(self._frequencies(), frequencies)
+    
+    def test_edits_and_deletes_update_frequencies(self):
+        """Тест: правка заголовка и удаление (по одному и пачкой) меняют частоты как пересчет"""
+        from io import StringIO
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        from . import bulk_actions, deletion
+        
+        first = ContentItem.objects.create(user=self.user, title='Django ORM', description='Запросы и индексы')
+        second = ContentItem.objects.create(user=self.user, title='Celery workers', url='https://example.com/celery')
+        third = ContentItem.objects.create(user=self.user, title='Kafka streams')
+        ContentItem.objects.create(user=self.user, title='Redis cache')
+        
+        first = ContentItem.objects.get(pk=first.pk)
+        first.title = 'Django admin'
+        first.save(update_fields=['title'])
+        ContentItem.objects.get(pk=second.pk).delete()
+        bulk_actions.delete_items(ContentItem.objects.filter(pk=third.pk))
+        
+        frequencies = self._frequencies()
+        self.assertEqual(frequencies[''], 2)
+        self.assertNotIn('orm', frequencies)
+        self.assertNotIn('celery', frequencies)
+        self.assertNotIn('kafka', frequencies)
+        self.assertEqual(frequencies['admin'], 1)
+        
+        # Фоновое удаление пользователя вычитает его элементы порциями
+        job = deletion.delete_user(self.user, background=False)
+        deletion.run_deletion_job(job.pk)
+        self.assertEqual(self._frequencies(), {})
+        
+        call_command('rebuild_keywords', stdout=StringIO())
+        self.assertEqual(self._frequencies(), {})
+    
+    def test_suggest_batch_ranks_by_tf_idf(self):
+        """Тест ранжирования: общие для корпуса термины уступают редким"""
+        from .keywords import record_documents, suggest_batch, terms
+        
+        record_documents([terms('Django guide', 'python')] * 30 + [terms('Kubernetes', '')])
+        with self.assertNumQueries(1):
+            suggestions = suggest_batch([
+                ('Django kubernetes deploy', 'Deploy django to kubernetes'),
+                ('Django', ''),
+                ('', ''),
+            ], limit=2)
+        
+        self.assertEqual(suggestions[0], ['deploy', 'kubernetes'])
+        # django встречается больше чем в половине документов - не тег
+        self.assertEqual(suggestions[1], [])
+        self.assertEqual(suggestions[2], [])
+    
+    def test_parse_and_create_suggest_tags(self):
+        """Тест автотегов при парсинге страницы без keywords и предложения при создании"""
+        from unittest import mock
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        
+        html = SAMPLE_HTML.replace(b'<meta name="keywords" content="django, python, web">', b'')
+        with override_settings(PAGE_TEXT_ENABLED=True), \
+                mock.patch('content.http_client.get', side_effect=lambda url, **kwargs: _html_response(html)):
+            response = self.client.post('/api/parse/', {'url': 'https://example.com/tips'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        # Текст страницы (content.page_text) тоже участвует
+        self.assertEqual(sorted(response.data['tags']), ['django', 'first', 'paragraph', 'tips', 'useful'])
+        self.assertEqual(sorted(response.data['suggested_tags']), sorted(response.data['tags']))
+        
+        response = self.client.post('/api/contents/', {
+            'title': 'Celery periodic tasks', 'content_type': 'article', 'status': 'new', 'tags': ['celery'],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['tags'], ['celery'])
+        self.assertEqual(response.data['suggested_tags'], ['celery', 'periodic', 'tasks'])
+
+class ClassifierTest(APITestCase):
+    """Тесты классификатора категорий"""
+    
+    def setUp(self):
+        import tempfile
+        from pathlib import Path
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        
+        self.user = User.objects.create_user('classifier', password='classifierpass123')
+        self.client.force_authenticate(user=self.user)
+        self.programming = Category.objects.create(name='Программирование', slug='programming')
+        self.design = Category.objects.create(name='Дизайн', slug='design')
+        
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'category_model.npz'
+        overrides = override_settings(CATEGORY_MODEL_PATH=self.path)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        
+        topics = {
+            self.programming: ['django models', 'python typing', 'django views', 'celery workers', 'python asyncio'],
+            self.design: ['figma components', 'color palette', 'typography scale', 'figma prototyping', 'layout grid'],
+        }
+        for category, titles in topics.items():
+            for number, title in enumerate(titles * 2):
+                item = ContentItem.objects.create(
+                    user=self.user, title=f'{title} {number}', description=f'Notes on {title}', category=category
+                )
+                item.tags.add(category.slug)
+    
+    def _train(self, **options):
+        from io import StringIO
+        from django.core.management import call_command # pyright: ignore[reportMissingModuleSource]
+        
+        out = StringIO()
+        call_command('train_classifier', stdout=out, **options)
+        return out.getvalue()
+    
+    def test_train_and_predict_batch(self):
+        """Тест обучения командой и пакетного предсказания"""
+        from .classifier import load_model, predict_categories
+        
+        self.assertIn('Мало данных', self._train(min_items=100))
+        self.assertFalse(self.path.exists())
+        self.assertEqual(predict_categories([('Django forms', '', ())]), [None])
+        
+        self.assertIn('20 примеров, 2 категорий', self._train())
+        self.assertIs(load_model(), load_model())
+        
+        predicted = predict_categories([
+            ('Django admin tips', 'python and django', []),
+            ('Figma auto layout', 'components and typography', ['design']),
+            ('', '', []),
+        ])
+        self.assertEqual(predicted, [self.programming.id, self.design.id, None])
+        
+        # Категория удалена после обучения - предсказание игнорируется
+        self.design.delete()
+        self.assertEqual(predict_categories([('Figma auto layout', 'typography', [])]), [None])
+    
+    def test_parse_and_bulk_import_use_classifier(self):
+        """Тест категоризации при парсинге и массовом импорте"""
+        from unittest import mock
+        from .bulk_import import import_urls
+        
+        self._train()
+        html = SAMPLE_HTML.replace(b'Django tips', b'Figma palette tips').replace(b'django, python, web', b'figma')
+        with mock.patch('content.http_client.get', side_effect=lambda url, **kwargs: _html_response(html)):
+            # Эвристика по URL выбрала бы "программирование"
+            response = self.client.post('/api/parse/', {'url': 'https://example.com/python-vs-figma'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['category']['slug'], 'design')
+        
+        with mock.patch('content.http_client.get', side_effect=_serve_distinct_html):
+            report = import_urls(self.user, ['https://example.com/celery', 'https://example.com/asyncio'])
+        self.assertEqual([entry['status'] for entry in report], ['created', 'created'])
+        self.assertEqual(
+            set(ContentItem.objects.filter(pk__in=[entry['id'] for entry in report]).values_list('category', flat=True)),
+            {self.programming.id}
+        )
+
+class PageTextTest(APITestCase):
+    """Тесты хранилища полного текста страниц"""
+    
+    ARTICLE_HTML = (
+        '<html><head><title>Postgres indexes</title><meta name="description" content="Index basics">'
+        '<script>var tracking = 1;</script></head><body><nav>Home About</nav>'
+        '<article><h1>Postgres indexes</h1>'
+        + '<p>Partial indexes and covering indexes speed up vacuum-heavy tables.</p>' * 50
+        + '</article><footer>Copyright</footer></body></html>'
+    ).encode()
+    
+    def setUp(self):
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        
+        # Хранение текста выключено по умолчанию
+        enabled = override_settings(PAGE_TEXT_ENABLED=True)
+        enabled.enable()
+        self.addCleanup(enabled.disable)
+        self.user = User.objects.create_user('reader', password='readerpass123')
+        self.client.force_authenticate(user=self.user)
+    
+    def _parse(self, url='https://example.com/postgres'):
+        from unittest import mock
+        
+        with mock.patch('content.http_client.get', side_effect=lambda url, **kwargs: _html_response(self.ARTICLE_HTML)):
+            return self.client.post('/api/parse/', {'url': url}, format='json')
+    
+    def test_parse_stores_compressed_text(self):
+        """Тест извлечения, сжатия и ленивой распаковки текста"""
+        from .models import PageText
+        
+        response = self._parse()
+        self.assertEqual(response.status_code, 201)
+        
+        page = PageText.objects.get(resource__bookmarks__id=response.data['id'])
+        self.assertTrue(page.text.startswith('Postgres indexes\nPartial indexes'))
+        self.assertNotIn('tracking', page.text)
+        self.assertNotIn('Copyright', page.text)
+        self.assertEqual(page.length, len(page.text))
+        self.assertLess(len(bytes(page.data)), page.length // 10)
+        self.assertIn('vacuum', page.terms.split())
+        
+        response = self.client.get(f"/api/contents/{response.data['id']}/text/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('covering indexes', response.data['text'])
+    
+    def test_text_feeds_search(self):
+        """Тест поиска по терминам текста, которых нет в заголовке и описании"""
+        item_id = self._parse().data['id']
+        ContentItem.objects.create(user=self.user, title='Другое', description='Без текста')
+        
+        response = self.client.get('/api/contents/', {'search': 'vacuum'})
+        self.assertEqual([item['id'] for item in response.data['results']], [item_id])
+        
+        # Без хранения текста поиск не присоединяет page_text (tables нет в тегах)
+        from django.core.cache import cache # pyright: ignore[reportMissingModuleSource]
+        from django.db import connection # pyright: ignore[reportMissingModuleSource]
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        from django.test.utils import CaptureQueriesContext # pyright: ignore[reportMissingModuleSource]
+        
+        cache.clear()
+        with override_settings(PAGE_TEXT_ENABLED=False), CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/contents/', {'search': 'tables'})
+        self.assertEqual(response.data['count'], 0)
+        self.assertFalse(any('content_pagetext' in query['sql'] for query in queries))
+    
+    def test_disabled_store(self):
+        """Тест режима без хранения текста"""
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        from .models import PageText
+        
+        with override_settings(PAGE_TEXT_ENABLED=False):
+            response = self._parse()
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(PageText.objects.exists())
+        self.assertEqual(self.client.get(f"/api/contents/{response.data['id']}/text/").status_code, 404)
+
+class BookmarkImportTest(APITestCase):
+    """Тесты импорта закладок из файлов экспорта"""
+    
+    NETSCAPE_HTML = '''<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+    <DT><H3 ADD_DATE="1600000000">Bookmarks bar</H3>
+    <DL><p>
+        <DT><H3>Технологии</H3>
+        <DL><p>
+            <DT><A HREF="https://example.com/rust" ADD_DATE="1600000000" TAGS="Rust,Systems">Rust &amp; memory</A>
+            <DD>Ownership explained
+        </DL><p>
+        <DT><A HREF="https://example.com/plain">Plain link</A>
+    </DL><p>
+    <DT><A HREF="javascript:void(0)">Bookmarklet</A>
+</DL><p>
+'''.encode()
+    
+    CSV_EXPORT = (
+        'title,url,time_added,tags,status\n'
+        'Celery tasks,https://example.com/celery,1600000000,python|celery,archive\n'
+        'Unread,https://example.com/unread,1600000001,,unread\n'
+        'Same again,https://EXAMPLE.com/celery/,1600000002,,unread\n'
+    ).encode()
+    
+    def setUp(self):
+        self.user = User.objects.create_user('importer', password='importerpass123')
+        self.category = Category.objects.create(name='Технологии', slug='tech')
+    
+    def _import(self, data, file_format=None, name='', **kwargs):
+        import io
+        from .bookmark_import import import_bookmarks, iter_bookmarks
+        
+        return import_bookmarks(self.user, iter_bookmarks(io.BytesIO(data), file_format, name), **kwargs)
+    
+    def test_netscape_folders_tags_and_descriptions(self):
+        """Тест разбора Netscape HTML: папки, теги, описания"""
+        stats = self._import(self.NETSCAPE_HTML)
+        self.assertEqual(stats, {'total': 3, 'created': 2, 'duplicate': 0, 'invalid': 1})
+        
+        rust = ContentItem.objects.get(url='https://example.com/rust')
+        self.assertEqual(rust.title, 'Rust & memory')
+        self.assertEqual(rust.full_description, 'Ownership explained')
+        self.assertEqual(rust.category, self.category)
+        self.assertEqual(sorted(rust.tags.names()), ['Rust', 'Systems'])
+        self.assertIsNotNone(rust.resource_id)
+        self.assertIsNotNone(rust.simhash_band0)
+        
+        plain = ContentItem.objects.get(url='https://example.com/plain')
+        self.assertIsNone(plain.category)
+        self.assertEqual(plain.full_description, '')
+    
+    def test_csv_status_dedupe_and_existing_tags(self):
+        """Тест CSV: статус, дубликаты в файле и переиспользование тегов"""
+        from taggit.models import Tag
+        
+        Tag.objects.create(name='Python', slug='python')
+        stats = self._import(self.CSV_EXPORT, name='pocket.csv')
+        self.assertEqual(stats, {'total': 3, 'created': 2, 'duplicate': 1, 'invalid': 0})
+        
+        celery = ContentItem.objects.get(url='https://example.com/celery')
+        self.assertEqual(celery.status, 'completed')
+        self.assertIsNotNone(celery.completed_at)
+        self.assertEqual(sorted(celery.tags.names()), ['Python', 'celery'])
+        self.assertEqual(Tag.objects.filter(name__iexact='python').count(), 1)
+        self.assertEqual(ContentItem.objects.get(url='https://example.com/unread').status, 'new')
+        
+        # Повторный импорт ничего не создает
+        stats = self._import(self.CSV_EXPORT, name='pocket.csv')
+        self.assertEqual(stats['created'], 0)
+        self.assertEqual(stats['duplicate'], 3)
+    
+    def test_json_array_is_streamed_in_chunks(self):
+        """Тест потокового разбора JSON-массива и импорта чанками"""
+        import json
+        from unittest import mock
+        from . import bookmark_import
+        
+        rows = [
+            {'href': f'https://example.com/json/{index}', 'description': f'Item {index}', 'tags': 'json feed'}
+            for index in range(25)
+        ]
+        progress = []
+        with mock.patch.object(bookmark_import, 'READ_CHUNK', 64):
+            stats = self._import(json.dumps(rows).encode(), chunk_size=10, progress=progress.append)
+        
+        self.assertEqual(stats['created'], 25)
+        self.assertEqual([entry['total'] for entry in progress], [10, 20, 25])
+        item = ContentItem.objects.get(url='https://example.com/json/7')
+        self.assertEqual(item.title, 'https://example.com/json/7')
+        self.assertEqual(item.full_description, 'Item 7')
+        self.assertEqual(list(item.tags.names()), ['json feed'])
+    
+    def test_json_wrapper_object_and_bad_input(self):
+        """Тест JSON-объекта Pocket и ошибок формата"""
+        import json
+        from .bookmark_import import ImportFormatError
+        
+        data = {'list': {'1': {'given_url': 'https://example.com/pocket', 'given_title': 'Pocket item',
+                               'tags': {'reading': {'tag': 'reading'}}}}}
+        stats = self._import(json.dumps(data).encode(), 'json')
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(list(ContentItem.objects.get(title='Pocket item').tags.names()), ['reading'])
+        
+        with self.assertRaises(ImportFormatError):
+            self._import(b'[{"url": "https://example.com/broken"', 'json')
+        with self.assertRaises(ImportFormatError):
+            self._import(b'name,value\nfoo,bar\n', 'csv')
+    
+    def test_untagged_rows_get_suggested_tags(self):
+        """Тест автотегов для закладок без тегов"""
+        self._import(self.CSV_EXPORT, name='pocket.csv')
+        self.assertEqual(list(ContentItem.objects.get(url='https://example.com/unread').tags.names()), ['unread'])
+    
+    def test_api_upload(self):
+        """Тест загрузки файла через API"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        
+        response = self.client.post(
+            '/api/import/bookmarks/',
+            {'file': SimpleUploadedFile('bookmarks.html', self.NETSCAPE_HTML)}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 403)
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            '/api/import/bookmarks/',
+            {'file': SimpleUploadedFile('bookmarks.html', self.NETSCAPE_HTML)}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        
+        response = self.client.post(
+            '/api/import/bookmarks/',
+            {'file': SimpleUploadedFile('bad.json', b'{"nothing": 1}')}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 400)
+    
+    def test_large_upload_runs_in_background(self):
+        """Тест фонового импорта большого файла с прогрессом"""
+        import json
+        import os
+        import tempfile
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import override_settings # pyright: ignore[reportMissingModuleSource]
+        
+        data = json.dumps({'status': 1, 'list': {
+            str(index): {'given_url': f'https://example.com/pocket/{index}', 'given_title': f'Pocket {index}'}
+            for index in range(30)
+        }}).encode()
+        self.client.force_authenticate(user=self.user)
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(BOOKMARK_IMPORT_SYNC_BYTES=100, BOOKMARK_IMPORT_DIR=directory,
+                                  BOOKMARK_IMPORT_CHUNK_SIZE=10, BACKGROUND_JOBS_EAGER=True):
+            response = self.client.post(
+                '/api/import/bookmarks/', {'file': SimpleUploadedFile('pocket.json', data)}, format='multipart'
+            )
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.data['size'], len(data))
+            self.assertEqual(os.listdir(directory), [])
+        
+        response = self.client.get(response.data['status_url'])
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(response.data['progress'], 1.0)
+        self.assertEqual((response.data['total'], response.data['created']), (30, 30))
+        self.assertEqual(ContentItem.objects.filter(user=self.user).count(), 30)
+    
+    def test_import_bookmarks_command(self):
+        """Тест команды import_bookmarks"""
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        
+        with tempfile.NamedTemporaryFile(suffix='.html') as f:
+            f.write(self.NETSCAPE_HTML)
+            f.flush()
+            out = StringIO()
+            call_command('import_bookmarks', f.name, user='importer', stdout=out)
+        self.assertIn('Импортировано 2 из 3', out.getvalue())
+        self.assertEqual(ContentItem.objects.filter(user=self.user).count(), 2)
+
+
+class TaggingTest(APITestCase):
+    """Тесты пакетного назначения тегов"""
+    
+    def setUp(self):
+        from . import tagging
+        
+        tagging.clear_cache()
+        self.addCleanup(tagging.clear_cache)
+        self.user = User.objects.create_user('tagger', password='taggerpass123')
+        self.client.force_authenticate(user=self.user)
+    
+    def _item(self, index=0):
+        return ContentItem.objects.create(
+            user=self.user, title=f'Item {index}', url=f'https://example.com/{index}', content_type='article'
+        )
+    
+    def test_cyrillic_tags_are_matched_case_insensitively(self):
+        """Тест: теги с заглавной кириллицей создаются, находятся и снимаются (LOWER в SQLite - только ASCII)"""
+        from taggit.models import Tag
+        from . import tagging
+        
+        response = self.client.post('/api/contents/', {
+            'title': 'Кириллица', 'url': 'https://example.com/cyrillic', 'content_type': 'article',
+            'tags': ['Питон', 'Ёлка'],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(response.data['tags']), ['Ёлка', 'Питон'])
+        
+        tagging.clear_cache()
+        second = self._item(1)
+        tagging.assign_tags([(second, ['питон', 'ЁЛКА', 'Новый'])])
+        self.assertEqual(sorted(second.tags.names()), ['Ёлка', 'Новый', 'Питон'])
+        self.assertEqual(Tag.objects.count(), 3)
+        
+        tagging.clear_cache()
+        self.assertEqual(tagging.remove_tags([second.pk], ['ПИТОН', 'новый']), 2)
+        self.assertEqual(list(second.tags.names()), ['Ёлка'])
+    
+    def test_serializer_reuses_tags_case_insensitively(self):
+        """Тест API: существующие теги без учета регистра, замена при обновлении"""
+        from taggit.models import Tag
+        
+        Tag.objects.create(name='Python', slug='python')
+        response = self.client.post('/api/contents/', {
+            'title': 'Tagged', 'url': 'https://example.com/tagged', 'content_type': 'article',
+            'tags': ['python', 'Web'],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(response.data['tags']), ['Python', 'Web'])
+        self.assertEqual(Tag.objects.count(), 2)
+        
+        response = self.client.patch(
+            f"/api/contents/{response.data['id']}/", {'tags': ['WEB', 'Django']}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        item = ContentItem.objects.get(pk=response.data['id'])
+        self.assertEqual(sorted(item.tags.names()), ['Django', 'Web'])
+    
+    def test_form_replaces_tags(self):
+        """Тест формы: теги через запятую, замена при редактировании"""
+        from .forms import ContentItemForm
+        
+        data = {'title': 'Form item', 'url': 'https://example.com/form', 'content_type': 'article', 'status': 'new'}
+        form = ContentItemForm({**data, 'tags': 'python, django'})
+        self.assertTrue(form.is_valid(), form.errors)
+        item = form.save(commit=False)
+        item.user = self.user
+        item.save()
+        form.save_m2m()
+        self.assertEqual(sorted(item.tags.names()), ['django', 'python'])
+        
+        form = ContentItemForm({**data, 'tags': 'Django, web'}, instance=item)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(sorted(item.tags.names()), ['django', 'web'])
+        self.assertEqual(form.cleaned_data['tags'], ['Django', 'web'])
+    
+    def test_batch_uses_constant_queries(self):
+        """Тест: число запросов не зависит от числа элементов и тегов"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from . import tagging
+        
+        def run(count):
+            items = [self._item(f'{count}-{index}') for index in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                created = tagging.assign_tags((item, [f'tag{count}-{index}' for index in range(8)]) for item in items)
+            self.assertEqual(created, count * 8)
+            return len(queries)
+        
+        run(1)  # прогрев: тип контента, строка скетча
+        self.assertEqual(run(5), run(40))
+        self.assertEqual(ContentItem.objects.get(title='Item 40-3').tags.count(), 8)
+    
+    def test_cache_after_commit_and_invalidation(self):
+        """Тест кэша имя -> id: заполнение после коммита и сброс при удалении"""
+        from taggit.models import Tag
+        from . import tagging
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = tagging.resolve_tags(['Cached', 'other'])
+        # Только проверка поколения
+        with self.assertNumQueries(1):
+            self.assertEqual(tagging.resolve_tags(['cached', 'OTHER']), ids)
+        
+        Tag.objects.filter(pk=ids['cached']).get().delete()
+        new_ids = tagging.resolve_tags(['cached'])
+        self.assertNotEqual(new_ids['cached'], ids['cached'])
+        self.assertTrue(Tag.objects.filter(pk=new_ids['cached']).exists())
+        
+        # Тег удален в другом процессе: его запись осталась в этом кэше, но поколение в базе новое
+        with self.captureOnCommitCallbacks(execute=True):
+            tagging.resolve_tags(['other'])
+        generation = tagging._state['generation']
+        Tag.objects.filter(pk=ids['other']).delete()
+        tagging._cache['other'] = ids['other']
+        tagging._state['generation'] = generation
+        item = self._item()
+        tagging.assign_tags([(item, ['other'])])
+        self.assertEqual(list(item.tags.names()), ['other'])
+        self.assertNotEqual(tagging.resolve_tags(['other'])['other'], ids['other'])
+    
+    def test_seed_data_assigns_tags(self):
+        """Тест seed_data: теги назначаются пачкой"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        call_command('seed_data', stdout=StringIO())
+        item = ContentItem.objects.get(title='Интересная статья #8 по программированию')
+        self.assertEqual(sorted(item.tags.names()), ['education', 'learning', 'tag8', 'tutorial'])
+
+
+class BulkActionsTest(APITestCase):
+    """Тесты массового обновления и удаления"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='ownerpass123')
+        self.other = User.objects.create_user('other', password='otherpass123')
+        self.category = Category.objects.create(name='Наука', slug='science')
+        self.items = [
+            ContentItem.objects.create(
+                user=self.user, title=f'Item {index}', url=f'https://example.com/{index}',
+                content_type='article', status='new'
+            )
+            for index in range(5)
+        ]
+        self.foreign = ContentItem.objects.create(
+            user=self.other, title='Foreign', url='https://example.com/foreign', content_type='article'
+        )
+        self.client.force_authenticate(user=self.user)
+    
+    def _ids(self, items=None):
+        return [item.id for item in (items or self.items)] + [self.foreign.id]
+    
+    def test_bulk_status_keeps_completed_at_semantics(self):
+        """Тест статуса: completed_at ставится, сохраняется и сбрасывается в SQL"""
+        done = self.items[0]
+        done.status = 'completed'
+        done.save()
+        first_completed = ContentItem.objects.get(pk=done.pk).completed_at
+        
+        # Один UPDATE; счетчики - группировка до и после, вставка и UPDATE на дельту
+        # (не зависит от размера набора)
+        with self.assertNumQueries(11):
+            response = self.client.post('/api/contents/bulk_update/', {'ids': self._ids(), 'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 5)
+        
+        self.assertEqual(ContentItem.objects.get(pk=done.pk).completed_at, first_completed)
+        self.assertFalse(ContentItem.objects.filter(user=self.user, completed_at__isnull=True).exists())
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'new')
+        
+        response = self.client.post(
+            '/api/contents/bulk_update/', {'ids': [done.pk], 'status': 'postponed'}, format='json'
+        )
+        done.refresh_from_db()
+        self.assertEqual(done.status, 'postponed')
+        self.assertIsNone(done.completed_at)
+    
+    def test_bulk_category_and_tags(self):
+        """Тест категории и тегов по фильтру"""
+        self.items[0].tags.add('old', 'keep')
+        response = self.client.post('/api/contents/bulk_update/?status=new', {
+            'category_id': self.category.id, 'add_tags': ['Batch'], 'remove_tags': ['OLD'],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'updated': 5, 'tags_added': 5, 'tags_removed': 1})
+        self.assertEqual(ContentItem.objects.filter(category=self.category).count(), 5)
+        self.assertEqual(sorted(self.items[0].tags.names()), ['Batch', 'keep'])
+        self.assertFalse(self.foreign.tags.exists())
+        
+        response = self.client.post('/api/contents/bulk_update/', {'ids': self._ids(), 'category_id': None}, format='json')
+        self.assertEqual(response.data['updated'], 5)
+        self.assertFalse(ContentItem.objects.filter(category__isnull=False).exists())
+    
+    def test_bulk_update_by_filter_on_changed_tags(self):
+        """Тест что фильтр по снимаемому тегу не сужает UPDATE и счетчики"""
+        from . import counters
+        
+        for item in self.items[:2]:
+            item.tags.add('todo')
+        response = self.client.post('/api/contents/bulk_update/?search=todo', {
+            'status': 'completed', 'remove_tags': ['todo'],
+        }, format='json')
+        self.assertEqual(response.data, {'updated': 2, 'tags_added': 0, 'tags_removed': 2})
+        self.assertEqual(ContentItem.objects.filter(status='completed').count(), 2)
+        self.assertEqual(counters.get(counters.STATUS, 'completed'), 2)
+    
+    def test_bulk_update_validation(self):
+        """Тест ошибок: нет набора, нет изменений, неизвестные значения"""
+        cases = [
+            {'status': 'completed'},
+            {'ids': self._ids()},
+            {'ids': self._ids(), 'status': 'unknown'},
+            {'ids': self._ids(), 'category_id': 99999},
+            {'ids': 'all', 'status': 'new'},
+            {'ids': self._ids(), 'add_tags': 'tag'},
+        ]
+        for data in cases:
+            response = self.client.post('/api/contents/bulk_update/', data, format='json')
+            self.assertEqual(response.status_code, 400, data)
+        
+        self.client.force_authenticate(user=None)
+        response = self.client.post('/api/contents/bulk_update/', {'ids': self._ids(), 'status': 'new'}, format='json')
+        self.assertEqual(response.status_code, 403)
+    
+    def test_bulk_delete(self):
+        """Тест удаления по id и по фильтру с каскадом и проверкой владельца"""
+        from .models import ParseJob, Recommendation
+        
+        Recommendation.objects.create(user=self.user, content_item=self.items[0], score=0.5, reason='test')
+        job = ParseJob.objects.create(user=self.user, url=self.items[0].url, content_item=self.items[0])
+        self.items[0].tags.add('gone')
+        
+        response = self.client.post('/api/contents/bulk_delete/', {'ids': self._ids(self.items[:2])}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'deleted': 2})
+        self.assertTrue(ContentItem.objects.filter(pk=self.foreign.pk).exists())
+        self.assertFalse(Recommendation.objects.exists())
+        job.refresh_from_db()
+        self.assertIsNone(job.content_item_id)
+        self.assertFalse(ContentItem.tags.through.objects.filter(object_id=self.items[0].pk).exists())
+        
+        self.items[2].status = 'completed'
+        self.items[2].save()
+        response = self.client.post('/api/contents/bulk_delete/?status=new', {}, format='json')
+        self.assertEqual(response.data, {'deleted': 2})
+        self.assertEqual(list(ContentItem.objects.filter(user=self.user)), [self.items[2]])
+        
+        response = self.client.post('/api/contents/bulk_delete/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class DeletionJobTest(APITestCase):
+    """Тесты фонового удаления порциями"""
+    
+    def setUp(self):
+        from .models import Recommendation
+        
+        self.user = User.objects.create_user('leaving', password='leavingpass123')
+        self.other = User.objects.create_user('staying', password='stayingpass123')
+        self.category = Category.objects.create(name='Большая', slug='big')
+        self.items = [
+            ContentItem.objects.create(
+                user=self.user, title=f'Item {index}', url=f'https://example.com/{index}',
+                content_type='article', category=self.category
+            )
+            for index in range(7)
+        ]
+        self.items[0].tags.add('doomed')
+        self.kept = ContentItem.objects.create(
+            user=self.other, title='Kept', url='https://example.com/kept',
+            content_type='article', category=self.category
+        )
+        Recommendation.objects.create(user=self.other, content_item=self.items[1], score=0.9, reason='test')
+        Recommendation.objects.create(user=self.user, content_item=self.kept, score=0.9, reason='test')
+    
+    def test_category_hidden_then_unlinked_in_batches(self):
+        """Тест категории: скрыта сразу, элементы отвязаны порциями"""
+        from django.test import override_settings
+        from .deletion import delete_category, run_deletion_job
+        
+        job = delete_category(self.category, requested_by=self.user, background=False)
+        self.assertEqual(job.total, 9)
+        self.assertFalse(Category.objects.filter(slug='big').exists())
+        self.assertTrue(Category.all_objects.filter(slug='big').exists())
+        
+        with override_settings(DELETION_BATCH_SIZE=3, DELETION_BATCH_PAUSE=0):
+            job = run_deletion_job(job.pk)
+        self.assertEqual((job.status, job.processed), ('done', 9))
+        self.assertFalse(Category.all_objects.exists())
+        self.assertEqual(ContentItem.objects.count(), 8)
+        self.assertFalse(ContentItem.objects.filter(category__isnull=False).exists())
+    
+    def test_user_deletion_cascades_in_batches(self):
+        """Тест пользователя: отключен сразу, данные удалены порциями"""
+        from django.db import connection
+        from django.test import override_settings
+        from django.test.utils import CaptureQueriesContext
+        from .deletion import delete_user, run_deletion_job
+        from .models import Recommendation
+        
+        job = delete_user(self.user, requested_by=self.user, background=False)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertFalse(ContentItem.objects.filter(user=self.user).exists())
+        self.assertEqual(ContentItem.all_objects.filter(user=self.user).count(), 7)
+        
+        with override_settings(DELETION_BATCH_SIZE=3, DELETION_BATCH_PAUSE=0):
+            with CaptureQueriesContext(connection) as queries:
+                job = run_deletion_job(job.pk)
+        self.assertEqual((job.status, job.processed, job.total), ('done', 9, 9))
+        self.assertFalse(User.objects.filter(username='leaving').exists())
+        self.assertEqual(list(ContentItem.all_objects.all()), [self.kept])
+        self.assertFalse(Recommendation.objects.exists())
+        self.assertFalse(ContentItem.tags.through.objects.exists())
+        # Порция - своя транзакция: ни один DELETE не затрагивает больше 3 элементов
+        deletes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "content_contentitem"')]
+        self.assertEqual(len(deletes), 3)
+    
+    def test_bulk_delete_goes_background_over_limit(self):
+        """Тест API: большой bulk_delete - 202, задача и статус"""
+        from django.test import override_settings
+        
+        self.client.force_authenticate(user=self.user)
+        with override_settings(DELETION_SYNC_LIMIT=5, BACKGROUND_JOBS_EAGER=True, DELETION_BATCH_PAUSE=0):
+            response = self.client.post('/api/contents/bulk_delete/?content_type=article', {}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['total'], 7)
+        self.assertFalse(ContentItem.all_objects.filter(user=self.user).exists())
+        
+        response = self.client.get(response.data['status_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(response.data['progress'], 1.0)
+        
+        self.client.force_authenticate(user=self.other)
+        job_id = response.data['id']
+        self.assertEqual(self.client.get(f'/api/deletions/{job_id}/').status_code, 404)
+    
+    def test_category_and_user_endpoints(self):
+        """Тест API удаления категории и учетной записи"""
+        self.client.force_authenticate(user=self.other)
+        response = self.client.delete(f'/api/users/{self.user.id}/')
+        self.assertEqual(response.status_code, 403)
+        
+        response = self.client.delete('/api/categories/big/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['target'], 'category')
+        # Задача еще в очереди, но категория уже скрыта
+        self.assertEqual(self.client.get('/api/categories/big/').status_code, 404)
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.delete(f'/api/users/{self.user.id}/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['target'], 'user')
+    
+    def test_run_deletions_resumes_pending_jobs(self):
+        """Тест команды run_deletions"""
+        from io import StringIO
+        from django.core.management import call_command
+        from .deletion import delete_content
+        
+        delete_content(self.user, ContentItem.objects.filter(user=self.user), background=False)
+        out = StringIO()
+        call_command('run_deletions', stdout=out)
+        self.assertIn('Выполнено задач: 1', out.getvalue())
+        self.assertFalse(ContentItem.all_objects.filter(user=self.user).exists())
+
+
+class CounterTest(APITestCase):
+    """Тесты денормализованных счетчиков"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('counter', password='counterpass123')
+        self.other = User.objects.create_user('second', password='secondpass123')
+        self.tech = Category.objects.create(name='Технологии', slug='tech')
+        self.science = Category.objects.create(name='Наука', slug='science')
+    
+    def _item(self, user=None, **kwargs):
+        data = {'title': 'Item', 'url': 'https://example.com/item', 'content_type': 'article', 'category': self.tech}
+        data.update(kwargs)
+        return ContentItem.objects.create(user=user or self.user, **data)
+    
+    def assertMatchesRebuild(self):
+        """Инкрементальные счетчики совпадают с полной пересборкой"""
+        from . import counters
+        from .models import Counter
+        
+        incremental = {(c.kind, c.key): c.value for c in Counter.objects.all() if c.value}
+        counters.rebuild()
+        rebuilt = {(c.kind, c.key): c.value for c in Counter.objects.all()}
+        self.assertEqual(incremental, rebuilt)
+    
+    def test_writes_keep_counters_exact(self):
+        """Тест: создание, изменение, теги и удаление через ORM"""
+        from . import counters
+        
+        first = self._item()
+        first.tags.add('python', 'django')
+        second = self._item(user=self.other, content_type='video', category=None)
+        second.tags.add('python')
+        self.assertEqual(counters.get(counters.ITEMS), 2)
+        self.assertEqual(counters.get(counters.USERS), 2)
+        self.assertEqual(counters.get(counters.CATEGORIES), 2)
+        self.assertMatchesRebuild()
+        
+        first.category = self.science
+        first.status = 'completed'
+        first.save()
+        first.tags.remove('django')
+        self.assertEqual(counters.get(counters.CATEGORY, self.science.pk), 1)
+        self.assertEqual(counters.get(counters.CATEGORY, self.tech.pk), 0)
+        self.assertEqual([tag.name for tag in counters.top_tags(category_id=self.science.pk)], ['python'])
+        self.assertMatchesRebuild()
+        
+        second.delete()
+        self.assertEqual(counters.get(counters.USERS), 1)
+        self.assertEqual([(tag.name, tag.num_times) for tag in counters.top_tags()], [('python', 1)])
+        self.assertMatchesRebuild()
+        
+        self.tech.delete()
+        self.assertEqual(counters.get(counters.CATEGORIES), 1)
+        self.assertMatchesRebuild()
+    
+    def test_apply_is_relative_to_stored_value(self):
+        """Тест: apply прибавляет дельту к значению в базе, не перезаписывает его"""
+        from . import counters
+        from .models import Counter
+        
+        counters.apply({(counters.TYPE, 'article'): 2, (counters.STATUS, 'article'): 5})
+        # Изменение из другой транзакции после чтения не теряется
+        Counter.objects.filter(kind=counters.TYPE, key='article').update(value=10)
+        counters.apply({(counters.TYPE, 'article'): 1, (counters.TYPE, 'video'): -1})
+        
+        self.assertEqual(counters.get(counters.TYPE, 'article'), 11)
+        self.assertEqual(counters.get(counters.STATUS, 'article'), 5)
+        self.assertEqual(counters.get(counters.TYPE, 'video'), 0)
+        
+        counters.apply({(counters.USER, '7'): 2, (counters.USER, '8'): 1})
+        counters.apply({(counters.USER, '7'): -1, (counters.USER, '8'): -1})
+        self.assertEqual(counters.get(counters.USERS), 1)
+    
+    def test_bulk_paths_keep_counters_exact(self):
+        """Тест: массовые пути (теги пачкой, bulk_update, bulk_delete, фоновое удаление)"""
+        from django.test import override_settings
+        from . import counters, tagging
+        from .deletion import delete_category, run_deletion_job
+        
+        items = [self._item(title=f'Item {index}', url=f'https://example.com/{index}') for index in range(6)]
+        tagging.assign_tags((item, ['Bulk', 'shared']) for item in items)
+        self._item(user=self.other).tags.add('shared')
+        self.assertMatchesRebuild()
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post('/api/contents/bulk_update/?status=new', {
+            'status': 'completed', 'category_id': self.science.pk, 'remove_tags': ['bulk'], 'add_tags': ['moved'],
+        }, format='json')
+        self.assertEqual(response.data['updated'], 6)
+        self.assertEqual(counters.get(counters.STATUS, 'completed'), 6)
+        self.assertEqual(counters.get(counters.CATEGORY_TAG, f"{self.science.pk}:{items[0].tags.get(name='moved').pk}"), 6)
+        self.assertMatchesRebuild()
+        
+        response = self.client.post('/api/contents/bulk_delete/', {'ids': [item.pk for item in items[:2]]}, format='json')
+        self.assertEqual(response.data, {'deleted': 2})
+        self.assertMatchesRebuild()
+        
+        with override_settings(DELETION_SYNC_LIMIT=1, BACKGROUND_JOBS_EAGER=True, DELETION_BATCH_PAUSE=0):
+            response = self.client.post('/api/contents/bulk_delete/?status=completed', {}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(counters.get(counters.ITEMS), 1)
+        self.assertEqual(counters.get(counters.USERS), 1)
+        self.assertMatchesRebuild()
+        
+        job = delete_category(self.tech, background=False)
+        self.assertEqual(counters.get(counters.CATEGORIES), 1)
+        with override_settings(DELETION_BATCH_PAUSE=0):
+            run_deletion_job(job.pk)
+        self.assertMatchesRebuild()
+    
+    def test_imports_and_pages_read_counters(self):
+        """Тест: bulk_create импорта учтен, главная и облако тегов читают счетчики"""
+        import io
+        from . import counters
+        from .bookmark_import import import_bookmarks, iter_bookmarks
+        from .vizualizations import ContentVisualizer
+        
+        csv_data = b'url,title,tags\nhttps://example.com/a,A,news|python\nhttps://example.com/b,B,python\n'
+        import_bookmarks(self.user, iter_bookmarks(io.BytesIO(csv_data), 'csv'))
+        self.assertMatchesRebuild()
+        
+        with self.assertNumQueries(4):  # всего, категорий, топ тегов, сами теги
+            counters.get(counters.ITEMS), counters.get(counters.CATEGORIES), counters.top_tags(10)
+        
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_content'], 2)
+        self.assertEqual([(tag.name, tag.num_times) for tag in response.context['popular_tags']], [('python', 2), ('news', 1)])
+        self.assertEqual(ContentVisualizer.create_tag_cloud_data()[0]['text'], 'python')
+        
+        response = self.client.get('/api/contents/stats/')
+        self.assertEqual(response.data, {'total': 2, 'by_type': {'article': 2}, 'by_status': {'new': 2}})
+
+
+class QueryPlanTest(APITestCase):
+    """Тесты планировщика запросов сериализаторов (content.prefetch)"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('planner', password='plannerpass123')
+        self.category = Category.objects.create(name='Технологии', slug='tech')
+        self.client.force_authenticate(user=self.user)
+    
+    def _add(self, count):
+        """Добавить элементы с тегами, категорией и рекомендациями"""
+        from .models import Recommendation
+        
+        start = ContentItem.all_objects.count()
+        for index in range(start, start + count):
+            item = ContentItem.objects.create(
+                user=self.user, title=f'Item {index}', url=f'https://example.com/{index}',
+                content_type='article', category=self.category,
+            )
+            item.tags.add('python', f'tag{index % 3}')
+            Recommendation.objects.create(user=self.user, content_item=item, score=0.5, reason='test')
+            Category.objects.create(name=f'Category {index}', slug=f'category-{index}')
+    
+    def _queries(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+    
+    def test_list_query_count_does_not_depend_on_page_size(self):
+        """Тест: число запросов списков одинаково для 2 и 10 строк на странице"""
+        urls = [
+            '/api/contents/', '/api/contents/mine/', '/api/categories/', '/api/recommendations/',
+            f'/api/categories/{self.category.slug}/contents/', f'/api/users/{self.user.pk}/contents/',
+            '/api/contents/{pk}/similar/',
+        ]
+        self._add(2)
+        first = ContentItem.objects.order_by('pk').first()
+        small = {url: self._queries(url.format(pk=first.pk)) for url in urls}
+        self._add(10)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self._queries(url.format(pk=first.pk)), small[url])
+    
+    def test_planned_values_match_unplanned(self):
+        """Тест: аннотации дают те же значения, что и запросы по объекту"""
+        from .prefetch import plan
+        from .serializers import CategorySerializer, ContentItemSerializer, RecommendationSerializer
+        
+        self._add(4)
+        lonely = ContentItem.objects.create(user=self.user, title='Lonely', url='https://example.com/lonely')
+        hidden = ContentItem.objects.create(
+            user=self.user, title='Hidden', url='https://example.com/hidden', category=self.category
+        )
+        hidden.tags.add('python')
+        ContentItem.objects.filter(pk=hidden.pk).update(pending_deletion=True)
+        
+        planned = {row['id']: row for row in self.client.get('/api/contents/').data['results']}
+        for item in ContentItem.objects.all():
+            expected = ContentItemSerializer(item).data
+            self.assertEqual(planned[item.pk]['similar_count'], expected['similar_count'])
+            self.assertEqual(planned[item.pk]['tags'], expected['tags'])
+        self.assertEqual(planned[lonely.pk]['similar_count'], 0)
+        self.assertEqual(planned[lonely.pk]['category'], None)
+        
+        response = self.client.get(f'/api/categories/{self.category.slug}/')
+        self.assertEqual(response.data['content_count'], 4)
+        self.assertEqual(response.data['content_count'], CategorySerializer(self.category).data['content_count'])
+        
+        select, prefetch, annotations = plan(RecommendationSerializer())
+        self.assertEqual(select, {'user'})
+        self.assertEqual([lookup.prefetch_to for lookup in prefetch], ['content_item'])
+        self.assertEqual(annotations, {})
+        recommendation = self.client.get('/api/recommendations/').data['results'][0]
+        self.assertEqual(recommendation['content_item']['category']['content_count'], 4)
+
+
+class RepresentationCacheTest(APITestCase):
+    """Тесты кэша представлений элементов (content.representation_cache)"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from .models import Recommendation
+        
+        cache.clear()
+        self.user = User.objects.create_user('cached', password='cachedpass123')
+        self.category = Category.objects.create(name='Технологии', slug='tech')
+        self.items = []
+        for index in range(5):
+            item = ContentItem.objects.create(
+                user=self.user, title=f'Item {index}', url=f'https://example.com/{index}',
+                content_type='article', category=self.category,
+            )
+            item.tags.add('python')
+            Recommendation.objects.create(user=self.user, content_item=item, score=index / 10, reason='test')
+            self.items.append(item)
+        self.client.force_authenticate(user=self.user)
+    
+    def _get(self, url):
+        """(данные ответа, число сериализованных элементов)"""
+        from unittest import mock
+        from .serializers import ContentItemSerializer
+        
+        # get_view_count вызывается один раз на каждую настоящую сериализацию
+        with mock.patch.object(ContentItemSerializer, 'get_view_count', return_value=0) as spy:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data, spy.call_count
+    
+    def _by_id(self, url):
+        return {row['id']: row for row in self._get(url)[0]['results']}
+    
+    def test_hot_lists_are_served_from_cache(self):
+        """Тест: повторный список не сериализует элементы и читает только строки страницы"""
+        from django.core.cache import cache
+        
+        # COUNT, строки страницы и поколение кэша (плюс сама категория или пользователь)
+        urls = {
+            '/api/contents/': 3, '/api/recommendations/': 3,
+            f'/api/categories/{self.category.slug}/contents/': 4, f'/api/users/{self.user.pk}/contents/': 4,
+        }
+        for url, queries in urls.items():
+            with self.subTest(url=url):
+                cache.clear()
+                first, serialized = self._get(url)
+                self.assertEqual(serialized, 5)
+                with self.assertNumQueries(queries):
+                    second, serialized = self._get(url)
+                self.assertEqual(serialized, 0)
+                self.assertEqual(second, first)
+        
+        item = self.items[0]
+        plain = self.client.get(f'/api/contents/{item.pk}/').data
+        self.assertEqual(self._by_id('/api/contents/')[item.pk], plain)
+    
+    def test_changes_produce_new_representation(self):
+        """Тест: сохранение, теги (по одному и пачкой) и правка категории видны сразу"""
+        from . import tagging
+        
+        self._get('/api/contents/')
+        first, second, third = self.items[:3]
+        
+        first.title = 'Renamed'
+        first.save(update_fields=['title'])
+        second.tags.add('django')
+        tagging.assign_tags([(third, ['bulk'])])
+        self.client.post('/api/contents/bulk_update/', {'ids': [self.items[3].pk], 'remove_tags': ['python']}, format='json')
+        
+        rows, serialized = self._get('/api/contents/')
+        self.assertEqual(serialized, 4)
+        rows = {row['id']: row for row in rows['results']}
+        self.assertEqual(rows[first.pk]['title'], 'Renamed')
+        self.assertEqual(sorted(rows[second.pk]['tags']), ['django', 'python'])
+        self.assertEqual(sorted(rows[third.pk]['tags']), ['bulk', 'python'])
+        self.assertEqual(rows[self.items[3].pk]['tags'], [])
+        
+        self.category.name = 'Наука'
+        self.category.save()
+        rows, serialized = self._get('/api/contents/')
+        self.assertEqual(serialized, 5)
+        self.assertEqual({row['category']['name'] for row in rows['results']}, {'Наука'})
+    
+    def test_invalidation_is_shared_between_processes(self):
+        """Тест: сброс в другом процессе (только запись в базе) виден этому"""
+        from . import counters
+        from .models import Category
+        
+        self._get('/api/contents/')
+        # Другой процесс переименовал категорию: его сброс не трогает наш кэш
+        Category.objects.filter(pk=self.category.pk).update(name='Наука')
+        counters.bump(counters.GENERATION, 'item_repr')
+        
+        rows, serialized = self._get('/api/contents/')
+        self.assertEqual(serialized, 5)
+        self.assertEqual({row['category']['name'] for row in rows['results']}, {'Наука'})
+        
+        counters.rebuild()
+        self.assertEqual(self._get('/api/contents/')[1], 0)
+
+
 class IntegrationTests(TestCase):
     """Интеграционные тесты"""
     
@@ -0,0 +1,93 @@
+"""
+Кэш метаданных страниц по нормализованному URL.
+
+Одну и ту же статью часто сохраняют несколько пользователей. Свежая запись
+(моложе URL_METADATA_TTL) отдается без сети, устаревшая перепроверяется
+условным GET: ответ 304 только продлевает запись, и страница не
+загружается и не разбирается заново. Описание загруженной страницы
+становится описанием ресурса (content.resources.describe), текст (если
+включен PAGE_TEXT_ENABLED) сохраняется в content.page_text.
+"""
+from datetime import timedelta
+
+from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+from django.utils import timezone # pyright: ignore[reportMissingModuleSource]
+
+from . import page_text, resources
+from .models import UrlMetadata
+from .parsing import fetch_metadata_conditional
+from .urlnorm import normalize_url, url_hash
+
+
+def get_ttl():
+    return timedelta(seconds=getattr(settings, 'URL_METADATA_TTL', 24 * 60 * 60))
+
+
+def is_fresh(entry, now=None):
+    return (now or timezone.now()) - entry.validated_at < get_ttl()
+
+
+def lookup(urls):
+    """Записи кэша одним запросом: {url: UrlMetadata} (только найденные)"""
+    hashes = {url: url_hash(url) for url in urls}
+    entries = {
+        entry.url_hash: entry
+        for entry in UrlMetadata.objects.filter(url_hash__in=set(hashes.values()))
+    }
+    return {url: entries[key] for url, key in hashes.items() if key in entries}
+
+
+def validators(entry):
+    """Аргументы для fetch_metadata_conditional по записи кэша"""
+    if entry is None:
+        return {}
+    return {'etag': entry.etag, 'last_modified': entry.last_modified}
+
+
+def store(url, metadata, etag='', last_modified=''):
+    entry, _ = UrlMetadata.objects.update_or_create(
+        url_hash=url_hash(url),
+        defaults={
+            'url': normalize_url(url)[:500],
+            'title': metadata['title'][:500],
+            'description': metadata['description'],
+            'keywords': metadata['keywords'],
+            'content_type': metadata['content_type'],
+            'category_slug': metadata['category_slug'] or '',
+            'etag': etag[:255],
+            'last_modified': last_modified[:64],
+            'validated_at': timezone.now(),
+        }
+    )
+    return entry
+
+
+def apply_response(url, entry, page):
+    """Обновить кэш по результату fetch_metadata_conditional и вернуть метаданные"""
+    if page.not_modified:
+        now = timezone.now()
+        UrlMetadata.objects.filter(pk=entry.pk).update(validated_at=now)
+        entry.validated_at = now
+        return entry.as_metadata()
+
+    store(url, page.metadata, page.etag, page.last_modified)
+    resources.describe(
+        url, title=page.metadata['title'], description=page.metadata['description'],
+        content_type=page.metadata['content_type'],
+    )
+    if page.metadata.get('text'):
+        page_text.store(
+            url, page.metadata['text'], title=page.metadata['title'],
+            description=page.metadata['description'], content_type=page.metadata['content_type'],
+        )
+    return page.metadata
+
+
+def get_metadata(url, timeout=None):
+    """Метаданные страницы: из кэша, после 304 или полной загрузки"""
+    entry = lookup([url]).get(url)
+    if entry is not None and is_fresh(entry):
+        return entry.as_metadata()
+
+    page = fetch_metadata_conditional(url, timeout=timeout, **validators(entry))
+    return apply_response(url, entry, page)
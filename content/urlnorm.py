@@ -0,0 +1,52 @@
+"""
+Нормализация URL.
+
+Одна и та же страница часто приходит с разным регистром хоста, портом по
+умолчанию, якорем или трекинговыми параметрами. Нормализованный URL и его
+хеш используются как ключ кэша метаданных и для поиска дубликатов.
+
+Убираются только заведомо рекламные метки (utm_*, fbclid, gclid): ref, si
+и подобные на части сайтов выбирают содержимое, а www.example.com и
+example.com могут быть разными сайтами, поэтому www. сохраняется.
+"""
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Параметры, которые не влияют на содержимое страницы
+TRACKING_PARAMS = {'fbclid', 'gclid'}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _is_tracking(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url):
+    """Канонический вид URL для сравнения и ключей кэша"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{host}:{parts.port}'
+
+    path = parts.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(name)
+    )
+
+    # Якорь отбрасываем: сервер отдает ту же страницу
+    return urlunsplit((scheme, netloc, path, urlencode(query), ''))
+
+
+def url_hash(url):
+    """SHA-256 нормализованного URL (hex, 64 символа)"""
+    return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
@@ -4,21 +4,23 @@ from django.contrib import messages # pyright: ignore[reportMissingModuleSource]
 from django.db.models import Count, Q # pyright: ignore[reportMissingModuleSource]
 from .models import ContentItem, Category, Recommendation
 from .forms import ContentItemForm # pyright: ignore[reportMissingImports]
+from .analytics_db import analytics_reads
+from .simhash import find_near_duplicate
+from . import counters
 from taggit.models import Tag # pyright: ignore[reportMissingImports]
-import pandas as pd # pyright: ignore[reportMissingModuleSource]
 from django.core.paginator import Paginator # pyright: ignore[reportMissingModuleSource]
 
 def home(request):
     """Главная страница"""
-    # Статистика
-    total_content = ContentItem.objects.count()
-    total_categories = Category.objects.count()
+    # Статистика - из денормализованных счетчиков, без COUNT по таблицам
+    total_content = counters.get(counters.ITEMS)
+    total_categories = counters.get(counters.CATEGORIES)
     
     # Последние добавления
-    latest_content = ContentItem.objects.select_related('category', 'user').order_by('-created_at')[:6]
+    latest_content = ContentItem.objects.select_related('category', 'user', 'resource').order_by('-created_at')[:6]
     
     # Популярные теги
-    popular_tags = Tag.objects.annotate(num_times=Count('taggit_taggeditem_items')).order_by('-num_times')[:10]
+    popular_tags = counters.top_tags(10)
     
     context = {
         'total_content': total_content,
@@ -50,11 +52,17 @@ def content_list(request):
     # Поиск
     search_query = request.GET.get('q')
     if search_query:
-        content_items = content_items.filter(
+        from django.conf import settings # pyright: ignore[reportMissingModuleSource]
+        
+        condition = (
             Q(title__icontains=search_query) |
             Q(description__icontains=search_query) |
+            Q(resource__description__icontains=search_query) |
             Q(tags__name__icontains=search_query)
-        ).distinct()
+        )
+        if settings.PAGE_TEXT_ENABLED:
+            condition |= Q(resource__page_text__terms__icontains=search_query)
+        content_items = content_items.filter(condition).distinct()
     
     # Пагинация
     paginator = Paginator(content_items, 12)
@@ -132,6 +140,11 @@ def add_content(request):
             form.save_m2m()  # Для тегов
             
             messages.success(request, 'Контент успешно добавлен!')
+            duplicate = find_near_duplicate(
+                request.user.id, content_item.title, content_item.full_description, exclude_id=content_item.pk
+            )
+            if duplicate is not None:
+                messages.warning(request, f'Похожий материал уже есть в библиотеке: «{duplicate.title}»')
             return redirect('content_detail', pk=content_item.pk)
     else:
         form = ContentItemForm()
@@ -171,18 +184,17 @@ def category_detail(request, slug):
     category = get_object_or_404(Category, slug=slug)
     content_items = ContentItem.objects.filter(category=category).order_by('-created_at')
     
-    # Статистика по категории
-    stats = content_items.aggregate(
-        total=Count('id'),
-        articles=Count('id', filter=Q(content_type='article')),
-        videos=Count('id', filter=Q(content_type='video')),
-        books=Count('id', filter=Q(content_type='book')),
-    )
+    # Статистика по категории (счетчики по категории и типу)
+    by_type = counters.values(counters.CATEGORY_TYPE, prefix=f'{category.pk}:')
+    stats = {
+        'total': sum(by_type.values()),
+        'articles': by_type.get('article', 0),
+        'videos': by_type.get('video', 0),
+        'books': by_type.get('book', 0),
+    }
     
     # Популярные теги в категории
-    popular_tags = Tag.objects.filter(
-        taggit_taggeditem_items__content_object__category=category
-    ).annotate(num_times=Count('taggit_taggeditem_items')).order_by('-num_times')[:10]
+    popular_tags = counters.top_tags(10, category_id=category.pk)
     
     context = {
         'category': category,
@@ -207,30 +219,38 @@ def statistics(request):
     """Страница со статистикой"""
     # Используем pandas для анализа данных
     import pandas as pd # pyright: ignore[reportMissingModuleSource]
-    from django.db import connection # pyright: ignore[reportMissingModuleSource]
+    from django.db import connections # pyright: ignore[reportMissingModuleSource]
+    from django.db.models import Avg # pyright: ignore[reportMissingModuleSource]
     
     # Получаем данные через pandas для анализа
     query = """
     SELECT 
-        c.content_type,
+        ci.content_type,
         COUNT(*) as count,
-        AVG(LENGTH(ci.description)) as avg_desc_length
+        AVG(LENGTH(COALESCE(ci.description, r.description, ''))) as avg_desc_length
     FROM content_contentitem ci
     JOIN content_category c ON ci.category_id = c.id
-    GROUP BY c.content_type
+    LEFT JOIN content_resource r ON ci.resource_id = r.id
+    GROUP BY ci.content_type
     """
     
-    with connection.cursor() as cursor:
-        cursor.execute(query)
-        columns = [col[0] for col in cursor.description]
-        stats_data = pd.DataFrame(cursor.fetchall(), columns=columns)
-    
-    # Общая статистика
-    total_content = ContentItem.objects.count()
-    total_users = ContentItem.objects.values('user').distinct().count()
-    avg_tags_per_item = ContentItem.objects.annotate(
-        tag_count=Count('tags')
-    ).aggregate(avg=Avg('tag_count'))['avg'] or 0 # pyright: ignore[reportUndefinedVariable]
+    # Все тяжелые чтения - из снимка базы, чтобы не мешать записи
+    with analytics_reads() as db_alias:
+        with connections[db_alias].cursor() as cursor:
+            cursor.execute(query)
+            columns = [col[0] for col in cursor.description]
+            stats_data = pd.DataFrame(cursor.fetchall(), columns=columns)
+        
+        # Общая статистика
+        total_content = counters.get(counters.ITEMS)
+        if request.GET.get('approximate', '').lower() in ('1', 'true', 'yes'):
+            from .sketches import estimate_unique_users
+            total_users = estimate_unique_users()
+        else:
+            total_users = counters.get(counters.USERS)
+        avg_tags_per_item = ContentItem.objects.annotate(
+            tag_count=Count('tags')
+        ).aggregate(avg=Avg('tag_count'))['avg'] or 0
     
     context = {
         'total_content': total_content,
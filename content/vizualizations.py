@@ -1,17 +1,23 @@
-import plotly.graph_objects as go # pyright: ignore[reportMissingImports]
-import plotly.express as px # pyright: ignore[reportMissingImports]
-from plotly.subplots import make_subplots # pyright: ignore[reportMissingImports]
-import pandas as pd # pyright: ignore[reportMissingModuleSource]
 from django.db.models import Count # pyright: ignore[reportMissingModuleSource]
 from .models import ContentItem, Category
 import json
 
+
+def _load_plotting():
+    """Ленивый импорт plotly и pandas (только при построении графиков)"""
+    import pandas as pd # pyright: ignore[reportMissingModuleSource]
+    import plotly.graph_objects as go # pyright: ignore[reportMissingImports]
+    import plotly.express as px # pyright: ignore[reportMissingImports]
+    return pd, go, px
+
 class ContentVisualizer:
     """Создание визуализаций для контента"""
     
     @staticmethod
     def create_content_type_chart():
         """Круговая диаграмма распределения по типам контента"""
+        pd, go, px = _load_plotting()
+        
         data = ContentItem.objects.values('content_type').annotate(
             count=Count('id')
         ).order_by('-count')
@@ -67,6 +73,7 @@ class ContentVisualizer:
     def create_monthly_timeline():
         """График добавления контента по месяцам"""
         from django.db.models.functions import TruncMonth # pyright: ignore[reportMissingModuleSource]
+        pd, go, px = _load_plotting()
         
         data = ContentItem.objects.annotate(
             month=TruncMonth('created_at')
@@ -112,21 +119,21 @@ class ContentVisualizer:
         return fig
     
     @staticmethod
-    def create_tag_cloud_data():
-        """Данные для облака тегов"""
-        from taggit.models import Tag # pyright: ignore[reportMissingImports]
-        from django.db.models import Count # pyright: ignore[reportMissingModuleSource]
-        
-        tags = Tag.objects.annotate(
-            num_times=Count('taggit_taggeditem_items')
-        ).order_by('-num_times')[:30]
+    def create_tag_cloud_data(approximate=False):
+        """Данные для облака тегов (точные счетчики; approximate - из Count-Min Sketch)"""
+        if approximate:
+            from .sketches import top_tags
+            counts = top_tags(30)
+        else:
+            from .counters import top_tags
+            counts = [(tag.name, tag.num_times) for tag in top_tags(30)]
         
         data = []
-        for tag in tags:
+        for name, num_times in counts:
             data.append({
-                'text': tag.name,
-                'value': tag.num_times,
-                'size': min(50, 10 + tag.num_times * 2)
+                'text': name,
+                'value': num_times,
+                'size': min(50, 10 + num_times * 2)
             })
         
         return data
@@ -134,6 +141,9 @@ class ContentVisualizer:
     @staticmethod
     def create_category_comparison():
         """Сравнение категорий"""
+        from plotly.subplots import make_subplots # pyright: ignore[reportMissingImports]
+        pd, go, px = _load_plotting()
+        
         data = Category.objects.annotate(
             content_count=Count('contentitem'),
             avg_tags=Count('contentitem__tags') / Count('contentitem')
@@ -83,9 +83,22 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Снимок default для тяжелых аналитических чтений (content.analytics_db)
+    'analytics': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_analytics.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = ['content.db_routers.AnalyticsRouter']
+
+# Максимальный возраст снимка аналитики (секунды) для ensure_fresh_snapshot.
+# Снимок обновляет только команда refresh_analytics_db (cron), например
+# каждую минуту: manage.py refresh_analytics_db --max-age 300
+ANALYTICS_DB_MAX_AGE = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -128,6 +141,141 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
 TAGGIT_CASE_INSENSITIVE = True
 
+# Общий HTTP-клиент для исходящих запросов (content.http_client)
+HTTP_CLIENT = {
+    'POOL_CONNECTIONS': 20,
+    'POOL_MAXSIZE': 50,
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 10,
+    'RETRIES': 2,
+    'BACKOFF_BASE': 0.3,
+    'BACKOFF_MAX': 5.0,
+    'BREAKER_THRESHOLD': 5,
+    'BREAKER_COOLDOWN': 30,
+    'MAX_HOSTS': 1000,
+}
+
+# Фоновые задачи (content.jobs): размер пула парсинга URL и через сколько
+# секунд с запуска задача в статусе running считается зависшей (recover_jobs).
+# BACKGROUND_JOBS_EAGER = True выполняет задачи сразу, без пула (для тестов)
+PARSE_JOB_WORKERS = 4
+PARSE_JOB_TIMEOUT = 600
+BACKGROUND_JOBS_EAGER = False
+
+# Скетчи аналитики (content.sketches): фоновое слияние накопленных
+# изменений после каждых SKETCH_MERGE_EVERY записей (и командой merge_sketches)
+SKETCH_MERGE_EVERY = 1000
+
+# Массовый импорт URL (content.bulk_import): общий лимит параллельности,
+# лимит на хост, таймаут одного запроса и дедлайн всей пачки (секунды).
+# Списки длиннее BULK_IMPORT_SYNC_URLS импортируются в фоне: размер пула,
+# дедлайн фоновой пачки и время (с) с запуска, после которого задача
+# считается зависшей (recover_jobs)
+BULK_IMPORT_CONCURRENCY = 32
+BULK_IMPORT_PER_HOST = 4
+BULK_IMPORT_TIMEOUT = 10
+BULK_IMPORT_DEADLINE = 120
+BULK_IMPORT_MAX_URLS = 5000
+BULK_IMPORT_SYNC_URLS = 50
+BULK_IMPORT_JOB_WORKERS = 1
+BULK_IMPORT_JOB_DEADLINE = 30 * 60
+BULK_IMPORT_JOB_TIMEOUT = 60 * 60
+
+# Максимум id в одном запросе bulk_update / bulk_delete (content.bulk_actions)
+BULK_ACTION_MAX_IDS = 5000
+
+# Фоновое удаление (content.deletion): строк в одной транзакции, пауза
+# между порциями (с), параллельность пула и порог, выше которого
+# bulk_delete уходит в фон
+DELETION_BATCH_SIZE = 500
+DELETION_BATCH_PAUSE = 0.05
+DELETION_JOB_WORKERS = 1
+DELETION_SYNC_LIMIT = 500
+
+# Денормализованные счетчики (content.counters): период сверки с данными
+# (с) для rebuild_counters --loop
+COUNTERS_RECONCILE_INTERVAL = 24 * 60 * 60
+
+# Кэш представлений элементов (content.representation_cache): срок записи (с),
+# он же предел отставания счетчиков в представлении
+REPRESENTATION_CACHE_TTL = 300
+
+# Импорт закладок из файлов экспорта (content.bookmark_import): строк в
+# одной транзакции, максимальный размер загружаемого файла, размер, выше
+# которого импорт уходит в фон, параллельность пула фоновых импортов и
+# время (с), после которого незавершенный импорт считается зависшим
+BOOKMARK_IMPORT_CHUNK_SIZE = 1000
+BOOKMARK_IMPORT_MAX_BYTES = 50 * 1024 * 1024
+BOOKMARK_IMPORT_SYNC_BYTES = 1024 * 1024
+BOOKMARK_IMPORT_JOB_WORKERS = 1
+BOOKMARK_IMPORT_JOB_TIMEOUT = 60 * 60
+
+# Кэш метаданных страниц (content.url_cache): через сколько секунд запись
+# перепроверяется условным GET (ETag / Last-Modified)
+URL_METADATA_TTL = 24 * 60 * 60
+
+# Внешний поиск (content.external_search): провайдеры, общий дедлайн запроса,
+# TTL кэша результатов (секунды), размер пула и сколько последних материалов
+# общего пула просматривает поиск по нему
+EXTERNAL_SEARCH_PROVIDERS = [
+    'content.external_search.CorpusArticleProvider',
+    'content.external_search.CorpusVideoProvider',
+]
+EXTERNAL_SEARCH_DEADLINE = 3
+EXTERNAL_SEARCH_CACHE_TTL = 600
+EXTERNAL_SEARCH_WORKERS = 8
+EXTERNAL_SEARCH_CORPUS_SCAN = 5000
+
+# Фоновая загрузка внешних материалов в общий пул (команда ingest_feeds):
+# запросы, источники, размер страницы, страниц за проход и период (секунды)
+NEWS_API_KEY = config('NEWS_API_KEY', default='')
+NEWS_API_BASE_URL = 'https://newsapi.org/v2'
+FEED_INGEST_QUERIES = ['python', 'django', 'javascript', 'дизайн']
+FEED_INGEST_PROVIDERS = ['news', 'youtube']
+FEED_INGEST_PAGE_SIZE = 50
+FEED_INGEST_MAX_PAGES = 5
+FEED_INGEST_INTERVAL = 60 * 60
+
+# Проверка ссылок (команда check_links): чанк обхода, общий лимит и лимит
+# на хост, минимальная пауза между запросами к хосту, таймаут и период
+# повторной проверки (секунды)
+LINK_CHECK_CHUNK_SIZE = 2000
+LINK_CHECK_CONCURRENCY = 64
+LINK_CHECK_PER_HOST = 2
+LINK_CHECK_MIN_INTERVAL = 0.5
+LINK_CHECK_TIMEOUT = 10
+LINK_CHECK_RECHECK_AFTER = 7 * 24 * 60 * 60
+
+# Почти-дубликаты (content.simhash): максимальное расстояние Хэмминга
+# между 64-битными отпечатками (не больше 3 при 4 полосах) и минимум различных
+# токенов, чтобы у заголовка вообще был отпечаток
+SIMHASH_MAX_DISTANCE = 3
+SIMHASH_MIN_TOKENS = 3
+
+# Автотеги (content.keywords): сколько тегов предлагать и доля документов,
+# при превышении которой термин считается слишком общим
+AUTO_TAGS_LIMIT = 5
+AUTO_TAGS_MAX_DOCUMENT_RATIO = 0.5
+
+# Классификатор категорий (команда train_classifier): файл модели, минимум
+# примеров для обучения и минимальная уверенность предсказания
+CATEGORY_MODEL_PATH = BASE_DIR / 'category_model.npz'
+CATEGORY_MODEL_MIN_ITEMS = 20
+CATEGORY_MIN_CONFIDENCE = 0.6
+
+# Сколько байт страницы читать при потоковом извлечении метаданных
+PARSE_MAX_BYTES = 512 * 1024
+
+# Полный текст страниц (content.page_text): дочитывать тело при парсинге
+# (до PARSE_MAX_BYTES) и сколько символов текста хранить. Выключено по
+# умолчанию: парсер читает только <head>, а поиск не добавляет JOIN с
+# page_text и LIKE по неиндексированным терминам страниц
+PAGE_TEXT_ENABLED = False
+PAGE_TEXT_MAX_CHARS = 200_000
+
+# Каталог колоночного снимка аналитики (команда export_analytics_snapshot)
+ANALYTICS_SNAPSHOT_DIR = BASE_DIR / 'analytics_snapshot'
+
 # Настройки REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [